@@ -1,4 +1,5 @@
 import json
+import sys
 import pandas as pd
 import dash
 from dash import dcc, html, dash_table, Input, Output, State, callback
@@ -7,6 +8,8 @@ from datetime import datetime, date
 import os
 import glob
 import calendar
+from dsr_catalog import find_catalog_file, get_catalog_sheet_with_keyword
+from period_set import PeriodSet, pct_change, STANDARD_ROLES, REVENUE_COLUMN, QTY_COLUMN
 
 # Automated Path Configuration Functions
 def get_first_day_of_month(month_year):
@@ -58,15 +61,9 @@ def get_month_year_combinations(latest_month_year):
 def find_file_by_keyword(folder_path, keyword):
     """
     Find a file in the folder that contains the keyword in its name
+    (looked up in the persistent DSR catalog instead of listing the folder)
     """
-    if not os.path.exists(folder_path):
-        return None
-    
-    files = os.listdir(folder_path)
-    for file in files:
-        if keyword.lower() in file.lower() and file.endswith('.xlsx'):
-            return os.path.join(folder_path, file)
-    return None
+    return find_catalog_file(folder_path, keyword)
 
 def setup_automated_paths(latest_month_year, dsr_folder_path=None):
     """
@@ -112,8 +109,7 @@ def setup_automated_paths(latest_month_year, dsr_folder_path=None):
         if invoice_file:
             # Get the first sheet (since invoice files have only one sheet)
             try:
-                xl = pd.ExcelFile(invoice_file)
-                sheet_name = xl.sheet_names[0] if xl.sheet_names else 'Sheet1'
+                sheet_name = get_catalog_sheet_with_keyword(invoice_file) or 'Sheet1'
             except:
                 sheet_name = 'Sheet1'
             
@@ -137,17 +133,24 @@ try:
     
     # latest_month_year = input("Enter the latest month-year (e.g., 'June-2025'): ").strip()
     # dsr_path = input("Enter full path to DSR folder (or press Enter for default './DSR'): ").strip() or None
-    latest_month_year = input("Enter the latest month-year (e.g., 'June-2025'): ")  # Default for dashboard - change this as needed
+    # python Product_performance.py June-2025 [DSR folder] starts the dashboard without prompting
+    if len(sys.argv) > 1:
+        latest_month_year = sys.argv[1]
+    else:
+        latest_month_year = input("Enter the latest month-year (e.g., 'June-2025'): ")  # Default for dashboard - change this as needed
     
     # Automatically determine the first day of the month
     first_day_weekday = get_first_day_of_month(latest_month_year)
     print(f"📅 First day of {latest_month_year} is: {['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][first_day_weekday]}")
     
-    # Load configuration from config.json
+    # Load configuration from config.json (unless the DSR folder was given on the command line)
     try:
-        with open('config.json', 'r') as f:
-            config_data = json.load(f)
-        dsr_path = config_data['paths']['dsr_folder_path']
+        if len(sys.argv) > 2:
+            dsr_path = sys.argv[2]
+        else:
+            with open('config.json', 'r') as f:
+                config_data = json.load(f)
+            dsr_path = config_data['paths']['dsr_folder_path']
     except Exception as e:
         print(f"❌ Error loading config.json: {e}")
         print("Using default DSR folder path...")
@@ -486,339 +489,179 @@ def filter_and_aggregate_data(df, invoice_days, weeks, brands, idgs, types, cate
     
     return df_display.to_dict('records')
 
+# Function to build the row mask for the universal filters
+def build_filter_mask(df, invoice_days, weeks, brands, idgs, types, categories=None, families=None, item_names=None):
+    """
+    Build a boolean mask for the dashboard filters (same rules as filter_and_aggregate_data)
+    """
+    mask = pd.Series(True, index=df.index)
+    if invoice_days:
+        mask &= df['InvoiceDay'].isin(invoice_days)
+    if weeks and 'Week' in df.columns:
+        mask &= df['Week'].isin(weeks)
+    if brands:
+        mask &= df['Brand'].isin(brands)
+    if idgs:
+        mask &= df['idg'].isin(idgs)
+    if types:
+        mask &= df['TYPE'].isin(types)
+    if categories and 'Category Name (L3)' in df.columns:
+        mask &= df['Category Name (L3)'].isin(categories)
+    if families and 'Family Name (L2)' in df.columns:
+        mask &= df['Family Name (L2)'].isin(families)
+    if item_names and 'ItemName' in df.columns:
+        mask &= df['ItemName'].isin(item_names)
+    return mask
+
 # Function to calculate summary metrics
 def calculate_summary_metrics(dfs, invoice_days, weeks, brands, idgs, types, categories=None, families=None, item_names=None):
+    period_set = PeriodSet.from_sheet_info(sheet_info, dfs)
+    stacked_df = period_set.stacked(
+        columns=['ProductDesc', REVENUE_COLUMN, QTY_COLUMN],
+        mask_fn=lambda df: build_filter_mask(df, invoice_days, weeks, brands, idgs, types, categories, families, item_names)
+    )
+    
+    # One grouped pass over all periods instead of one filter/sum per period
+    totals = stacked_df.groupby('Period', observed=False).agg(
+        total_revenue=(REVENUE_COLUMN, 'sum'),
+        total_qty=(QTY_COLUMN, 'sum'),
+        unique_products=('ProductDesc', 'nunique')
+    ).reindex(period_set.keys, fill_value=0)
+    totals['avg_order_value'] = (totals['total_revenue'] / totals['total_qty']).where(totals['total_qty'] > 0, 0)
+    
     summaries = []
-    for i, df in enumerate(dfs):
-        filtered_df = df.copy()
-        
-        if invoice_days:
-            filtered_df = filtered_df[filtered_df['InvoiceDay'].isin(invoice_days)]
-        if weeks and 'Week' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Week'].isin(weeks)]
-        if brands:
-            filtered_df = filtered_df[filtered_df['Brand'].isin(brands)]
-        if idgs:
-            filtered_df = filtered_df[filtered_df['idg'].isin(idgs)]
-        if types:
-            filtered_df = filtered_df[filtered_df['TYPE'].isin(types)]
-        if categories and 'Category Name (L3)' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Category Name (L3)'].isin(categories)]
-        if families and 'Family Name (L2)' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Family Name (L2)'].isin(families)]
-        if item_names and 'ItemName' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['ItemName'].isin(item_names)]
-        
-        total_revenue = filtered_df['Amount Invoiced W.O. VAT'].sum()
-        total_qty = filtered_df['QtyOrdered'].sum()
-        unique_products = filtered_df['ProductDesc'].nunique()
-        avg_order_value = total_revenue / total_qty if total_qty > 0 else 0
-        
+    for key, row in totals.iterrows():
         summaries.append({
-            'period': sheet_info[i][2],
-            'total_revenue': total_revenue,
-            'total_qty': total_qty,
-            'unique_products': unique_products,
-            'avg_order_value': avg_order_value
+            'period': period_set.display(key),
+            'total_revenue': row['total_revenue'],
+            'total_qty': row['total_qty'],
+            'unique_products': int(row['unique_products']),
+            'avg_order_value': row['avg_order_value']
         })
     
     return summaries
 
 # Function to create comparison analysis
-def create_comparison_analysis(summaries):
-    if len(summaries) < 3:
+def create_comparison_analysis(summaries, current_index=-1, comparisons=None):
+    """
+    Build the comparison table for any number of periods
+    
+    Parameters:
+    summaries: list - output of calculate_summary_metrics (one entry per period, in sheet_info order)
+    current_index: int - position of the current period (defaults to the last one)
+    comparisons: dict - label -> base period position, defaults to the standard
+                        {'YoY Change %': 1, 'MoM Change %': 0} when there are three periods
+    
+    Returns:
+    list of dict rows for the dash table
+    """
+    if len(summaries) < 2:
         return []
     
-    current = summaries[2]  # Latest month (index 2)
-    last_month = summaries[0]  # Last month (index 0)
-    last_year = summaries[1]  # Last year (index 1)
-    
-    # Month-over-month comparison (current vs last month)
-    mom_revenue_change = ((current['total_revenue'] - last_month['total_revenue']) / last_month['total_revenue'] * 100) if last_month['total_revenue'] > 0 else 0
-    mom_qty_change = ((current['total_qty'] - last_month['total_qty']) / last_month['total_qty'] * 100) if last_month['total_qty'] > 0 else 0
-    
-    # Year-over-year comparison (current vs last year)
-    yoy_revenue_change = ((current['total_revenue'] - last_year['total_revenue']) / last_year['total_revenue'] * 100) if last_year['total_revenue'] > 0 else 0
-    yoy_qty_change = ((current['total_qty'] - last_year['total_qty']) / last_year['total_qty'] * 100) if last_year['total_qty'] > 0 else 0
-    
-    comparison_data = [
-        {
-            'Metric': 'Revenue (W.O. VAT)',
-            f'Last Month ({sheet_info[0][2]})': f"AED {last_month['total_revenue']:,.0f}",
-            f'Last Year ({sheet_info[1][2]})': f"AED {last_year['total_revenue']:,.0f}",
-            f'Current ({sheet_info[2][2]})': f"AED {current['total_revenue']:,.0f}",
-            'YoY Change %': f"{yoy_revenue_change:+.1f}%",
-            'MoM Change %': f"{mom_revenue_change:+.1f}%"
-        },
-        {
-            'Metric': 'Quantity Ordered',
-            f'Last Month ({sheet_info[0][2]})': f"{last_month['total_qty']:,.0f}",
-            f'Last Year ({sheet_info[1][2]})': f"{last_year['total_qty']:,.0f}",
-            f'Current ({sheet_info[2][2]})': f"{current['total_qty']:,.0f}",
-            'YoY Change %': f"{yoy_qty_change:+.1f}%",
-            'MoM Change %': f"{mom_qty_change:+.1f}%"
-        },
-        {
-            'Metric': 'Unique Products',
-            f'Last Month ({sheet_info[0][2]})': f"{last_month['unique_products']:,}",
-            f'Last Year ({sheet_info[1][2]})': f"{last_year['unique_products']:,}",
-            f'Current ({sheet_info[2][2]})': f"{current['unique_products']:,}",
-            'YoY Change %': f"{((current['unique_products'] - last_year['unique_products']) / last_year['unique_products'] * 100):+.1f}%" if last_year['unique_products'] > 0 else "N/A",
-            'MoM Change %': f"{((current['unique_products'] - last_month['unique_products']) / last_month['unique_products'] * 100):+.1f}%" if last_month['unique_products'] > 0 else "N/A"
-        },
-        {
-            'Metric': 'Avg Order Value',
-            f'Last Month ({sheet_info[0][2]})': f"AED {last_month['avg_order_value']:.2f}",
-            f'Last Year ({sheet_info[1][2]})': f"AED {last_year['avg_order_value']:.2f}",
-            f'Current ({sheet_info[2][2]})': f"AED {current['avg_order_value']:.2f}",
-            'YoY Change %': f"{((current['avg_order_value'] - last_year['avg_order_value']) / last_year['avg_order_value'] * 100):+.1f}%" if last_year['avg_order_value'] > 0 else "N/A",
-            'MoM Change %': f"{((current['avg_order_value'] - last_month['avg_order_value']) / last_month['avg_order_value'] * 100):+.1f}%" if last_month['avg_order_value'] > 0 else "N/A"
-        }
+    if comparisons is None:
+        if len(summaries) == len(STANDARD_ROLES):
+            comparisons = {'YoY Change %': 1, 'MoM Change %': 0}
+        else:
+            comparisons = {'Change vs Previous %': len(summaries) - 2}
+    
+    # Period columns: standard roles keep their familiar labels
+    labels = []
+    for i, summary in enumerate(summaries):
+        if len(summaries) == len(STANDARD_ROLES):
+            role = ['Last Month', 'Last Year', 'Current'][i]
+            labels.append(f"{role} ({summary['period']})")
+        else:
+            labels.append(summary['period'])
+    
+    metrics = pd.DataFrame(summaries).set_index('period')
+    metric_columns = ['total_revenue', 'total_qty', 'unique_products', 'avg_order_value']
+    values = metrics[metric_columns].T.astype(float)
+    values.columns = range(len(summaries))
+    
+    # All metric changes in one vectorized pass per comparison
+    current = values[current_index % len(summaries)]
+    changes = {label: pct_change(current, values[base_index]) for label, base_index in comparisons.items()}
+    
+    metric_specs = [
+        ('Revenue (W.O. VAT)', 'total_revenue', lambda v: f"AED {v:,.0f}", "+0.0%"),
+        ('Quantity Ordered', 'total_qty', lambda v: f"{v:,.0f}", "+0.0%"),
+        ('Unique Products', 'unique_products', lambda v: f"{int(v):,}", "N/A"),
+        ('Avg Order Value', 'avg_order_value', lambda v: f"AED {v:.2f}", "N/A")
     ]
     
+    comparison_data = []
+    for metric_label, metric, fmt, zero_base_display in metric_specs:
+        row = {'Metric': metric_label}
+        for i, label in enumerate(labels):
+            row[label] = fmt(values.loc[metric, i])
+        for change_label, change in changes.items():
+            value = change[metric]
+            row[change_label] = zero_base_display if pd.isna(value) else f"{value:+.1f}%"
+        comparison_data.append(row)
+    
     return comparison_data
 
-# Function to get top performers across all periods
-def get_top_performers(dfs, invoice_days, weeks, brands, idgs, types, categories=None, families=None, item_names=None, top_n=10):
-    # Get top 10 products from the latest month (index 2)
-    latest_df = dfs[2].copy()
+# Function to rank the latest period by a dimension and compare against the other periods
+def get_top_by_dimension(dfs, dimension, invoice_days, weeks, brands, idgs, types, categories=None, families=None, item_names=None, top_n=10):
+    """
+    Top N values of a dimension (ProductDesc / Brand) from the latest period, with revenue
+    for every period and YoY / MoM changes, computed from one stacked groupby
     
-    # Apply filters to latest month data
-    if invoice_days:
-        latest_df = latest_df[latest_df['InvoiceDay'].isin(invoice_days)]
-    if weeks and 'Week' in latest_df.columns:
-        latest_df = latest_df[latest_df['Week'].isin(weeks)]
-    if brands:
-        latest_df = latest_df[latest_df['Brand'].isin(brands)]
-    if idgs:
-        latest_df = latest_df[latest_df['idg'].isin(idgs)]
-    if types:
-        latest_df = latest_df[latest_df['TYPE'].isin(types)]
-    if categories and 'Category Name (L3)' in latest_df.columns:
-        latest_df = latest_df[latest_df['Category Name (L3)'].isin(categories)]
-    if families and 'Family Name (L2)' in latest_df.columns:
-        latest_df = latest_df[latest_df['Family Name (L2)'].isin(families)]
-    if item_names and 'ItemName' in latest_df.columns:
-        latest_df = latest_df[latest_df['ItemName'].isin(item_names)]
-    
-    # Get top products from latest month
-    latest_product_totals = latest_df.groupby('ProductDesc').agg({
-        'Amount Invoiced W.O. VAT': 'sum',
-        'QtyOrdered': 'sum'
-    }).sort_values(by='Amount Invoiced W.O. VAT', ascending=False)
+    Returns:
+    (top revenue DataFrame with one column per period key, period_set, yoy Series or None, mom Series or None)
+    """
+    period_set = PeriodSet.from_sheet_info(sheet_info, dfs)
+    stacked_df = period_set.stacked(
+        columns=[dimension, REVENUE_COLUMN, QTY_COLUMN],
+        mask_fn=lambda df: build_filter_mask(df, invoice_days, weeks, brands, idgs, types, categories, families, item_names)
+    )
+    wide = period_set.aggregate(by=dimension, stacked_df=stacked_df)
+    revenue = wide[REVENUE_COLUMN]
     
-    # Get top N products from latest month
-    top_products_latest = latest_product_totals.head(top_n)
-    top_product_names = top_products_latest.index.tolist()
+    # Only values present in the latest period can be top performers
+    latest_key = period_set.keys[-1]
+    latest_names = stacked_df.loc[stacked_df['Period'] == latest_key, dimension].unique()
+    top = revenue[revenue.index.isin(latest_names)].sort_values(by=latest_key, ascending=False).head(top_n)
     
-    # Now get data for these products from all periods
-    all_products_data = {}
+    if period_set.keys == STANDARD_ROLES:
+        yoy_key, mom_key = 'last_year', 'last_month'
+    else:
+        yoy_key, mom_key = period_set.offset_key(latest_key, 12), period_set.offset_key(latest_key, 1)
     
-    for product_name in top_product_names:
-        all_products_data[product_name] = {
-            'ProductDesc': product_name,
-            f'{sheet_info[2][2]}_Revenue': top_products_latest.loc[product_name, 'Amount Invoiced W.O. VAT'],
-            f'{sheet_info[2][2]}_Qty': top_products_latest.loc[product_name, 'QtyOrdered']
-        }
-        
-        # Get data from other periods for the same products
-        for i, df in enumerate(dfs[:2]):  # Only check first two periods (not the latest)
-            filtered_df = df.copy()
-            
-            # Apply same filters
-            if invoice_days:
-                filtered_df = filtered_df[filtered_df['InvoiceDay'].isin(invoice_days)]
-            if weeks and 'Week' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Week'].isin(weeks)]
-            if brands:
-                filtered_df = filtered_df[filtered_df['Brand'].isin(brands)]
-            if idgs:
-                filtered_df = filtered_df[filtered_df['idg'].isin(idgs)]
-            if types:
-                filtered_df = filtered_df[filtered_df['TYPE'].isin(types)]
-            if categories and 'Category Name (L3)' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Category Name (L3)'].isin(categories)]
-            if families and 'Family Name (L2)' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Family Name (L2)'].isin(families)]
-            if item_names and 'ItemName' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['ItemName'].isin(item_names)]
-            
-            period_name = sheet_info[i][2]
-            
-            # Check if product exists in this period
-            product_data = filtered_df[filtered_df['ProductDesc'] == product_name]
-            if not product_data.empty:
-                revenue = product_data['Amount Invoiced W.O. VAT'].sum()
-                qty = product_data['QtyOrdered'].sum()
-            else:
-                revenue = 0
-                qty = 0
-            
-            all_products_data[product_name][f'{period_name}_Revenue'] = revenue
-            all_products_data[product_name][f'{period_name}_Qty'] = qty    # Format the results
-    formatted_top_products = []
-    for i, (product_name, product_data) in enumerate(all_products_data.items()):
-        # Calculate total revenue and quantity across all periods
-        total_revenue = (product_data[f'{sheet_info[0][2]}_Revenue'] + 
-                        product_data[f'{sheet_info[1][2]}_Revenue'] + 
-                        product_data[f'{sheet_info[2][2]}_Revenue'])
-        total_qty = (product_data[f'{sheet_info[0][2]}_Qty'] + 
-                    product_data[f'{sheet_info[1][2]}_Qty'] + 
-                    product_data[f'{sheet_info[2][2]}_Qty'])
-        
-        # Calculate comparisons
-        current_revenue = product_data[f'{sheet_info[2][2]}_Revenue']
-        last_year_revenue = product_data[f'{sheet_info[1][2]}_Revenue']
-        last_month_revenue = product_data[f'{sheet_info[0][2]}_Revenue']
-        
-        # Year-over-year comparison
-        if last_year_revenue > 0:
-            yoy_change = ((current_revenue - last_year_revenue) / last_year_revenue) * 100
-            yoy_display = f"{yoy_change:+.1f}%"
-        else:
-            yoy_display = "New Product"
-        
-        # Month-over-month comparison
-        if last_month_revenue > 0:
-            mom_change = ((current_revenue - last_month_revenue) / last_month_revenue) * 100
-            mom_display = f"{mom_change:+.1f}%"
-        else:
-            mom_display = "New Product"
-        
-        formatted_top_products.append({
+    yoy = pct_change(top[latest_key], top[yoy_key]) if yoy_key else None
+    mom = pct_change(top[latest_key], top[mom_key]) if mom_key else None
+    return top, period_set, yoy, mom
+
+def format_top_rows(top, period_set, yoy, mom, label_column, new_label, truncate=False):
+    """Format top-N rows for the dash tables ("AED" strings and +x.x% / New ... labels)"""
+    formatted_rows = []
+    for i, name in enumerate(top.index):
+        row = {
             'Rank': i + 1,
-            'Product': product_name[:50] + '...' if len(product_name) > 50 else product_name,
-            # 'Total Revenue': f"AED {total_revenue:,.0f}",
-            # 'Total Qty': f"{total_qty:,.0f}",
-            f"{sheet_info[0][2]} Revenue": f"AED {product_data[f'{sheet_info[0][2]}_Revenue']:,.0f}",
-            f"{sheet_info[1][2]} Revenue": f"AED {product_data[f'{sheet_info[1][2]}_Revenue']:,.0f}",
-            f"{sheet_info[2][2]} Revenue": f"AED {product_data[f'{sheet_info[2][2]}_Revenue']:,.0f}",
-            'YoY Change %': yoy_display,
-            'MoM Change %': mom_display
-        })
-    
-    return formatted_top_products
+            label_column: (name[:50] + '...' if truncate and len(name) > 50 else name)
+        }
+        for key in period_set.keys:
+            row[f"{period_set.display(key)} Revenue"] = f"AED {top.loc[name, key]:,.0f}"
+        if yoy is not None:
+            row['YoY Change %'] = new_label if pd.isna(yoy[name]) else f"{yoy[name]:+.1f}%"
+        if mom is not None:
+            row['MoM Change %'] = new_label if pd.isna(mom[name]) else f"{mom[name]:+.1f}%"
+        formatted_rows.append(row)
+    return formatted_rows
+
+# Function to get top performers across all periods
+def get_top_performers(dfs, invoice_days, weeks, brands, idgs, types, categories=None, families=None, item_names=None, top_n=10):
+    top, period_set, yoy, mom = get_top_by_dimension(
+        dfs, 'ProductDesc', invoice_days, weeks, brands, idgs, types, categories, families, item_names, top_n
+    )
+    return format_top_rows(top, period_set, yoy, mom, 'Product', "New Product", truncate=True)
 
 # Function to get top performing brands across all periods
 def get_top_brands(dfs, invoice_days, weeks, brands, idgs, types, categories=None, families=None, item_names=None, top_n=10):
-    # Get top 10 brands from the latest month (index 2)
-    latest_df = dfs[2].copy()
-    
-    # Apply filters to latest month data
-    if invoice_days:
-        latest_df = latest_df[latest_df['InvoiceDay'].isin(invoice_days)]
-    if weeks and 'Week' in latest_df.columns:
-        latest_df = latest_df[latest_df['Week'].isin(weeks)]
-    if brands:
-        latest_df = latest_df[latest_df['Brand'].isin(brands)]
-    if idgs:
-        latest_df = latest_df[latest_df['idg'].isin(idgs)]
-    if types:
-        latest_df = latest_df[latest_df['TYPE'].isin(types)]
-    if categories and 'Category Name (L3)' in latest_df.columns:
-        latest_df = latest_df[latest_df['Category Name (L3)'].isin(categories)]
-    if families and 'Family Name (L2)' in latest_df.columns:
-        latest_df = latest_df[latest_df['Family Name (L2)'].isin(families)]
-    if item_names and 'ItemName' in latest_df.columns:
-        latest_df = latest_df[latest_df['ItemName'].isin(item_names)]
-    
-    # Get top brands from latest month
-    latest_brand_totals = latest_df.groupby('Brand').agg({
-        'Amount Invoiced W.O. VAT': 'sum',
-        'QtyOrdered': 'sum'
-    }).sort_values(by='Amount Invoiced W.O. VAT', ascending=False)
-    
-    # Get top N brands from latest month
-    top_brands_latest = latest_brand_totals.head(top_n)
-    top_brand_names = top_brands_latest.index.tolist()
-    
-    # Now get data for these brands from all periods
-    all_brands_data = {}
-    
-    for brand_name in top_brand_names:
-        all_brands_data[brand_name] = {
-            'Brand': brand_name,
-            f'{sheet_info[2][2]}_Revenue': top_brands_latest.loc[brand_name, 'Amount Invoiced W.O. VAT'],
-            f'{sheet_info[2][2]}_Qty': top_brands_latest.loc[brand_name, 'QtyOrdered']
-        }
-        
-        # Get data from other periods for the same brands
-        for i, df in enumerate(dfs[:2]):  # Only check first two periods (not the latest)
-            filtered_df = df.copy()
-            
-            # Apply same filters
-            if invoice_days:
-                filtered_df = filtered_df[filtered_df['InvoiceDay'].isin(invoice_days)]
-            if weeks and 'Week' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Week'].isin(weeks)]
-            if brands:
-                filtered_df = filtered_df[filtered_df['Brand'].isin(brands)]
-            if idgs:
-                filtered_df = filtered_df[filtered_df['idg'].isin(idgs)]
-            if types:
-                filtered_df = filtered_df[filtered_df['TYPE'].isin(types)]
-            if categories and 'Category Name (L3)' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Category Name (L3)'].isin(categories)]
-            if families and 'Family Name (L2)' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Family Name (L2)'].isin(families)]
-            if item_names and 'ItemName' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['ItemName'].isin(item_names)]
-            
-            period_name = sheet_info[i][2]
-            
-            # Check if brand exists in this period
-            brand_data = filtered_df[filtered_df['Brand'] == brand_name]
-            if not brand_data.empty:
-                revenue = brand_data['Amount Invoiced W.O. VAT'].sum()
-                qty = brand_data['QtyOrdered'].sum()
-            else:
-                revenue = 0
-                qty = 0
-            
-            all_brands_data[brand_name][f'{period_name}_Revenue'] = revenue
-            all_brands_data[brand_name][f'{period_name}_Qty'] = qty
-    
-    # Format the results
-    formatted_top_brands = []
-    for i, (brand_name, brand_data) in enumerate(all_brands_data.items()):
-        # Calculate total revenue and quantity across all periods
-        total_revenue = (brand_data[f'{sheet_info[0][2]}_Revenue'] + 
-                        brand_data[f'{sheet_info[1][2]}_Revenue'] + 
-                        brand_data[f'{sheet_info[2][2]}_Revenue'])
-        total_qty = (brand_data[f'{sheet_info[0][2]}_Qty'] + 
-                    brand_data[f'{sheet_info[1][2]}_Qty'] + 
-                    brand_data[f'{sheet_info[2][2]}_Qty'])
-        
-        # Calculate comparisons
-        current_revenue = brand_data[f'{sheet_info[2][2]}_Revenue']
-        last_year_revenue = brand_data[f'{sheet_info[1][2]}_Revenue']
-        last_month_revenue = brand_data[f'{sheet_info[0][2]}_Revenue']
-        
-        # Year-over-year comparison
-        if last_year_revenue > 0:
-            yoy_change = ((current_revenue - last_year_revenue) / last_year_revenue) * 100
-            yoy_display = f"{yoy_change:+.1f}%"
-        else:
-            yoy_display = "New Brand"
-        
-        # Month-over-month comparison
-        if last_month_revenue > 0:
-            mom_change = ((current_revenue - last_month_revenue) / last_month_revenue) * 100
-            mom_display = f"{mom_change:+.1f}%"
-        else:
-            mom_display = "New Brand"
-        
-        formatted_top_brands.append({
-            'Rank': i + 1,
-            'Brand': brand_name,
-            f"{sheet_info[0][2]} Revenue": f"AED {brand_data[f'{sheet_info[0][2]}_Revenue']:,.0f}",
-            f"{sheet_info[1][2]} Revenue": f"AED {brand_data[f'{sheet_info[1][2]}_Revenue']:,.0f}",
-            f"{sheet_info[2][2]} Revenue": f"AED {brand_data[f'{sheet_info[2][2]}_Revenue']:,.0f}",
-            'YoY Change %': yoy_display,
-            'MoM Change %': mom_display
-        })
-    
-    return formatted_top_brands
+    top, period_set, yoy, mom = get_top_by_dimension(
+        dfs, 'Brand', invoice_days, weeks, brands, idgs, types, categories, families, item_names, top_n
+    )
+    return format_top_rows(top, period_set, yoy, mom, 'Brand', "New Brand")
 
 # CONFIGURATION HELPER FUNCTION
 def update_dashboard_configuration(new_month_year, dsr_folder_path=None):
@@ -0,0 +1,288 @@
+import re
+import calendar
+import numpy as np
+import pandas as pd
+
+# Month tokens recognised in customer profile file names ('CUSTOMER PROFILE_April25.xlsx')
+MONTH_TOKENS = {name.lower(): num for num, name in enumerate(calendar.month_abbr) if name}
+# (whole month names or abbreviations only, delimited by non-letters: 'Summary' is not March)
+MONTH_PATTERN = re.compile(r'(?<![a-z])(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|'
+                           r'aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)(?![a-z])',
+                           re.IGNORECASE)
+YEAR_PATTERN = re.compile(r'(?<!\d)(20\d{2}|\d{2})(?!\d)')
+
+
+def normalize_emails(emails):
+    """Vectorized str(email).strip().lower() of a Series"""
+    return emails.astype(str).str.strip().str.lower()
+
+
+class CustomerKeys:
+    """
+    Dictionary encoding of customers: normalized email <-> compact int32 customer_key
+
+    Keys are assigned in order of first appearance and never change, so frames encoded
+    one after another (FY1, FY2, 2023, the April25 file) share one key space.
+    """
+
+    def __init__(self):
+        self.emails = pd.Index([], dtype=object)
+
+    def __len__(self):
+        return len(self.emails)
+
+    def encode(self, emails, normalized=False):
+        """
+        Keys of a Series of emails, adding unseen (normalized) emails to the dictionary
+
+        Returns:
+        numpy int32 array aligned with emails
+        """
+        codes, uniques = pd.factorize(emails if normalized else normalize_emails(emails))
+        keys = self.emails.get_indexer(uniques)
+        new = keys < 0
+        if new.any():
+            keys[new] = np.arange(len(self.emails), len(self.emails) + int(new.sum()))
+            self.emails = self.emails.append(pd.Index(uniques[new], dtype=object))
+        return keys.astype(np.int32)[codes]
+
+    def add(self, df, column='customeremail'):
+        """Normalize the email column of a frame and add its customer_key column (in place)"""
+        if df is None or df.empty:
+            return df
+        df[column] = normalize_emails(df[column])
+        df['customer_key'] = self.encode(df[column], normalized=True)
+        return df
+
+    def decode(self, keys):
+        """Reverse lookup: emails of customer keys (e.g. Cohort.keys)"""
+        return self.emails.take(np.asarray(keys, dtype=np.intp))
+
+
+def file_period(file_name):
+    """
+    (year, month) a file covers, read from its name ('June24', 'Jan_2025', '24-jul')
+
+    Returns:
+    tuple (year, month); month is None for a year-only name, both are None without a year
+    """
+    name = str(file_name).rsplit('.', 1)[0]
+    month_match = MONTH_PATTERN.search(name)
+    year_match = YEAR_PATTERN.search(MONTH_PATTERN.sub(' ', name))
+    if not year_match:
+        return None, None
+    year = int(year_match.group(1))
+    month = MONTH_TOKENS[month_match.group(1).lower()[:3]] if month_match else None
+    return (year if year >= 100 else 2000 + year), month
+
+
+def add_order_periods(df):
+    """
+    Fill the year / month columns of every order (in place)
+
+    Orders keep the year and month of their order_date; orders without a usable date
+    fall back to the month in their file name (parsed once per file, not per row).
+    """
+    if df.empty:
+        return df
+    if 'order_date' in df.columns:
+        dates = pd.to_datetime(df['order_date'], errors='coerce')
+        year, month = dates.dt.year, dates.dt.month
+    else:
+        year = month = pd.Series(np.nan, index=df.index)
+
+    missing = year.isna()
+    if missing.any():
+        periods = {name: file_period(name) for name in df.loc[missing, 'file_name'].unique()}
+        file_names = df.loc[missing, 'file_name']
+        year = year.where(~missing, file_names.map(lambda name: periods[name][0]))
+        month = month.where(~missing, file_names.map(lambda name: periods[name][1]))
+
+    df['year'] = pd.to_numeric(year, errors='coerce')
+    df['month'] = pd.to_numeric(month, errors='coerce')
+    return df
+
+
+def period_mask(df, year, months=None):
+    """Orders of a year (optionally only some months, e.g. range(1, 7))"""
+    if 'year' not in df.columns:
+        return pd.Series(False, index=df.index)
+    mask = df['year'] == year
+    if months is not None:
+        mask &= df['month'].isin(list(months))
+    return mask
+
+
+class Cohort:
+    """
+    A set of customers held as a sorted array of customer keys
+
+    Supports the set operations the analyses use (len, in, &, |, -, intersection,
+    union, difference) with vectorized numpy set routines instead of Python sets of
+    email strings.
+    """
+
+    def __init__(self, keys=(), assume_unique=False):
+        keys = np.asarray(keys, dtype=np.int32)
+        self.keys = keys if assume_unique else np.unique(keys)
+
+    @classmethod
+    def from_frames(cls, *selections):
+        """Cohort of the customer_key values of one or more (filtered) frames"""
+        parts = [df['customer_key'].to_numpy() for df in selections if df is not None and not df.empty]
+        return cls(np.concatenate(parts) if parts else ())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __bool__(self):
+        return len(self.keys) > 0
+
+    def __iter__(self):
+        return iter(self.keys.tolist())
+
+    def __contains__(self, key):
+        position = np.searchsorted(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    def __repr__(self):
+        return f"Cohort({len(self):,} customers)"
+
+    def intersection(self, *others):
+        keys = self.keys
+        for other in others:
+            keys = np.intersect1d(keys, other.keys, assume_unique=True)
+        return Cohort(keys, assume_unique=True)
+
+    def union(self, *others):
+        keys = self.keys
+        for other in others:
+            keys = np.union1d(keys, other.keys)
+        return Cohort(keys, assume_unique=True)
+
+    def difference(self, *others):
+        keys = self.keys
+        for other in others:
+            keys = np.setdiff1d(keys, other.keys, assume_unique=True)
+        return Cohort(keys, assume_unique=True)
+
+    __and__ = intersection
+    __or__ = union
+    __sub__ = difference
+
+
+class ChannelSegments:
+    """
+    Customers grouped by the combination of channels they ordered through
+
+    Every channel gets one bit. A single grouped pass over customer_key ORs the bits
+    of each customer's orders, so POS-only, online-only, omnichannel and any other
+    N-channel segment are read off one mask per customer instead of separate passes.
+    """
+
+    def __init__(self, df, channels=None, column='channel'):
+        """
+        Parameters:
+        df: DataFrame with customer_key and channel columns
+        channels: list - channels to give a bit (default: every channel in df, sorted)
+        column: str - channel column
+        """
+        if df is None or df.empty:
+            self.channels = list(channels or [])
+            self.keys = np.array([], dtype=np.int32)
+            self.masks = np.array([], dtype=np.uint64)
+            return
+
+        if channels is None:
+            # One factorize gives both the channel list and the codes (NaN -> -1)
+            codes, uniques = pd.factorize(df[column], sort=True)
+            self.channels = list(uniques)
+        else:
+            self.channels = list(channels)
+            codes = pd.Index(self.channels).get_indexer(df[column])
+        if len(self.channels) > 63:
+            raise ValueError(f"At most 63 channels can be segmented, got {len(self.channels)}")
+
+        # Group by counting (customer_key, channel) pairs: customer keys are dense (CustomerKeys),
+        # so one bincount covers every customer, with a last slot for orders without a channel bit
+        slots = len(self.channels) + 1
+        codes = codes.astype(np.int64)
+        codes[codes < 0] = slots - 1
+        keys = df['customer_key'].to_numpy(dtype=np.int64)
+        present = np.bincount(keys * slots + codes, minlength=(keys.max() + 1) * slots).reshape(-1, slots) > 0
+
+        # Distinct bits summed == bits ORed
+        bit_values = np.array([1 << i for i in range(len(self.channels))], dtype=np.uint64)
+        self.keys = np.flatnonzero(present.any(axis=1)).astype(np.int32)
+        self.masks = (present[self.keys, :-1] * bit_values).sum(axis=1, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):
+        return f"ChannelSegments({len(self):,} customers, {len(self.channels)} channels)"
+
+    def mask_of(self, channels):
+        """Bit mask of some channels (channels without a bit are ignored)"""
+        mask = 0
+        for channel in channels:
+            if channel in self.channels:
+                mask |= 1 << self.channels.index(channel)
+        return np.uint64(mask)
+
+    def all(self):
+        """Every customer of the frame"""
+        return Cohort(self.keys, assume_unique=True)
+
+    def customers(self, include=(), exclude=()):
+        """
+        Customers who ordered through every channel in include and none in exclude
+
+        customers(['POS']) - used POS; customers(['POS', 'Jumbo.ae']) - cross-type;
+        customers(['POS'], exclude=['Jumbo.ae']) - POS without Jumbo.ae
+        """
+        if any(channel not in self.channels for channel in include):
+            return Cohort()
+        need, avoid = self.mask_of(include), self.mask_of(exclude)
+        selected = (self.masks & need) == need
+        if avoid:
+            selected &= (self.masks & avoid) == 0
+        return Cohort(self.keys[selected], assume_unique=True)
+
+    def exactly(self, *channels):
+        """Customers whose orders came through exactly these channels and no other"""
+        if any(channel not in self.channels for channel in channels):
+            return Cohort()
+        return Cohort(self.keys[self.masks == self.mask_of(channels)], assume_unique=True)
+
+    def channel_counts(self):
+        """Number of distinct channels each customer used, aligned with keys"""
+        counts = np.zeros(len(self.masks), dtype=np.int8)
+        for bit in range(len(self.channels)):
+            counts += ((self.masks >> np.uint64(bit)) & np.uint64(1)).astype(np.int8)
+        return counts
+
+    def by_channel_count(self):
+        """dict number of channels used -> Cohort"""
+        counts = self.channel_counts()
+        return {int(n): Cohort(self.keys[counts == n], assume_unique=True) for n in np.unique(counts)}
+
+    def label(self, mask):
+        """'POS + Jumbo.ae' for a mask ('No channel' for 0)"""
+        names = [channel for bit, channel in enumerate(self.channels) if int(mask) >> bit & 1]
+        return ' + '.join(names) if names else 'No channel'
+
+    def combinations(self):
+        """
+        Customers per channel combination
+
+        Returns:
+        DataFrame with Channels, Channel Count and Customers, largest segment first
+        """
+        masks, counts = np.unique(self.masks, return_counts=True)
+        table = pd.DataFrame({
+            'Channels': [self.label(mask) for mask in masks],
+            'Channel Count': [bin(int(mask)).count('1') for mask in masks],
+            'Customers': counts
+        })
+        return table.sort_values(['Customers', 'Channels'], ascending=[False, True], ignore_index=True)
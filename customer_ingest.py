@@ -0,0 +1,427 @@
+import io
+import os
+import json
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from dsr_catalog import get_file_fingerprint
+from report_pipeline.cache import StageCache, code_versions, file_fingerprints, make_key
+
+# Normalized customer order frames and the column mappings live next to the other local caches
+CUSTOMER_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'customer_files')
+COLUMN_MAP_PATH = os.path.join(CUSTOMER_CACHE_DIR, 'column_maps.json')
+
+# Roles resolved for every customer profile workbook
+COLUMN_ROLES = ['email', 'date', 'channel', 'order_type']
+
+
+def list_customer_files(folder_path, skip=None):
+    """
+    Customer profile workbooks directly inside a folder (temporary ~$ files excluded)
+
+    Parameters:
+    folder_path: str - folder to list
+    skip: callable - file_name -> True to leave a file out (optional)
+    """
+    return [os.path.join(folder_path, f) for f in sorted(os.listdir(folder_path))
+            if f.endswith('.xlsx') and not f.startswith('~$') and os.path.isfile(os.path.join(folder_path, f))
+            and not (skip and skip(f))]
+
+
+def find_export_sheet(sheet_names):
+    """First sheet with 'export' in its name (case-insensitive), else the first sheet"""
+    export_sheets = [sheet for sheet in sheet_names if 'export' in sheet.lower()]
+    return export_sheets[0] if export_sheets else sheet_names[0]
+
+
+def resolve_columns(df):
+    """
+    Find the email, date, type (channel) and order type columns of a customer export
+
+    Parameters:
+    df: DataFrame with lower-cased, stripped column names
+
+    Returns:
+    dict role -> column name (None when not found), roles as in COLUMN_ROLES
+    """
+    email_col = None
+    date_col = None
+    channel_col = None
+    order_type_col = None
+
+    # Map column names based on common patterns in the files
+    for col in df.columns:
+        col_lower = col.lower()
+
+        # Email columns
+        if 'customer' in col_lower and 'email' in col_lower:
+            email_col = col
+        elif 'email' in col_lower:
+            email_col = col
+        elif 'customer' in col_lower and 'mail' in col_lower:
+            email_col = col
+        elif col_lower == 'email':
+            email_col = col
+
+        # Date columns
+        if 'order' in col_lower and 'date' in col_lower:
+            date_col = col
+        elif 'transaction' in col_lower and 'date' in col_lower:
+            date_col = col
+        elif 'purchase' in col_lower and 'date' in col_lower:
+            date_col = col
+        elif col_lower == 'date' or col_lower == 'orderdate':
+            date_col = col
+
+        # Type columns (replacing channel columns)
+        if col_lower.strip() == 'type':
+            channel_col = col
+        elif 'sales' in col_lower and 'type' in col_lower:
+            channel_col = col
+        elif 'customer' in col_lower and 'type' in col_lower:
+            channel_col = col
+        elif 'retail' in col_lower and 'type' in col_lower:
+            channel_col = col
+
+        # Order type columns
+        if 'order' in col_lower and 'type' in col_lower:
+            order_type_col = col
+        elif col_lower == 'retailordertype':
+            order_type_col = col
+        elif 'retail' in col_lower and 'type' in col_lower and col_lower != channel_col:
+            order_type_col = col
+        elif 'transaction' in col_lower and 'type' in col_lower:
+            order_type_col = col
+        elif col_lower == 'ordertype':
+            order_type_col = col
+
+    # Fall back to more general searches if the specific patterns didn't match
+    if email_col is None:
+        # First try exact column names that might be email fields
+        exact_email_cols = ['email', 'customeremail', 'customer email', 'mail', 'customer_email']
+        found = False
+        for exact_col in exact_email_cols:
+            matches = [col for col in df.columns if col.lower() == exact_col]
+            if matches:
+                email_col = matches[0]
+                print(f"Using exact match {email_col} as email column")
+                found = True
+                break
+
+        # If still not found, try broader pattern matching
+        if not found:
+            for col in df.columns:
+                col_lower = col.lower()
+                if ('mail' in col_lower or 'customer' in col_lower or 'id' in col_lower) and len(col_lower) > 2:
+                    # Check if column contains email-like values (with @ symbol)
+                    if df[col].astype(str).str.contains('@', na=False).any():
+                        email_col = col
+                        print(f"Using column with @ symbols: {col} as email column")
+                        found = True
+                        break
+
+            # Last resort, try any column with "type" in the name
+            if not found:
+                for col in df.columns:
+                    if 'type' in col.lower() or 'customer' in col.lower():
+                        email_col = col
+                        print(f"Using fallback column: {col} as email column")
+                        break
+
+    if date_col is None:
+        for col in df.columns:
+            col_lower = col.lower()
+            if 'date' in col_lower or 'time' in col_lower or 'day' in col_lower:
+                date_col = col
+                print(f"Using {col} as date column")
+                break
+
+    if channel_col is None:
+        # First try exact columns that might be type fields
+        exact_type_cols = ['type', 'salestype', 'sales type', 'customertype']
+        found = False
+        for exact_col in exact_type_cols:
+            matches = [col for col in df.columns if col.lower() == exact_col]
+            if matches:
+                channel_col = matches[0]
+                print(f"Using exact match {channel_col} as type column")
+                found = True
+                break
+
+        # If still not found, try broader pattern matching
+        if not found:
+            for col in df.columns:
+                col_lower = col.lower()
+                if ('type' in col_lower or 'source' in col_lower or 'medium' in col_lower or
+                        'platform' in col_lower or 'store' in col_lower):
+                    channel_col = col
+                    print(f"Using {col} as type column")
+                    break
+
+            # If still no type, use retailcustomertype if available
+            if not found and 'retailcustomertype' in [c.lower() for c in df.columns]:
+                for col in df.columns:
+                    if col.lower() == 'retailcustomertype':
+                        channel_col = col
+                        print(f"Using {col} as fallback type column")
+                        break
+
+    if order_type_col is None:
+        exact_type_cols = ['ordertype', 'retailordertype', 'ordertype', 'order_type']
+        found = False
+        for exact_col in exact_type_cols:
+            matches = [col for col in df.columns if col.lower() == exact_col]
+            if matches:
+                order_type_col = matches[0]
+                print(f"Using exact match {order_type_col} as order type column")
+                found = True
+                break
+
+        if not found:
+            for col in df.columns:
+                col_lower = col.lower()
+                if ('type' in col_lower or 'status' in col_lower or 'order' in col_lower):
+                    order_type_col = col
+                    print(f"Using {col} as order type column")
+                    break
+
+            # If still no order type, use retailcustomertype if available
+            if not found and channel_col and channel_col.lower() == 'retailcustomertype':
+                order_type_col = channel_col
+                print(f"Using same field for both channel and order type: {order_type_col}")
+
+    return {'email': email_col, 'date': date_col, 'channel': channel_col, 'order_type': order_type_col}
+
+
+def build_customer_frame(df, columns, file_name):
+    """
+    Normalized order frame of one export: customeremail, order_date, month, year,
+    channel, retailordertype and file_name
+
+    Returns:
+    DataFrame, or None if the email column cannot be read or no valid rows remain
+    """
+    email_col, date_col = columns['email'], columns['date']
+    channel_col, order_type_col = columns['channel'], columns['order_type']
+
+    # If channel or order_type is missing, we'll create them with default values
+    missing = []
+    if channel_col is None:
+        missing.append("type")
+        print(f"Warning: Type column not found in {file_name}, will use default value 'UNKNOWN'")
+    if order_type_col is None:
+        missing.append("order type")
+        print(f"Warning: Order type column not found in {file_name}, will use default value 'sales order'")
+    if missing:
+        print(f"Creating default values for missing columns: {', '.join(missing)}")
+
+    new_df = pd.DataFrame()
+    try:
+        new_df['customeremail'] = df[email_col].astype(str)
+    except Exception:
+        print(f"Error extracting email column '{email_col}' from {file_name}")
+        return None
+
+    if date_col:
+        try:
+            new_df['order_date'] = pd.to_datetime(df[date_col], errors='coerce')
+            new_df['month'] = new_df['order_date'].dt.month
+            new_df['year'] = new_df['order_date'].dt.year
+        except Exception:
+            print(f"Error extracting date column '{date_col}' from {file_name}")
+            new_df['order_date'] = None
+
+    # Add channel and order type (with fallback defaults)
+    new_df['channel'] = 'UNKNOWN'
+    if channel_col:
+        try:
+            new_df['channel'] = df[channel_col].astype(str)
+        except Exception:
+            print(f"Error extracting type column '{channel_col}' from {file_name}")
+    new_df['retailordertype'] = 'sales order'
+    if order_type_col:
+        try:
+            new_df['retailordertype'] = df[order_type_col].astype(str)
+        except Exception:
+            print(f"Error extracting order type column '{order_type_col}' from {file_name}")
+
+    new_df['file_name'] = file_name
+    new_df = new_df.dropna(subset=['customeremail', 'channel', 'retailordertype'])
+
+    print(f"Processed {file_name}: Found {len(new_df)} valid records (after filtering for POS/Jumbo.ae types)")
+    if new_df.empty:
+        print(f"Warning: No valid data found in {file_name} after processing and type filtering")
+        return None
+    return new_df
+
+
+def read_customer_file(file_path, known_columns=None):
+    """
+    Read the export sheet of one customer profile workbook into a normalized frame
+
+    The workbook is opened once (sheet names and data from the same ExcelFile).
+
+    Parameters:
+    file_path: str - workbook path
+    known_columns: dict - {'header', 'columns'} remembered for this file; the mapping is
+                   reused while the header is unchanged, otherwise resolved again
+
+    Returns:
+    dict with 'frame' (DataFrame or None), 'sheet', 'header' and 'columns' (role -> column)
+    """
+    file_name = os.path.basename(file_path)
+    result = {'frame': None, 'sheet': None, 'header': None, 'columns': None}
+    if file_name.startswith('~$'):
+        print(f"Skipping temporary file: {file_name}")
+        return result
+
+    try:
+        with pd.ExcelFile(file_path) as excel_file:
+            sheet_name = find_export_sheet(excel_file.sheet_names)
+            if 'export' in sheet_name.lower():
+                print(f"Reading '{sheet_name}' sheet from {file_name}")
+            else:
+                print(f"No 'Export' sheet found, using first sheet '{sheet_name}' from {file_name}")
+            df = excel_file.parse(sheet_name)
+        result['sheet'] = sheet_name
+        print(f"File: {file_name} - Shape: {df.shape}")
+
+        # Convert all column names to strings and lowercase for easier matching
+        df.columns = [str(col).lower().strip() for col in df.columns]
+
+        result['header'] = list(df.columns)
+        if known_columns and known_columns.get('header') == result['header']:
+            columns = known_columns['columns']
+        else:
+            columns = resolve_columns(df)
+        result['columns'] = columns
+
+        print(f"Column mapping for {file_name}:")
+        print(f"  Email: {columns['email']}")
+        print(f"  Date: {columns['date']}")
+        print(f"  Type: {columns['channel']}")
+        print(f"  Order Type: {columns['order_type']}")
+
+        if columns['email'] is None:
+            print(f"Warning: Required email column not found in {file_name}")
+            return result
+
+        result['frame'] = build_customer_frame(df, columns, file_name)
+    except Exception as e:
+        print(f"Error processing file {file_path}: {str(e)}")
+    return result
+
+
+def process_excel_file(file_path):
+    """Process one Excel file and return its normalized frame (None if unusable), uncached"""
+    return read_customer_file(file_path)['frame']
+
+
+def read_customer_file_task(task):
+    """
+    Worker for one workbook (runs inside a separate process); the file's messages are
+    captured and returned so the parent can print them file by file
+
+    Returns:
+    (path, result dict from read_customer_file, log text, seconds taken)
+    """
+    path, known_columns = task
+    start = time.perf_counter()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        result = read_customer_file(path, known_columns)
+    return path, result, log.getvalue(), time.perf_counter() - start
+
+
+def load_column_maps():
+    """Column mappings remembered per file (absolute path -> {'fingerprint', 'sheet', 'header', 'columns'})"""
+    try:
+        with open(COLUMN_MAP_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_column_maps(column_maps):
+    os.makedirs(CUSTOMER_CACHE_DIR, exist_ok=True)
+    temp_path = f"{COLUMN_MAP_PATH}.tmp{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(column_maps, f, indent=1)
+    os.replace(temp_path, COLUMN_MAP_PATH)
+
+
+def load_customer_files(file_paths, max_workers=None, use_cache=True, cache_dir=None):
+    """
+    Normalized order frames of many customer profile workbooks
+
+    Unchanged files (same size and mtime, same reader code) are served from the local
+    cache without opening the workbook; the others are read in parallel, one process
+    per file, and cached for the next run. The resolved column mapping of every file
+    is remembered in column_maps.json.
+
+    Parameters:
+    file_paths: list - workbook paths
+    max_workers: int - pool size, defaults to one worker per file (capped by CPU count)
+    use_cache: bool - reuse / store cached frames
+    cache_dir: str - cache folder, defaults to cache/customer_files
+
+    Returns:
+    dict path -> DataFrame (None for files without usable data), in file_paths order
+    """
+    cache = StageCache(cache_dir or CUSTOMER_CACHE_DIR, enabled=use_cache, max_entries=2)
+    version = code_versions(read_customer_file, resolve_columns, build_customer_frame)
+    column_maps = load_column_maps()
+    start = time.perf_counter()
+
+    results = {}
+    keys = {}
+    pending = []
+    for path in file_paths:
+        abs_path = os.path.abspath(path)
+        keys[path] = (f"file_{make_key(abs_path)}", make_key(abs_path, version, file_fingerprints([path])))
+        hit, result = cache.load(*keys[path])
+        if hit:
+            results[path] = result
+        else:
+            pending.append(path)
+    if len(file_paths) > len(pending):
+        print(f"♻️ Reusing {len(file_paths) - len(pending)} unchanged customer file(s) from the cache")
+
+    def store(path, result, log, seconds):
+        print(log, end='')
+        print(f"✅ Read {os.path.basename(path)} in {seconds:.1f}s")
+        results[path] = result
+        cache.save(*keys[path], result)
+        if result['columns']:
+            column_maps[os.path.abspath(path)] = {
+                'fingerprint': get_file_fingerprint(os.stat(path)),
+                'sheet': result['sheet'],
+                'header': result['header'],
+                'columns': result['columns']
+            }
+
+    tasks = [(path, column_maps.get(os.path.abspath(path))) for path in pending]
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+
+    if tasks and max_workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(read_customer_file_task, task): task for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        store(*future.result())
+                    except Exception as e:
+                        print(f"❌ Error processing {futures[future][0]}: {e}")
+        except Exception as e:
+            print(f"⚠️ Parallel read unavailable ({e}), reading files sequentially...")
+    for task in tasks:
+        if task[0] not in results:
+            store(*read_customer_file_task(task))
+
+    if pending and use_cache:
+        save_column_maps(column_maps)
+    print(f"📁 Loaded {len(file_paths)} customer file(s) ({len(pending)} read) in {time.perf_counter() - start:.1f}s")
+    return {path: results.get(path, {}).get('frame') for path in file_paths}
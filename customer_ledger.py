@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from customer_cohorts import normalize_emails, add_order_periods, period_mask, Cohort
+from customer_ingest import load_customer_files
+from report_pipeline.cache import code_versions, file_fingerprints, make_key, write_frame, read_frame
+
+# The ledger sits next to the cached customer files
+LEDGER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'customer_ledger')
+MANIFEST_NAME = 'manifest.json'
+
+# One ledger row per customer x month x channel x order type of every source file
+LEDGER_KEYS = ['customeremail', 'year', 'month', 'channel', 'retailordertype']
+LEDGER_COLUMNS = LEDGER_KEYS + ['orders', 'first_order', 'last_order', 'first_row']
+
+
+def summarize_orders(df):
+    """
+    Ledger rows of one file's normalized orders (see customer_ingest.build_customer_frame)
+
+    Orders are counted per customer, month, channel and retail order type, keeping the
+    first / last order date and the first row position (used to break ties the way
+    value_counts() on the raw rows would).
+
+    Returns:
+    DataFrame with LEDGER_COLUMNS
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+
+    orders = df[[col for col in ['customeremail', 'order_date', 'channel', 'retailordertype', 'file_name']
+                 if col in df.columns]].copy()
+    orders['customeremail'] = normalize_emails(orders['customeremail'])
+    orders['order_date'] = pd.to_datetime(orders.get('order_date'), errors='coerce')
+    add_order_periods(orders)
+    orders['row'] = np.arange(len(orders))
+
+    return orders.groupby(LEDGER_KEYS, dropna=False, sort=False).agg(
+        orders=('row', 'size'),
+        first_order=('order_date', 'min'),
+        last_order=('order_date', 'max'),
+        first_row=('row', 'min')
+    ).reset_index()[LEDGER_COLUMNS]
+
+
+class CustomerLedger:
+    """
+    Persisted per-customer order history of the customer profile workbooks
+
+    Every source file keeps its own ledger partition (customer x month x channel x order
+    type with order counts and first / last order dates), so a new or changed monthly
+    file only summarizes that file; unchanged files are never read again. Queries
+    combine the partitions of the requested files:
+
+    customers() / cohort()      customers with orders in the selection
+    summary()                   first / last order date, orders and active months per customer
+    counts(column)              orders per customer and channel (or order type)
+    customer_counts(column)     distinct customers per channel (or order type)
+    primary_channels()          most used channel of every customer
+
+    Selections: files=[...] (default: every file in the ledger), year=..., months=...,
+    and column=value filters such as retailordertype='sales order'.
+    """
+
+    def __init__(self, ledger_dir=None):
+        self.ledger_dir = ledger_dir or LEDGER_DIR
+        self.version = code_versions(summarize_orders, add_order_periods, normalize_emails)
+        self.manifest = self.load_manifest()
+        self.partitions = {}
+
+    def __len__(self):
+        return len(self.manifest)
+
+    def __repr__(self):
+        return f"CustomerLedger({len(self)} files in {self.ledger_dir})"
+
+    def load_manifest(self):
+        """Source files in the ledger: absolute path -> {'fingerprint', 'version', 'frame', 'rows'}"""
+        try:
+            with open(os.path.join(self.ledger_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        os.makedirs(self.ledger_dir, exist_ok=True)
+        path = os.path.join(self.ledger_dir, MANIFEST_NAME)
+        temp_path = f"{path}.tmp{os.getpid()}"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(temp_path, path)
+
+    def is_current(self, path):
+        """True when the ledger holds this file at its current size / mtime and ledger code"""
+        entry = self.manifest.get(os.path.abspath(path))
+        return (entry is not None and entry['version'] == self.version
+                and entry['fingerprint'] == file_fingerprints([path])[0][1])
+
+    def update(self, file_paths, frames=None):
+        """
+        Add new source files and refresh changed ones
+
+        Parameters:
+        file_paths: list - customer profile workbooks
+        frames: dict - path -> normalized frame already loaded (load_customer_files());
+                files missing from it are loaded when they need summarizing
+
+        Returns:
+        list of the paths that were (re)summarized
+        """
+        start = time.perf_counter()
+        stale = [path for path in file_paths if not self.is_current(path)]
+        frames = frames or {}
+        to_load = [path for path in stale if path not in frames]
+        if to_load:
+            frames = {**frames, **load_customer_files(to_load)}
+
+        for path in stale:
+            abs_path = os.path.abspath(path)
+            ledger_rows = summarize_orders(frames[path])
+            os.makedirs(self.ledger_dir, exist_ok=True)
+            base = os.path.join(self.ledger_dir, f"file_{make_key(abs_path)}")
+            for extension in ('.parquet', '.pkl'):
+                if os.path.exists(base + extension):
+                    os.remove(base + extension)
+            self.manifest[abs_path] = {
+                'fingerprint': file_fingerprints([path])[0][1],
+                'version': self.version,
+                'frame': write_frame(ledger_rows, base),
+                'rows': len(ledger_rows)
+            }
+            self.partitions[abs_path] = ledger_rows
+        if stale:
+            self.save_manifest()
+
+        print(f"📒 Customer ledger: {len(stale)} file(s) added or updated, "
+              f"{len(file_paths) - len(stale)} unchanged ({time.perf_counter() - start:.1f}s)")
+        return stale
+
+    def remove(self, file_paths):
+        """Drop source files (e.g. deleted workbooks) from the ledger"""
+        for path in file_paths:
+            entry = self.manifest.pop(os.path.abspath(path), None)
+            self.partitions.pop(os.path.abspath(path), None)
+            if entry and os.path.exists(os.path.join(self.ledger_dir, entry['frame'])):
+                os.remove(os.path.join(self.ledger_dir, entry['frame']))
+        self.save_manifest()
+
+    def partition(self, path):
+        """Ledger rows of one source file"""
+        abs_path = os.path.abspath(path)
+        if abs_path not in self.partitions:
+            if abs_path not in self.manifest:
+                raise KeyError(f"{path} is not in the customer ledger (run update() first)")
+            self.partitions[abs_path] = read_frame(os.path.join(self.ledger_dir, self.manifest[abs_path]['frame']))
+        return self.partitions[abs_path]
+
+    def entries(self, files=None, year=None, months=None, **equals):
+        """
+        Ledger rows of a selection
+
+        Parameters:
+        files: list - source files (default: every file in the ledger), in query order
+        year / months: orders of a year, optionally only some months (as period_mask())
+        equals: column=value filters, e.g. channel='POS'
+
+        Returns:
+        DataFrame with LEDGER_COLUMNS, file_order (position of the file in files) and
+        customer_key (int32 code of customeremail, numbered in order of appearance)
+        """
+        paths = list(self.manifest) if files is None else files
+        parts = [self.partition(path).assign(file_order=position) for position, path in enumerate(paths)]
+        entries = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=LEDGER_COLUMNS + ['file_order'])
+        if year is not None:
+            entries = entries[period_mask(entries, year, months)]
+        for column, value in equals.items():
+            entries = entries[entries[column] == value]
+        # Emails are hashed once per query; the counts below group on the int codes
+        return entries.assign(customer_key=pd.factorize(entries['customeremail'])[0].astype(np.int32))
+
+    def customers(self, **selection):
+        """Emails of the customers with orders in a selection"""
+        entries = self.entries(**selection)
+        first_rows = np.unique(entries['customer_key'].to_numpy(), return_index=True)[1]
+        return pd.Index(entries['customeremail'].to_numpy()[first_rows], dtype=object)
+
+    def cohort(self, customer_keys, **selection):
+        """Cohort (customer keys from a CustomerKeys dictionary) of a selection"""
+        return Cohort(customer_keys.encode(pd.Series(self.customers(**selection), dtype=object), normalized=True))
+
+    def summary(self, **selection):
+        """
+        One row per customer: first_order, last_order, orders and active_months
+
+        Returns:
+        DataFrame indexed by customeremail
+        """
+        entries = self.entries(**selection)
+        summary = entries.groupby('customeremail').agg(
+            first_order=('first_order', 'min'),
+            last_order=('last_order', 'max'),
+            orders=('orders', 'sum')
+        )
+        summary['active_months'] = entries.drop_duplicates(['customeremail', 'year', 'month']) \
+            .groupby('customeremail').size()
+        return summary
+
+    def counts(self, column='channel', **selection):
+        """Orders per customer (rows) and channel / order type (columns)"""
+        return self.entries(**selection).pivot_table(index='customeremail', columns=column, values='orders',
+                                                     aggfunc='sum', fill_value=0)
+
+    def customer_counts(self, column='channel', **selection):
+        """Distinct customers per channel / order type"""
+        return self.entries(**selection).groupby(column)['customer_key'].nunique().rename('customeremail')
+
+    def primary_channels(self, column='channel', **selection):
+        """
+        Most used channel of every customer in a selection
+
+        Ties go to the channel seen first (file order, then row order), as
+        value_counts().index[0] on the raw order rows.
+
+        Returns:
+        Series customeremail -> channel
+        """
+        entries = self.entries(**selection)
+        if entries.empty:
+            return pd.Series(dtype=object, name=column)
+        entries = entries.assign(seen=entries['file_order'].astype(np.int64) * (int(entries['first_row'].max()) + 1)
+                                 + entries['first_row'].astype(np.int64))
+        totals = entries.groupby(['customer_key', column], sort=False).agg(orders=('orders', 'sum'),
+                                                                          seen=('seen', 'min')).reset_index()
+        primary = totals.sort_values(['orders', 'seen'], ascending=[False, True]).drop_duplicates('customer_key')
+        emails = entries['customeremail'].to_numpy()[np.unique(entries['customer_key'].to_numpy(), return_index=True)[1]]
+        return pd.Series(primary[column].to_numpy(), index=pd.Index(emails[primary['customer_key'].to_numpy()],
+                                                                     name='customeremail'), name=column)
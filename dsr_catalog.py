@@ -0,0 +1,306 @@
+import os
+import re
+import json
+import time
+import hashlib
+import calendar
+from openpyxl import load_workbook
+
+# Catalog files live next to the other local caches
+catalog_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'dsr_catalog')
+
+# File roles recognised from the file name (first keyword that matches wins)
+ROLE_KEYWORDS = {
+    'invoice': 'invoice',
+    'target': 'target',
+    'traffic': 'traffic'
+}
+
+# Month folders look like "June-2025"
+MONTH_FOLDER_PATTERN = re.compile(r'^([A-Za-z]+)-(\d{4})$')
+
+# In-process copies of the catalogs, so repeated lookups do not re-walk the tree
+_catalogs = {}
+
+# (root, folder) pairs whose files were re-stated in this process; after that a folder
+# is only scanned again when its directory mtime changes (a file added, removed or
+# saved over through a rename, as Excel does)
+_verified_folders = set()
+
+
+def get_catalog_path(dsr_root):
+    """Get the catalog file path for a DSR root folder"""
+    root_hash = hashlib.md5(os.path.abspath(dsr_root).lower().encode('utf-8')).hexdigest()[:12]
+    return os.path.join(catalog_folder, f"dsr_catalog_{root_hash}.json")
+
+
+def get_file_fingerprint(stat_result):
+    """Fingerprint a file from its size and modification time"""
+    return f"{stat_result.st_size}-{stat_result.st_mtime_ns}"
+
+
+def get_file_role(file_name):
+    """Classify a DSR file by the keywords in its name (invoice / target / traffic / other)"""
+    lower_name = file_name.lower()
+    for keyword, role in ROLE_KEYWORDS.items():
+        if keyword in lower_name:
+            return role
+    return 'other'
+
+
+def get_folder_period(folder_name):
+    """
+    Parse a month folder name ("June-2025") into a period dict, or None if it is not a month folder
+    """
+    match = MONTH_FOLDER_PATTERN.match(folder_name)
+    if not match:
+        return None
+    month_name = match.group(1).capitalize()
+    if month_name not in calendar.month_name:
+        return None
+    return {'month': month_name, 'year': int(match.group(2)), 'folder': folder_name}
+
+
+def inspect_workbook(file_path):
+    """
+    Read sheet names and row counts from a workbook without loading its cells
+
+    Returns:
+    (sheet_names list, row_counts dict)
+    """
+    sheet_names = []
+    row_counts = {}
+    try:
+        wb = load_workbook(file_path, read_only=True)
+        for ws in wb.worksheets:
+            sheet_names.append(ws.title)
+            row_counts[ws.title] = ws.max_row or 0
+        wb.close()
+    except Exception as e:
+        print(f"⚠️ Could not inspect {os.path.basename(file_path)}: {e}")
+    return sheet_names, row_counts
+
+
+def load_catalog(dsr_root):
+    """Load the saved catalog for a DSR root (empty catalog if none exists)"""
+    catalog_path = get_catalog_path(dsr_root)
+    if os.path.exists(catalog_path):
+        try:
+            with open(catalog_path, 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+            catalog.setdefault('folders', {})
+            return catalog
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable catalog {catalog_path}: {e}")
+    return {'root': os.path.abspath(dsr_root), 'folders': {}, 'files': {}, 'refreshed_at': 0}
+
+
+def save_catalog(catalog):
+    """Save a catalog to the local cache folder"""
+    os.makedirs(catalog_folder, exist_ok=True)
+    with open(get_catalog_path(catalog['root']), 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=1)
+
+
+def get_folder_mtime(folder_path):
+    """Modification time (ns) of a folder, None if it does not exist"""
+    try:
+        return os.stat(folder_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def scan_folder(dsr_root, folder_name, old_files):
+    """
+    Catalog entries of the workbooks in one month folder
+
+    Only new or changed workbooks (by size + mtime fingerprint) are opened to read
+    their sheet names and row counts; the others keep their old entry.
+
+    Returns:
+    (dict relative path -> entry, number of workbooks inspected)
+    """
+    period = get_folder_period(folder_name)
+    files = {}
+    inspected = 0
+    with os.scandir(os.path.join(dsr_root, folder_name)) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.is_file() or not entry.name.endswith('.xlsx') or entry.name.startswith('~$'):
+                continue
+
+            rel_path = os.path.join(folder_name, entry.name)
+            fingerprint = get_file_fingerprint(entry.stat())
+            cached = old_files.get(rel_path)
+            if cached and cached.get('fingerprint') == fingerprint:
+                files[rel_path] = cached
+                continue
+
+            sheet_names, row_counts = inspect_workbook(entry.path)
+            inspected += 1
+            files[rel_path] = {
+                'folder': folder_name,
+                'period': period,
+                'file_name': entry.name,
+                'role': get_file_role(entry.name),
+                'fingerprint': fingerprint,
+                'sheet_names': sheet_names,
+                'row_counts': row_counts
+            }
+    return files, inspected
+
+
+def refresh_folder(dsr_root, folder_name, save=True):
+    """
+    Bring the catalog entries of one month folder up to date
+
+    The folder is skipped while its directory mtime is the one recorded when it was
+    last scanned in this process; otherwise its files are re-stated (and only the
+    changed ones opened). Sibling folders are never touched.
+
+    Returns:
+    (catalog, True if the folder's entries changed)
+    """
+    dsr_root = os.path.abspath(dsr_root)
+    catalog = _catalogs.get(dsr_root) or load_catalog(dsr_root)
+    _catalogs[dsr_root] = catalog
+    folders = catalog.setdefault('folders', {})
+
+    mtime = get_folder_mtime(os.path.join(dsr_root, folder_name))
+    if (dsr_root, folder_name) in _verified_folders and folders.get(folder_name) == mtime:
+        return catalog, False
+
+    old_files = {rel_path: entry for rel_path, entry in catalog['files'].items() if entry['folder'] == folder_name}
+    files, inspected = scan_folder(dsr_root, folder_name, old_files) if mtime is not None else ({}, 0)
+    changed = inspected > 0 or set(files) != set(old_files) or folders.get(folder_name) != mtime
+
+    for rel_path in old_files:
+        del catalog['files'][rel_path]
+    catalog['files'].update(files)
+    if mtime is None:
+        folders.pop(folder_name, None)
+    else:
+        folders[folder_name] = mtime
+    catalog['refreshed_at'] = time.time()
+    _verified_folders.add((dsr_root, folder_name))
+
+    if changed and save:
+        save_catalog(catalog)
+    if inspected or set(files) != set(old_files):
+        print(f"📇 DSR catalog updated: {folder_name} has {len(files)} files ({inspected} inspected)")
+    return catalog, changed
+
+
+def refresh_catalog(dsr_root):
+    """
+    Incrementally refresh the catalog of every month folder of a DSR root
+
+    One stat per folder; only folders whose mtime changed are re-scanned (see
+    refresh_folder). Entries of deleted folders are dropped.
+
+    Parameters:
+    dsr_root: str - DSR folder containing "<Month>-<Year>" sub folders
+
+    Returns:
+    dict catalog with 'root', 'folders' (folder -> mtime), 'files' (keyed by relative path)
+    and 'refreshed_at'
+    """
+    dsr_root = os.path.abspath(dsr_root)
+    catalog = _catalogs.get(dsr_root) or load_catalog(dsr_root)
+    _catalogs[dsr_root] = catalog
+    if not os.path.isdir(dsr_root):
+        print(f"⚠️ DSR folder not found: {dsr_root}")
+        return catalog
+
+    with os.scandir(dsr_root) as entries:
+        folder_names = sorted(entry.name for entry in entries if entry.is_dir())
+    changed = False
+    for folder_name in folder_names:
+        changed = refresh_folder(dsr_root, folder_name, save=False)[1] or changed
+    gone = {entry['folder'] for entry in catalog['files'].values()} - set(folder_names)
+    for folder_name in gone | (set(catalog['folders']) - set(folder_names)):
+        changed = refresh_folder(dsr_root, folder_name, save=False)[1] or changed
+    if changed:
+        save_catalog(catalog)
+    return catalog
+
+
+def get_catalog(dsr_root):
+    """Get the up-to-date catalog of every month folder of a DSR root"""
+    return refresh_catalog(dsr_root)
+
+
+def get_folder_entries(folder_path):
+    """
+    Get the catalog entries of one month folder (only that folder is scanned)
+
+    Returns:
+    list of (absolute path, entry dict)
+    """
+    folder_path = os.path.abspath(folder_path)
+    dsr_root, folder_name = os.path.split(folder_path)
+    if not os.path.isdir(folder_path):
+        return []
+
+    catalog, _ = refresh_folder(dsr_root, folder_name)
+    return [(os.path.join(dsr_root, rel_path), entry)
+            for rel_path, entry in catalog['files'].items()
+            if entry['folder'] == folder_name]
+
+
+def find_catalog_file(folder_path, keyword):
+    """
+    Find a file in a month folder whose name contains the keyword (catalog-backed
+    replacement for find_file_by_keyword)
+    """
+    for path, entry in get_folder_entries(folder_path):
+        if keyword.lower() in entry['file_name'].lower():
+            return path
+    return None
+
+
+def find_catalog_entry(file_path):
+    """Return the catalog entry for a file path (None if it is not under a catalogued folder)"""
+    folder_path = os.path.dirname(os.path.abspath(file_path))
+    file_name = os.path.basename(file_path)
+    for path, entry in get_folder_entries(folder_path):
+        if entry['file_name'] == file_name:
+            return entry
+    return None
+
+
+def get_catalog_sheet_names(file_path):
+    """Sheet names of a workbook from the catalog (falls back to opening it)"""
+    entry = find_catalog_entry(file_path)
+    if entry is not None:
+        return entry['sheet_names']
+    sheet_names, _ = inspect_workbook(file_path)
+    return sheet_names
+
+
+def get_catalog_sheet_with_keyword(file_path, keyword=None):
+    """
+    Get the sheet name containing the keyword, otherwise the first sheet
+    (catalog-backed replacement for get_sheet_name_with_keyword)
+    """
+    sheet_names = get_catalog_sheet_names(file_path)
+    if keyword:
+        for sheet_name in sheet_names:
+            if keyword.lower() in sheet_name.lower():
+                return sheet_name
+    return sheet_names[0] if sheet_names else None
+
+
+def list_catalog_periods(dsr_root, role='invoice'):
+    """
+    List the month folders that contain a file of the given role, oldest first
+
+    Returns:
+    list of period dicts ({'month', 'year', 'folder'})
+    """
+    catalog = get_catalog(dsr_root)
+    periods = {}
+    for entry in catalog['files'].values():
+        if entry['role'] == role and entry['period']:
+            periods[entry['folder']] = entry['period']
+    month_index = {name: i for i, name in enumerate(calendar.month_name)}
+    return sorted(periods.values(), key=lambda p: (p['year'], month_index[p['month']]))
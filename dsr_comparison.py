@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Channel order used by the DSR day report
+DSR_CHANNELS = ['Jumbo.ae', 'EA', 'Total']
+COMPARISON_COLUMNS = ['v/s Target', 'v/s Last Year', 'v/s Last Month']
+
+
+def pct_vs_base(latest, base, decimals=0):
+    """
+    Vectorized percentage difference of latest vs base, rounded to whole percent
+    (or to `decimals` places)
+
+    Zero-base rules (same as the DSR notebook loops):
+    - base == 0 and latest == 0 -> 0
+    - base == 0 and latest != 0 -> inf
+    - otherwise int(round((latest - base) / base * 100))
+    """
+    latest = np.asarray(latest, dtype=float)
+    base = np.asarray(base, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.round((latest - base) / base * 100, decimals)
+    return np.where(base == 0, np.where(latest == 0, 0.0, np.inf), pct)
+
+
+def pct_of_target(latest, target, decimals=0):
+    """
+    Vectorized achievement of latest vs target in whole percent (latest / target * 100)
+    with the same zero-target rules as pct_vs_base
+    """
+    latest = np.asarray(latest, dtype=float)
+    target = np.asarray(target, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.round(latest / target * 100, decimals)
+    return np.where(target == 0, np.where(latest == 0, 0.0, np.inf), pct)
+
+
+def as_whole_percent(values):
+    """
+    Return integer percentages when every value is finite (matches the old list-built
+    columns, which only became float when an inf was present)
+    """
+    values = pd.Series(values)
+    if np.isfinite(values).all():
+        return values.astype('int64')
+    return values
+
+
+def build_channel_day_values(type_frame, channel, all_days):
+    """
+    Align one period's day x TYPE sums to all_days for a channel ('Total' sums all TYPEs)
+    """
+    if channel == 'Total':
+        series = type_frame.sum(axis=1)
+    elif channel in type_frame.columns:
+        series = type_frame[channel]
+    else:
+        series = pd.Series(dtype=float)
+    return series.reindex(all_days, fill_value=0).fillna(0).to_numpy()
+
+
+def build_channel_comparison(type_results, target_sums, all_days, sheet_info, channels=None,
+                             last_month_index=0, last_year_index=1, latest_index=2):
+    """
+    Build the day x channel x period comparison table used by the DSR report
+
+    All periods and the target are aligned on a single day index, and the
+    v/s Target / v/s Last Year / v/s Last Month columns are computed as
+    array operations per channel instead of per-day lookups.
+
+    Parameters:
+    type_results: list - [(sheet_idx, day x TYPE DataFrame), ...] from the invoice load
+    target_sums: DataFrame - day x Channel target sums
+    all_days: list - sorted list of invoice days
+    sheet_info: list - [(path, sheet, display_name), ...]
+    channels: list - channels to include, defaults to ['Jumbo.ae', 'EA', 'Total']
+    last_month_index, last_year_index, latest_index: int - sheet positions of each period
+
+    Returns:
+    DataFrame with a 'Day' column followed by (Channel, Type) MultiIndex columns
+    """
+    channels = channels or DSR_CHANNELS
+    display_names = [display_name for _, _, display_name in sheet_info]
+    subcolumns = display_names[:2] + ['Target'] + [display_names[2]] + COMPARISON_COLUMNS
+    type_frames = dict(type_results)
+
+    columns = {}
+    for channel in channels:
+        period_values = {idx: build_channel_day_values(type_frames[idx], channel, all_days)
+                         for idx in type_frames}
+
+        if channel == 'Total':
+            target_series = target_sums.sum(axis=1)
+        elif channel in target_sums.columns:
+            target_series = target_sums[channel]
+        else:
+            target_series = pd.Series(dtype=float)
+        target_values = target_series.reindex(all_days, fill_value=0).fillna(0).to_numpy()
+
+        latest = period_values[latest_index]
+        comparisons = {
+            'v/s Target': pct_of_target(latest, target_values),
+            'v/s Last Year': pct_vs_base(latest, period_values[last_year_index]),
+            'v/s Last Month': pct_vs_base(latest, period_values[last_month_index])
+        }
+
+        for subcol in subcolumns:
+            if subcol in comparisons:
+                values = as_whole_percent(comparisons[subcol])
+            elif subcol == 'Target':
+                values = target_values
+            else:
+                values = period_values[display_names.index(subcol)]
+            columns[(channel, subcol)] = np.asarray(values)
+
+    final_output = pd.DataFrame(columns)
+    final_output.columns = pd.MultiIndex.from_tuples(final_output.columns, names=['Channel', 'Type'])
+    final_output.insert(0, 'Day', all_days)
+    return final_output
@@ -0,0 +1,110 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from period_set import load_invoice_frame
+
+
+def read_workbook_task(task):
+    """
+    Worker for one workbook read (runs inside a separate process)
+
+    Parameters:
+    task: tuple - (key, path, sheet, kind) where kind is 'invoice' or 'raw'
+
+    Returns:
+    (key, DataFrame, seconds taken)
+    """
+    key, path, sheet, kind = task
+    start = time.perf_counter()
+    if kind == 'invoice':
+        df = load_invoice_frame(path, sheet)
+    else:
+        df = pd.read_excel(path, sheet_name=sheet)
+    return key, df, time.perf_counter() - start
+
+
+def build_load_tasks(sheet_info, target_config=None, session_config=None):
+    """
+    Build the list of read tasks for the invoice periods plus the target and session workbooks
+
+    Parameters:
+    sheet_info: list - [(path, sheet, display_name), ...] from setup_automated_paths()
+    target_config: dict - {'path', 'sheet'} for the target workbook (optional)
+    session_config: dict - {'path', 'sheet'} for the traffic/session workbook (optional)
+
+    Returns:
+    list of (key, path, sheet, kind) tuples, invoices keyed by display name
+    """
+    tasks = [(display_name, path, sheet, 'invoice') for path, sheet, display_name in sheet_info]
+    if target_config:
+        tasks.append(('target', target_config['path'], target_config['sheet'], 'raw'))
+    if session_config:
+        tasks.append(('session', session_config['path'], session_config['sheet'], 'raw'))
+    return tasks
+
+
+def load_period_inputs(sheet_info, target_config=None, session_config=None, max_workers=None, parallel=True):
+    """
+    Read all period invoice files plus the target and session workbooks concurrently
+
+    Each workbook is parsed in its own process, so the wall time is bounded by the
+    largest file instead of the sum of all files. Falls back to sequential reads if
+    a process pool cannot be started (e.g. restricted environments).
+
+    Parameters:
+    sheet_info: list - [(path, sheet, display_name), ...]
+    target_config: dict - {'path', 'sheet'} (optional)
+    session_config: dict - {'path', 'sheet'} (optional)
+    max_workers: int - pool size, defaults to one worker per file (capped by CPU count)
+    parallel: bool - set False to force sequential reads
+
+    Returns:
+    dict keyed by period display name (plus 'target' / 'session'); failed reads are left out
+    """
+    tasks = build_load_tasks(sheet_info, target_config, session_config)
+    if not tasks:
+        return {}
+
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    loaded = {}
+
+    if parallel and max_workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(read_workbook_task, task): task for task in tasks}
+                for future in as_completed(futures):
+                    key, path = futures[future][0], futures[future][1]
+                    try:
+                        key, df, seconds = future.result()
+                        loaded[key] = df
+                        print(f"✅ Loaded {key}: {os.path.basename(path)} ({len(df):,} rows, {seconds:.1f}s)")
+                    except Exception as e:
+                        print(f"❌ Error loading {key} from {path}: {e}")
+        except Exception as e:
+            print(f"⚠️ Parallel load unavailable ({e}), reading files sequentially...")
+            loaded = {}
+            parallel = False
+
+    if not parallel or max_workers <= 1:
+        for task in tasks:
+            try:
+                key, df, seconds = read_workbook_task(task)
+                loaded[key] = df
+                print(f"✅ Loaded {key}: {os.path.basename(task[1])} ({len(df):,} rows, {seconds:.1f}s)")
+            except Exception as e:
+                print(f"❌ Error loading {task[0]} from {task[1]}: {e}")
+
+    print(f"📁 Loaded {len(loaded)}/{len(tasks)} workbooks in {time.perf_counter() - start:.1f}s")
+    return loaded
+
+
+def invoice_frames_in_order(loaded, sheet_info):
+    """
+    Return the invoice frames in sheet_info order (so index 0/1/2 keep their meaning)
+    """
+    return [loaded[display_name] for _, _, display_name in sheet_info if display_name in loaded]
@@ -0,0 +1,502 @@
+import math
+import os
+import re
+import shutil
+import zipfile
+from decimal import Decimal, ROUND_HALF_UP
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import fromstring
+from xml.sax.saxutils import escape
+
+from openpyxl import load_workbook
+from openpyxl.utils import range_boundaries, get_column_letter
+
+# Formula tokens (functions before references, so ROUND( is never read as a cell)
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+    (?P<string>"(?:[^"]|"")*")|
+    (?P<func>[A-Za-z][A-Za-z0-9.]*(?=\())|
+    (?P<bool>TRUE\b|FALSE\b)|
+    (?P<ref>(?:(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)|
+    (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|
+    (?P<op><>|<=|>=|[-+*/^&=<>(),%])
+    )""", re.VERBOSE)
+
+# Cells of a sheet XML part (<c .../> or <c ...>...</c>; cells never nest)
+CELL_RE = re.compile(r'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.DOTALL)
+FORMULA_RE = re.compile(r'<f\b[^>]*?(?:/>|>.*?</f>)', re.DOTALL)
+
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+class ExcelError:
+    """An Excel error value (#DIV/0!, #VALUE!, #NAME? ...), propagated like Excel does"""
+
+    def __init__(self, code):
+        self.code = code
+
+    def __repr__(self):
+        return self.code
+
+
+class FormulaSyntaxError(Exception):
+    pass
+
+
+def round_half_away(value, digits=0):
+    """ROUND() as Excel does it: halves are rounded away from zero (Python's round() rounds to even)"""
+    if not math.isfinite(value):
+        return value
+    # Round the shortest decimal form of the float (what Excel shows), so 1.005 -> 1.01
+    number = Decimal(repr(value))
+    if number.as_tuple().exponent >= -int(digits):
+        return float(value)
+    rounded = float(number.quantize(Decimal(1).scaleb(-int(digits)), rounding=ROUND_HALF_UP))
+    return rounded if rounded else 0.0
+
+
+def to_number(value):
+    """Coerce a cell value for arithmetic (blank -> 0, TRUE -> 1, numeric text -> float)"""
+    if isinstance(value, ExcelError):
+        raise ExcelErrorValue(value)
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ExcelErrorValue(ExcelError('#VALUE!'))
+
+
+class ExcelErrorValue(Exception):
+    """Raised while evaluating to carry an ExcelError up to the formula result"""
+
+    def __init__(self, error):
+        super().__init__(error.code)
+        self.error = error
+
+
+def flatten(values):
+    for value in values:
+        if isinstance(value, list):
+            yield from flatten(value)
+        else:
+            yield value
+
+
+def range_numbers(args):
+    """Numbers of SUM / MIN / MAX / AVERAGE arguments (text and blanks in ranges are skipped)"""
+    numbers = []
+    for arg in args:
+        if isinstance(arg, list):
+            for value in flatten(arg):
+                if isinstance(value, ExcelError):
+                    raise ExcelErrorValue(value)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numbers.append(value)
+        else:
+            numbers.append(to_number(arg))
+    return numbers
+
+
+def excel_average(*args):
+    numbers = range_numbers(args)
+    if not numbers:
+        raise ExcelErrorValue(ExcelError('#DIV/0!'))
+    return sum(numbers) / len(numbers)
+
+
+# Functions with eagerly evaluated arguments (IF / IFERROR are handled lazily by the evaluator)
+FUNCTIONS = {
+    'SUM': lambda *args: sum(range_numbers(args)),
+    'MIN': lambda *args: min(range_numbers(args), default=0),
+    'MAX': lambda *args: max(range_numbers(args), default=0),
+    'AVERAGE': excel_average,
+    'ROUND': lambda value, digits=0: round_half_away(to_number(value), to_number(digits)),
+    'ABS': lambda value: abs(to_number(value)),
+}
+
+
+def tokenize(formula):
+    """Split a formula (without the leading '=') into (kind, text) tokens"""
+    tokens = []
+    position = 0
+    formula = formula.rstrip()
+    while position < len(formula):
+        match = TOKEN_RE.match(formula, position)
+        if not match or match.end() == position:
+            raise FormulaSyntaxError(f"Unexpected text at {formula[position:]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """
+    Recursive descent parser for the formulas the report writers emit
+    (SUM / IF / ROUND over cell references and arithmetic)
+
+    Produces nested tuples: ('num', v), ('str', v), ('bool', v), ('ref', sheet, range),
+    ('neg', node), ('pct', node), ('op', symbol, left, right) and ('func', name, [args]).
+    """
+
+    COMPARISONS = ('=', '<>', '<', '>', '<=', '>=')
+
+    def __init__(self, formula):
+        self.tokens = tokenize(formula)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, text=None):
+        kind, value = self.peek()
+        if kind is None or (text is not None and value != text):
+            raise FormulaSyntaxError(f"Expected {text or 'a value'}, found {value!r}")
+        self.position += 1
+        return kind, value
+
+    def parse(self):
+        node = self.comparison()
+        if self.position != len(self.tokens):
+            raise FormulaSyntaxError(f"Unexpected token {self.peek()[1]!r}")
+        return node
+
+    def binary(self, operand, operators):
+        node = operand()
+        while self.peek()[0] == 'op' and self.peek()[1] in operators:
+            _, symbol = self.take()
+            node = ('op', symbol, node, operand())
+        return node
+
+    def comparison(self):
+        return self.binary(self.concat, self.COMPARISONS)
+
+    def concat(self):
+        return self.binary(self.additive, ('&',))
+
+    def additive(self):
+        return self.binary(self.term, ('+', '-'))
+
+    def term(self):
+        return self.binary(self.power, ('*', '/'))
+
+    def power(self):
+        return self.binary(self.unary, ('^',))
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == 'op' and value in ('-', '+'):
+            self.take()
+            node = self.unary()
+            return ('neg', node) if value == '-' else node
+        node = self.primary()
+        while self.peek() == ('op', '%'):
+            self.take()
+            node = ('pct', node)
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == 'number':
+            return ('num', float(value) if any(ch in value for ch in '.eE') else int(value))
+        if kind == 'string':
+            return ('str', value[1:-1].replace('""', '"'))
+        if kind == 'bool':
+            return ('bool', value == 'TRUE')
+        if kind == 'ref':
+            sheet, _, cells = value.rpartition('!')
+            if sheet.startswith("'"):
+                sheet = sheet[1:-1].replace("''", "'")
+            return ('ref', sheet or None, cells.replace('$', '').upper())
+        if kind == 'func':
+            self.take('(')
+            args = []
+            if self.peek() != ('op', ')'):
+                args.append(self.comparison())
+                while self.peek() == ('op', ','):
+                    self.take()
+                    args.append(self.comparison())
+            self.take(')')
+            return ('func', value.upper(), args)
+        if (kind, value) == ('op', '('):
+            node = self.comparison()
+            self.take(')')
+            return node
+        raise FormulaSyntaxError(f"Unexpected token {value!r}")
+
+
+class FormulaEvaluator:
+    """
+    Evaluate the formulas of an openpyxl workbook in-process
+
+    Referenced formula cells are evaluated on demand and memoised, so every formula
+    is computed once whatever order the sheets are walked in. Unsupported functions
+    give #NAME? like Excel; circular references evaluate to 0.
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.values = {}
+        self._parsed = {}
+        self._in_progress = set()
+        self.unsupported = set()
+
+    def cell_value(self, sheet, coordinate):
+        key = (sheet, coordinate)
+        if key in self.values:
+            return self.values[key]
+        value = self.workbook[sheet][coordinate].value
+        if not (isinstance(value, str) and value.startswith('=')):
+            return value
+        if key in self._in_progress:
+            print(f"⚠️  Circular reference at {sheet}!{coordinate}, using 0")
+            return 0
+        self._in_progress.add(key)
+        try:
+            result = self.evaluate(sheet, value)
+        finally:
+            self._in_progress.discard(key)
+        self.values[key] = result
+        return result
+
+    def evaluate(self, sheet, formula):
+        """
+        Evaluate one formula string in the context of a sheet
+
+        Returns:
+        number, str, bool or ExcelError (a blank result is 0, as in Excel)
+        """
+        node = self._parsed.get(formula)
+        if node is None:
+            try:
+                node = Parser(formula[1:]).parse()
+            except FormulaSyntaxError:
+                return ExcelError('#NAME?')
+            self._parsed[formula] = node
+        try:
+            result = self.eval_node(sheet, node)
+        except ExcelErrorValue as e:
+            return e.error
+        if isinstance(result, list):
+            result = result[0][0] if result and result[0] else None
+        return 0 if result is None else result
+
+    def eval_range(self, sheet, cells):
+        min_col, min_row, max_col, max_row = range_boundaries(cells)
+        return [[self.cell_value(sheet, f"{get_column_letter(col)}{row}") for col in range(min_col, max_col + 1)]
+                for row in range(min_row, max_row + 1)]
+
+    def eval_node(self, sheet, node):
+        kind = node[0]
+        if kind in ('num', 'str', 'bool'):
+            return node[1]
+        if kind == 'ref':
+            ref_sheet = node[1] or sheet
+            if ref_sheet not in self.workbook.sheetnames:
+                raise ExcelErrorValue(ExcelError('#REF!'))
+            if ':' in node[2]:
+                return self.eval_range(ref_sheet, node[2])
+            value = self.cell_value(ref_sheet, node[2])
+            if isinstance(value, ExcelError):
+                raise ExcelErrorValue(value)
+            return value
+        if kind == 'neg':
+            return -to_number(self.scalar(sheet, node[1]))
+        if kind == 'pct':
+            return to_number(self.scalar(sheet, node[1])) / 100
+        if kind == 'op':
+            return self.eval_operator(node[1], self.scalar(sheet, node[2]), self.scalar(sheet, node[3]))
+        return self.eval_function(sheet, node[1], node[2])
+
+    def scalar(self, sheet, node):
+        """Value of a node used as a single value (a range gives its top-left cell)"""
+        value = self.eval_node(sheet, node)
+        if isinstance(value, list):
+            value = value[0][0] if value and value[0] else None
+        return value
+
+    def eval_operator(self, symbol, left, right):
+        if symbol == '&':
+            return ('' if left is None else str(left)) + ('' if right is None else str(right))
+        if symbol in Parser.COMPARISONS:
+            if isinstance(left, str) or isinstance(right, str):
+                # Blanks compare as empty text, numbers sort before text (case-insensitive)
+                left, right = [(1, value.lower()) if isinstance(value, str) else
+                               (1, '') if value is None else (0, to_number(value)) for value in (left, right)]
+            else:
+                left, right = to_number(left), to_number(right)
+            return {'=': left == right, '<>': left != right, '<': left < right,
+                    '>': left > right, '<=': left <= right, '>=': left >= right}[symbol]
+        left, right = to_number(left), to_number(right)
+        if symbol == '+':
+            return left + right
+        if symbol == '-':
+            return left - right
+        if symbol == '*':
+            return left * right
+        if symbol == '/':
+            if right == 0:
+                raise ExcelErrorValue(ExcelError('#DIV/0!'))
+            return left / right
+        return left ** right
+
+    def eval_function(self, sheet, name, args):
+        if name == 'IF':
+            condition = self.scalar(sheet, args[0])
+            if isinstance(condition, str):
+                raise ExcelErrorValue(ExcelError('#VALUE!'))
+            if to_number(condition):
+                return self.scalar(sheet, args[1]) if len(args) > 1 else True
+            return self.scalar(sheet, args[2]) if len(args) > 2 else False
+        if name == 'IFERROR':
+            try:
+                return self.scalar(sheet, args[0])
+            except ExcelErrorValue:
+                return self.scalar(sheet, args[1])
+        function = FUNCTIONS.get(name)
+        if function is None:
+            self.unsupported.add(name)
+            raise ExcelErrorValue(ExcelError('#NAME?'))
+        values = [self.eval_node(sheet, arg) for arg in args]
+        if name not in ('SUM', 'MIN', 'MAX', 'AVERAGE'):
+            values = [value[0][0] if isinstance(value, list) else value for value in values]
+        return function(*values)
+
+    def evaluate_workbook(self):
+        """
+        Evaluate every formula cell of the workbook
+
+        Returns:
+        dict of sheet title -> {coordinate: value}
+        """
+        results = {}
+        for ws in self.workbook.worksheets:
+            sheet_values = {}
+            for row in ws.iter_rows():
+                for cell in row:
+                    if isinstance(cell.value, str) and cell.value.startswith('='):
+                        sheet_values[cell.coordinate] = self.cell_value(ws.title, cell.coordinate)
+            if sheet_values:
+                results[ws.title] = sheet_values
+        return results
+
+
+def format_cached_value(value):
+    """Cell type attribute and <v> text of a computed value"""
+    if isinstance(value, ExcelError):
+        return 'e', value.code
+    if isinstance(value, bool):
+        return 'b', '1' if value else '0'
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not math.isfinite(value):
+            return 'e', '#NUM!'
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return None, repr(value) if isinstance(value, float) else str(value)
+    return 'str', escape(str(value))
+
+
+def set_cached_values(sheet_xml, values):
+    """
+    Write computed values next to the formulas of a sheet XML part
+
+    Only formula cells listed in values are touched: their <v> is replaced and the
+    t attribute set to match the value type; everything else is kept byte for byte.
+    """
+    def replace_cell(match):
+        attributes, content = match.group(1), match.group(2)
+        coordinate = re.search(r'\br="([A-Z]+\d+)"', attributes)
+        if content is None or coordinate is None or coordinate.group(1) not in values:
+            return match.group(0)
+        formula = FORMULA_RE.search(content)
+        if formula is None:
+            return match.group(0)
+        cell_type, text = format_cached_value(values[coordinate.group(1)])
+        attributes = re.sub(r'\s+t="[^"]*"', '', attributes)
+        if cell_type:
+            attributes += f' t="{cell_type}"'
+        return f'<c{attributes}>{formula.group(0)}<v>{text}</v></c>'
+
+    return CELL_RE.sub(replace_cell, sheet_xml)
+
+
+def get_sheet_parts(archive):
+    """Map sheet titles to their XML part names inside an xlsx archive"""
+    workbook = fromstring(archive.read('xl/workbook.xml'))
+    relations = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in relations.iter(f'{PACKAGE_REL_NS}Relationship')}
+    parts = {}
+    for sheet in workbook.iter(f'{SHEET_NS}sheet'):
+        target = targets.get(sheet.get(f'{REL_NS}id'), '')
+        parts[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+    return parts
+
+
+def write_cached_values(file_path, results, output_path=None):
+    """
+    Store computed formula values in an xlsx file, keeping the formulas
+
+    openpyxl cannot save a formula together with its value, so the sheet parts are
+    patched directly in a copy of the archive which then replaces the original.
+    """
+    output_path = output_path or file_path
+    temp_path = output_path.replace('.xlsx', '_recalc_tmp.xlsx')
+    with zipfile.ZipFile(file_path) as source, \
+            zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        sheet_parts = get_sheet_parts(source)
+        part_values = {sheet_parts[title]: values for title, values in results.items() if title in sheet_parts}
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename in part_values:
+                data = set_cached_values(data.decode('utf-8'), part_values[item.filename]).encode('utf-8')
+            target.writestr(item, data)
+    os.replace(temp_path, output_path)
+
+
+def recalculate_workbook(file_path, output_path=None):
+    """
+    Recalculate the formulas of a workbook headlessly and save their values in the file
+
+    Replaces opening the report in Excel (win32com) just so that formula totals have
+    cached values: readers using load_workbook(..., data_only=True) then see the
+    results, on any OS and without a desktop session.
+
+    Parameters:
+    file_path: str - xlsx workbook to recalculate
+    output_path: str - where to save, defaults to file_path
+
+    Returns:
+    int number of formulas evaluated
+    """
+    workbook = load_workbook(file_path)
+    try:
+        evaluator = FormulaEvaluator(workbook)
+        results = evaluator.evaluate_workbook()
+    finally:
+        workbook.close()
+
+    if evaluator.unsupported:
+        print(f"⚠️  Unsupported functions left as #NAME?: {', '.join(sorted(evaluator.unsupported))}")
+    if results:
+        write_cached_values(file_path, results, output_path)
+    elif output_path and output_path != file_path:
+        shutil.copyfile(file_path, output_path)
+    return sum(len(values) for values in results.values())
+
+
+def recalculate_workbooks(file_paths, max_workers=None):
+    """
+    Recalculate several workbooks in parallel worker processes
+
+    Returns:
+    dict of file path -> number of formulas evaluated
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(file_paths, executor.map(recalculate_workbook, file_paths)))
@@ -1,130 +1,48 @@
 from graphviz import Digraph
 import os
+import sys
+import json
+import time
+import glob
+import shutil
+import argparse
+import hashlib
+import tempfile
+import textwrap
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Set path to GraphViz executables
-os.environ["PATH"] += os.pathsep + r"C:\Program Files\Graphviz\bin"
-
-# All scenarios and their respective flows
-scenarios = {
-    "Scenario 1: Online Order Fulfilled from Mall Store as Home Delivery": {
-        "Current Flow": [
-            "Customer Placed Online Order",
-            "Customer select Home Delivery",
-            "Order Allocated to mall store & stock reserved in system",
-            "Order shipped and Invoice generated",
-            
-            "Invoice contains Customer Shipping and Billing address",
-            "Post Delivery sales accounted in Mall store"
-        ],
-        "Proposed Flow": [
-            "Customer Placed Online Order",
-            "Customer select Home Delivery",
-            "Order Allocated to mall store & stock virtually transferred to high street store",
-
-            "Order shipped and Invoice generated",
-            "Customer Shipping and Billing address is mentioned on the Invoice",
-            "Post Delivery sales accounted in Highstreet store"
-        ]
-    },
-    "Scenario 2: Online Order Collected from Mall Store by Customer (Click & Collect)": {
-        "Current Flow": [
-            "Customer Placed Online Order",
-            "Customer select Click& Collect method",
-            "Order Allocated to mall store & stock reserved in system",
-
-            "Order shipped and Invoice generated",
-            "Invoice contains Mall Store Shipping and Customer Billing address",
-            "Post collection sales accounted in Mall store"
-        ],
-        "Proposed Flow": [
-            "Customer Placed Online Order",
-            "Customer select Click& Collect method",
-            "Order Allocated to mall store & stock virtually transferred to high street store",
-            "Order shipped and Invoice generated",
-
-            "Invoice contains Highstreet Store Shipping and Customer Billing address",
-            "Post Delivery sales accounted in Highstreet store"
-        ]
-    },
-    "Scenario 3: Endless Aisle - Ordered in Store A, Collected from Mall Store B (Click & Collect)": {
-        "Current Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose store based on availability and place Click & Collect order",
-            "Order Allocated to mall store & stock reserved in system",
-            "Customer collect the order from Mall store and Invoice generated",
-
-            "Invoice contains Mall Store Shipping address and Customer Billing address",
-            "Post collection sales accounted in Mall store"
-        ],
-        "Proposed Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose store based on availability and place Click & Collect order",
-            "Order Allocated to mall store & stock virtually transferred to high street store",
-            "Customer collect the order from Mall store and Invoice generated",
-            "Invoice contains Highstreet Store Shipping and Customer Billing address",
-            "Post collection accounted in Highstreet store"
-        ]
-    },
-    "Scenario 4: Endless Aisle - Ordered & Collected from Same Mall Store (Click & Collect)": {
-        "Current Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose own store and place Click & Collect order",
-            "Order Allocated to mall store & stock reserved in system",
-            "Customer collect the order from same mall store and Invoice generated",
-
-            "Invoice contains Mall Store Shipping address and Customer Billing address",
-            "Post collection sales accounted in Mall store"
-        ],
-        "Proposed Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose own store and place Click & Collect order",
-            "Order Allocated to same mall store & stock virtually transferred to high street store",
-            "Customer collect the order from same mall store and Invoice generated",
-            "Invoice contains Highstreet Store Shipping address and Customer Billing address",
-            "Post collection accounted in Highstreet store"
-        ]
-    },
-    "Scenario 5: Endless Aisle - Ordered in Store A, Delivered from Mall B Store (Home Delivery)": {
-        "Current Flow": [
-            "Mall Store Staff assist customer to place Order",
-            "Choose home delivery option",
-            "Order Allocated to mall store & stock reserved in system",
-            "Order shipped and Invoice generated",
-            "Invoice contains Customer Shipping and Billing address",
-            "Post Delivery sales accounted in Mall store"
-        ],
-        "Proposed Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose home delivery option",
-            "Order Allocated to mall store & stock virtually transferred to high street store",
-            "Order shipped and Invoice generated",
-            "Invoice contains Customer Shipping and Billing address",
-            "Post delivery sales accounted in Highstreet store"
-        ]
-    },
-    "Scenario 6: Endless Aisle - Ordered in Store A, Delivered from Same Mall Store (Home Delivery)": {
-        "Current Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose home delivery option",
-            "Order Allocated to mall store & stock reserved in system",
-            "Order shipped and Invoice generated",
-            "Invoice contains Customer Shipping and Billing address",
-            "Post Delivery sales accounted in Mall store"
-        ],
-        "Proposed Flow": [
-            "Store Staff assist customer to place Order",
-            "Choose home delivery option",
-            "Order Allocated to mall store & stock virtually transferred to high street store",
-            "Order shipped and Invoice generated",
-            "Invoice contains Customer Shipping and Billing address",
-            "Post delivery sales accounted in Highstreet store"
-        ]
-    }
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# Default Windows install of the GraphViz executables (override with GRAPHVIZ_BIN)
+GRAPHVIZ_BIN = r"C:\Program Files\Graphviz\bin"
+
+# Fulfilment-flow catalogue rendered when no scenario file is given
+DEFAULT_SCENARIO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flowchart_scenarios.json")
+SCENARIO_EXTENSIONS = ('.json', '.yaml', '.yml')
+FLOWS = ('Current Flow', 'Proposed Flow')
+
+OUTPUT_DIR = "flowcharts"
+# DOT hash of every rendered file, so unchanged scenarios are not rendered again
+RENDER_MANIFEST = ".render_manifest.json"
+# Raster formats are rendered at this dpi; SVG keeps its natural (vector) size
+RASTER_DPI = '300'
+VECTOR_FORMATS = ('svg', 'pdf')
+# DOT files handed to one GraphViz process
+BATCH_SIZE = 50
+
+# Cluster and node colours of each flow: (cluster prefix, node prefix, label, font / edge colour, cluster fill, node fill)
+FLOW_STYLES = {
+    'Proposed Flow': ('proposed', 'P', 'PROPOSED FLOW', '#006633', '#F0FFF0', '#E6FFE6'),
+    'Current Flow': ('current', 'C', 'CURRENT FLOW', '#0066CC', '#F0F8FF', '#E6F3FF'),
 }
 
 def wrap_text(text, width):
     """Wrap text to fit in nodes better with more square proportions"""
-    import textwrap
     lines = textwrap.wrap(text, width=width)
     return '\\n'.join(lines)
 
@@ -139,71 +57,325 @@ def calculate_spacing(flow_steps, width_constraint=16):
     else:
         return "1.2"  # Larger spacing for concise scenarios
 
-# Create left-to-right flowcharts for each scenario with better readability
-def create_flowcharts(scenarios):
-    for scenario, flows in scenarios.items():
-        dot = Digraph(comment=scenario, format='png')
-        
-        # Calculate appropriate spacing based on content length
-        current_ranksep = calculate_spacing(flows['Current Flow'])
-        proposed_ranksep = calculate_spacing(flows['Proposed Flow'])
-        
-        # Use the smaller of the two to ensure both flows fit well
-        ranksep = min(current_ranksep, proposed_ranksep)
-        
-        dot.attr(rankdir='LR', size='16,8', dpi='300', bgcolor='white', 
+def add_graphviz_to_path(bin_dir=None):
+    """Put the GraphViz executables on PATH when their folder exists and is not there yet"""
+    bin_dir = bin_dir or os.environ.get("GRAPHVIZ_BIN", GRAPHVIZ_BIN)
+    if os.path.isdir(bin_dir) and bin_dir not in os.environ.get("PATH", "").split(os.pathsep):
+        os.environ["PATH"] += os.pathsep + bin_dir
+
+def scenario_filename(scenario):
+    """File name (without extension) of a scenario's flowchart"""
+    # Clean up the filename - replace problematic characters
+    return scenario.replace(":", "").replace(",", "").replace("–", "-").replace("&", "and").replace(" ", "_")
+
+def read_scenario_file(path):
+    """
+    Scenarios of one JSON or YAML file: {title: {'Current Flow': [...], 'Proposed Flow': [...]}}
+
+    Returns:
+    dict title -> flows, in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            if not YAML_AVAILABLE:
+                raise ImportError(f"PyYAML is needed to read {path} (pip install pyyaml), or use a JSON file")
+            scenarios = yaml.safe_load(f) or {}
+        else:
+            scenarios = json.load(f)
+
+    if not isinstance(scenarios, dict):
+        raise ValueError(f"{path}: expected a mapping of scenario title -> flows")
+    for title, flows in scenarios.items():
+        for flow in FLOWS:
+            steps = flows.get(flow) if isinstance(flows, dict) else None
+            if not isinstance(steps, list) or not all(isinstance(step, str) for step in steps):
+                raise ValueError(f"{path}: scenario '{title}' needs a '{flow}' list of steps")
+    return scenarios
+
+def load_scenarios(paths):
+    """
+    Scenario catalogue of several files and / or folders (every .json / .yaml / .yml file
+    below a folder, in name order)
+
+    Titles must be unique across the catalogue, and so must the file names they map to,
+    otherwise one flowchart would overwrite another.
+
+    Parameters:
+    paths: str or list - scenario files or folders
+
+    Returns:
+    dict title -> flows
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(file for file in glob.glob(os.path.join(path, '**', '*'), recursive=True)
+                            if file.lower().endswith(SCENARIO_EXTENSIONS))
+        else:
+            files.append(path)
+
+    scenarios, sources, file_names = {}, {}, {}
+    for file in files:
+        for title, flows in read_scenario_file(file).items():
+            if title in scenarios:
+                raise ValueError(f"Scenario '{title}' is defined in both {sources[title]} and {file}")
+            file_name = scenario_filename(title)
+            if file_name in file_names:
+                raise ValueError(f"Scenarios '{file_names[file_name]}' and '{title}' would both be saved as {file_name}")
+            scenarios[title], sources[title], file_names[file_name] = flows, file, title
+    print(f"📁 Loaded {len(scenarios)} scenario(s) from {len(files)} file(s)")
+    return scenarios
+
+def add_flow_cluster(dot, flow, steps):
+    """Add one flow as a cluster of chained step nodes"""
+    cluster, prefix, label, color, cluster_fill, node_fill = FLOW_STYLES[flow]
+    with dot.subgraph(name=f'cluster_{cluster}') as c:
+        c.attr(label=label, labeljust='l', fontsize='16', fontcolor=color,
+              style='filled', fillcolor=cluster_fill, fontname='Arial Bold', margin='10')
+
+        prev = None
+        for i, step in enumerate(steps):
+            # Node IDs carry the flow prefix, so both clusters can hold the same steps
+            node = f'{prefix}{i}'
+            # Break long text into multiple lines for compact boxes
+            wrapped_text = wrap_text(step, 18)
+            # Calculate node size based on text length
+            text_length = len(step)
+            width = max(1.3, min(2.0, 1.3 + (text_length / 100)))
+            height = max(0.8, min(1.5, 0.8 + (len(wrapped_text.split('\\n')) * 0.15)))
+            c.node(node, wrapped_text, fillcolor=node_fill, style='filled,rounded',
+                  fontsize='12', fontname='Arial', margin='0.15,0.15', width=str(width), height=str(height))
+            if prev:
+                c.edge(prev, node, color=color, penwidth='1.5')
+            prev = node
+
+# Create a left-to-right flowchart for one scenario with better readability
+def build_flowchart(scenario, flows, output_format='png'):
+    dot = Digraph(comment=scenario, format=output_format)
+
+    # Calculate appropriate spacing based on content length
+    current_ranksep = calculate_spacing(flows['Current Flow'])
+    proposed_ranksep = calculate_spacing(flows['Proposed Flow'])
+
+    # Use the smaller of the two to ensure both flows fit well
+    ranksep = min(current_ranksep, proposed_ranksep)
+
+    if output_format in VECTOR_FORMATS:
+        dot.attr(rankdir='LR', size='16,8', bgcolor='white', nodesep='0.4', ranksep=ranksep)
+    else:
+        dot.attr(rankdir='LR', size='16,8', dpi=RASTER_DPI, bgcolor='white',
                  nodesep='0.4', ranksep=ranksep)
-        dot.attr('node', shape='box', style='filled', fontsize='13', fontname='Arial')
-        dot.attr('edge', fontsize='10', fontname='Arial')
-        
-        # Special handling for Scenario 2 - Add a header node for clarity
-        is_scenario_2 = "Scenario 2" in scenario
-        
-        # Proposed Flow section
-        with dot.subgraph(name='cluster_proposed') as c:
-            c.attr(label='PROPOSED FLOW', labeljust='l', fontsize='16', fontcolor='#006633',
-                  style='filled', fillcolor='#F0FFF0', fontname='Arial Bold', margin='10')
-            
-            prev = None
-            for i, step in enumerate(flows['Proposed Flow']):
-                node = f'P{i}'                # Break long text into multiple lines for compact boxes
-                wrapped_text = wrap_text(step, 18)
-                # Calculate node size based on text length
-                text_length = len(step)
-                width = max(1.3, min(2.0, 1.3 + (text_length / 100)))
-                height = max(0.8, min(1.5, 0.8 + (len(wrapped_text.split('\\n')) * 0.15)))
-                c.node(node, wrapped_text, fillcolor='#E6FFE6', style='filled,rounded',
-                      fontsize='12', fontname='Arial', margin='0.15,0.15', width=str(width), height=str(height))
-                if prev:
-                    c.edge(prev, node, color='#006633', penwidth='1.5')
-                prev = node
-                
-        # Current Flow section
-        with dot.subgraph(name='cluster_current') as c:
-            c.attr(label='CURRENT FLOW', labeljust='l', fontsize='16', fontcolor='#0066CC',
-                  style='filled', fillcolor='#F0F8FF', fontname='Arial Bold', margin='10')
-            
-            prev = None
-            for i, step in enumerate(flows['Current Flow']):
-                node = f'C{i}'                # Break long text into multiple lines for compact boxes
-                wrapped_text = wrap_text(step, 18)
-                # Use a different node ID for Scenario 2 to avoid conflicts
-                if is_scenario_2:
-                    node = f'C{i}_current'
-                # Calculate node size based on text length
-                text_length = len(step)
-                width = max(1.3, min(2.0, 1.3 + (text_length / 100)))
-                height = max(0.8, min(1.5, 0.8 + (len(wrapped_text.split('\\n')) * 0.15)))
-                c.node(node, wrapped_text, fillcolor='#E6F3FF', style='filled,rounded', 
-                      fontsize='12', fontname='Arial', margin='0.15,0.15', width=str(width), height=str(height))
-                if prev:
-                    c.edge(prev, node, color='#0066CC', penwidth='1.5')
-                prev = node
-            
-        # Clean up the filename - replace problematic characters
-        filename = scenario.replace(":", "").replace(",", "").replace("–", "-").replace("&", "and").replace(" ", "_")
-        # Save to the flowcharts directory
-        output_path = os.path.join("flowcharts", filename)
-        dot.render(filename=output_path, cleanup=True)
-
-create_flowcharts(scenarios)
+    dot.attr('node', shape='box', style='filled', fontsize='13', fontname='Arial')
+    dot.attr('edge', fontsize='10', fontname='Arial')
+
+    add_flow_cluster(dot, 'Proposed Flow', flows['Proposed Flow'])
+    add_flow_cluster(dot, 'Current Flow', flows['Current Flow'])
+    return dot
+
+def iter_dot_sources(scenarios, output_format='png'):
+    """
+    DOT source of every scenario, built in this process (no GraphViz call)
+
+    Yields:
+    (file name without extension, DOT source)
+    """
+    for scenario, flows in scenarios.items():
+        yield scenario_filename(scenario), build_flowchart(scenario, flows, output_format).source
+
+def write_dot_files(scenarios, output_dir=OUTPUT_DIR, output_format='png'):
+    """
+    Write the .gv source of every scenario (e.g. to render elsewhere or diff in review);
+    files whose content did not change are left untouched
+
+    Returns:
+    list of the files written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for file_name, source in iter_dot_sources(scenarios, output_format):
+        path = os.path.join(output_dir, f"{file_name}.gv")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == source:
+                    continue
+        except OSError:
+            pass
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        written.append(path)
+    print(f"💾 Wrote {len(written)} DOT file(s), {len(scenarios) - len(written)} unchanged, in {output_dir}")
+    return written
+
+def source_hash(source, output_format):
+    """Hash of the DOT source rendered to one format"""
+    return hashlib.sha1(f"{output_format}\n{source}".encode('utf-8')).hexdigest()
+
+def load_render_manifest(output_dir):
+    """Rendered files of a folder: file name -> source_hash() it was rendered from"""
+    try:
+        with open(os.path.join(output_dir, RENDER_MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, RENDER_MANIFEST)
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+def render_batch(batch, output_format, output_dir):
+    """
+    Render several DOT sources with a single GraphViz process
+
+    The sources are written to a scratch folder and passed to one `dot -O` call, which
+    renders every file next to its source; finished files are then moved into place.
+
+    Parameters:
+    batch: list - (output file name, DOT source)
+    output_format: str - GraphViz output format, e.g. 'png' or 'svg'
+    output_dir: str - folder for the rendered files
+
+    Returns:
+    (list of the file names rendered, GraphViz messages)
+    """
+    work_dir = tempfile.mkdtemp(prefix='.render_', dir=output_dir)
+    try:
+        gv_files = []
+        for i, (file_name, source) in enumerate(batch):
+            gv_file = f"{i}.gv"
+            with open(os.path.join(work_dir, gv_file), 'w', encoding='utf-8') as f:
+                f.write(source)
+            gv_files.append(gv_file)
+
+        result = subprocess.run(['dot', f'-T{output_format}', '-O'] + gv_files, cwd=work_dir,
+                                capture_output=True, text=True)
+        rendered = []
+        for gv_file, (file_name, _) in zip(gv_files, batch):
+            output_path = os.path.join(work_dir, f"{gv_file}.{output_format}")
+            if os.path.exists(output_path):
+                os.replace(output_path, os.path.join(output_dir, file_name))
+                rendered.append(file_name)
+        return rendered, result.stderr.strip()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def create_flowcharts(scenarios, formats=('png',), output_dir=OUTPUT_DIR, max_workers=None, force=False,
+                      batch_size=BATCH_SIZE, graphviz_bin=None):
+    """
+    Render the flowchart of every scenario, skipping the ones whose DOT source did not change
+
+    Each scenario's DOT source is hashed and compared with the hash its file was last
+    rendered from (kept in the output folder). The new or changed flowcharts are split
+    into batches of up to batch_size files, each rendered by one GraphViz process, and
+    the batches run concurrently on a thread pool - so a catalogue of hundreds of
+    scenarios costs a handful of process starts rather than one per diagram.
+
+    Parameters:
+    scenarios: dict - scenario title -> {'Current Flow': [...], 'Proposed Flow': [...]}
+    formats: iterable - output formats, e.g. ('png',) or ('png', 'svg')
+    output_dir: str - folder for the rendered files
+    max_workers: int - GraphViz processes running at the same time (default: CPU count)
+    force: bool - render everything even if unchanged
+    batch_size: int - most files rendered by one GraphViz process
+    graphviz_bin: str - folder of the GraphViz executables, when they are not on PATH
+
+    Returns:
+    (list of the files rendered, list of the files that failed)
+    """
+    add_graphviz_to_path(graphviz_bin)
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    manifest = load_render_manifest(output_dir)
+
+    pending = {}
+    for output_format in formats:
+        for file_name, source in iter_dot_sources(scenarios, output_format):
+            file_name = f"{file_name}.{output_format}"
+            digest = source_hash(source, output_format)
+            if not force and manifest.get(file_name) == digest and os.path.exists(os.path.join(output_dir, file_name)):
+                continue
+            pending.setdefault(output_format, []).append((file_name, source, digest))
+
+    total = len(scenarios) * len(formats)
+    jobs = sum(len(format_jobs) for format_jobs in pending.values())
+    if not jobs:
+        print(f"♻️ All {total} flowchart(s) are up to date")
+        return [], []
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # Spread the work over the workers, but never more than batch_size files per process
+    size = max(1, min(batch_size, -(-jobs // max_workers)))
+    batches = [(output_format, format_jobs[i:i + size])
+               for output_format, format_jobs in pending.items() for i in range(0, len(format_jobs), size)]
+
+    rendered, failed = [], []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        futures = {executor.submit(render_batch, [(file_name, source) for file_name, source, _ in batch],
+                                   output_format, output_dir): batch
+                   for output_format, batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                done, messages = future.result()
+            except Exception as e:
+                done, messages = [], str(e)
+            for file_name, _, digest in batch:
+                if file_name in done:
+                    manifest[file_name] = digest
+                    rendered.append(os.path.join(output_dir, file_name))
+                else:
+                    failed.append(os.path.join(output_dir, file_name))
+                    print(f"❌ Error rendering {file_name}")
+            if done:
+                print(f"✅ Rendered {len(done)} flowchart(s): {', '.join(done) if len(done) <= 3 else done[0] + ', ...'}")
+            if messages:
+                print(f"⚠️ GraphViz: {messages}")
+
+    save_render_manifest(output_dir, manifest)
+    print(f"⏱️ Rendered {len(rendered)} of {total} flowchart(s) ({total - jobs} unchanged, {len(failed)} failed) "
+          f"in {time.perf_counter() - start:.1f}s using {len(batches)} GraphViz process(es)")
+    return rendered, failed
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='graph', description='Render the current / proposed fulfilment flowcharts')
+    parser.add_argument('sources', nargs='*', default=[DEFAULT_SCENARIO_FILE],
+                        help=f"scenario files (.json / .yaml) or folders of them (default: {os.path.basename(DEFAULT_SCENARIO_FILE)})")
+    parser.add_argument('--format', dest='formats', action='append', default=[],
+                        help="output format such as png or svg; repeat or comma-separate for several (default: png)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f"folder for the flowcharts (default: {OUTPUT_DIR})")
+    parser.add_argument('--workers', type=int, help='GraphViz processes running at the same time (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"most flowcharts rendered by one GraphViz process (default: {BATCH_SIZE})")
+    parser.add_argument('--force', action='store_true', help='render every flowchart even if unchanged')
+    parser.add_argument('--dot-only', action='store_true', help='only write the .gv sources (GraphViz not needed)')
+    parser.add_argument('--graphviz-bin', help='folder of the GraphViz executables (default: GRAPHVIZ_BIN or PATH)')
+    return parser
+
+def main(argv=None):
+    """Command line entry point, returns the process exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    formats = [output_format.strip().lower() for value in (args.formats or ['png'])
+               for output_format in value.split(',') if output_format.strip()]
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    try:
+        scenarios = load_scenarios(args.sources)
+    except (OSError, ValueError, ImportError) as e:
+        parser.error(str(e))
+
+    if args.dot_only:
+        write_dot_files(scenarios, args.output_dir, formats[0])
+        return 0
+    _, failed = create_flowcharts(scenarios, formats=formats, output_dir=args.output_dir, max_workers=args.workers,
+                                  force=args.force, batch_size=args.batch_size, graphviz_bin=args.graphviz_bin)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from period_set import REVENUE_COLUMN, load_invoice_frame
+from dsr_comparison import pct_vs_base, pct_of_target
+
+# Sub-columns of every week block of the IDG pivots, in sheet order
+IDG_AMOUNT_COLUMNS = ['last_month', 'last_year', 'Target', 'current']
+IDG_PERCENT_COLUMNS = ['v/s Target %', 'v/s Last Year %', 'v/s Last Month %']
+
+
+def week_numbers(days, first_day_position):
+    """
+    Vectorized get_week_number(): week 1 runs until the first Sunday, then weeks of 7 days
+
+    Parameters:
+    days: array-like of day-of-month numbers
+    first_day_position: int - weekday of the 1st (0 = Monday ... 6 = Sunday)
+
+    Returns:
+    numpy int array of week numbers
+    """
+    days = np.asarray(days, dtype=int)
+    if first_day_position > 0:
+        first_week_days = 7 - first_day_position
+        return np.where(days <= first_week_days, 1, (days - first_week_days - 1) // 7 + 2)
+    return (days - 1) // 7 + 1
+
+
+def build_idg_week_sums(sheet_info, max_invoice_day, first_day_position, frames=None):
+    """
+    Sum revenue by period x TYPE x idg x week, reading every period workbook once
+
+    This single aggregate feeds the overall, EA and Jumbo.ae IDG pivots, so the
+    invoice files are not re-read and re-filtered for each TYPE.
+
+    Parameters:
+    sheet_info: list - [(path, sheet, display_name), ...]
+    max_invoice_day: int - last invoice day of the latest period (later days are dropped)
+    first_day_position: int - weekday of the 1st of the month (0 = Monday)
+    frames: dict - display_name -> already loaded invoice frame (e.g. from load_period_inputs)
+
+    Returns:
+    DataFrame with Period, TYPE, idg, WeekNumber and revenue columns
+    """
+    frames = frames or {}
+    parts = []
+    for path, sheet, display_name in sheet_info:
+        df = frames.get(display_name)
+        if df is None:
+            df = load_invoice_frame(path, sheet)
+
+        in_range = df['InvoiceDay'] <= max_invoice_day
+        print(f"📉 {display_name}: Filtered {int((~in_range).sum())} rows with InvoiceDay > {max_invoice_day}")
+        df = df.loc[in_range, ['TYPE', 'idg', 'InvoiceDay', REVENUE_COLUMN]]
+
+        sums = (df.assign(WeekNumber=week_numbers(df['InvoiceDay'], first_day_position))
+                .groupby(['TYPE', 'idg', 'WeekNumber'], dropna=False)[REVENUE_COLUMN].sum()
+                .reset_index())
+        parts.append(sums[sums['idg'].notna()].assign(Period=display_name))
+
+    if not parts:
+        return pd.DataFrame(columns=['Period', 'TYPE', 'idg', 'WeekNumber', REVENUE_COLUMN])
+    return pd.concat(parts, ignore_index=True)
+
+
+def build_target_by_week(target_df, max_invoice_day, first_day_position, channel_filter=None):
+    """
+    Sum the target sheet by week x IDG (Category, or Channel when there is no Category)
+
+    Parameters:
+    target_df: DataFrame - raw target sheet with Date (day of month), Channel and Target
+    max_invoice_day: int - last day to keep
+    first_day_position: int - weekday of the 1st of the month (0 = Monday)
+    channel_filter: str - 'Jumbo.ae' or 'EA' to keep one channel, None for all
+
+    Returns:
+    DataFrame with weeks as index and IDGs as columns (empty if nothing matches)
+    """
+    if channel_filter:
+        target_df = target_df[target_df['Channel'] == channel_filter]
+    days = pd.to_numeric(target_df['Date'], errors='coerce')
+    in_range = days.notna() & (days <= max_invoice_day)
+    if not in_range.any():
+        return pd.DataFrame()
+
+    target_df = target_df[in_range]
+    idg_column = 'Category' if 'Category' in target_df.columns else 'Channel'
+    weeks = week_numbers(days[in_range], first_day_position)
+    target_by_week = (target_df.assign(WeekNumber=weeks)
+                      .groupby(['WeekNumber', idg_column])['Target'].sum()
+                      .unstack(level=idg_column, fill_value=0))
+    target_by_week.columns.name = None
+    return target_by_week
+
+
+def build_idg_pivot(week_sums, last_month, last_year, current, target_by_week=None, type_filter=None,
+                    week_label=lambda week: f"Week {week}"):
+    """
+    Build the IDG x (week, period) pivot with Target, comparison % and Total blocks
+
+    Every cell is computed with array operations on idg x week matrices. Comparison
+    rules match the notebook loops: IDG rows give inf when the base is 0 (0 if the
+    current value is 0 too), the Total row gives 0 when the base is 0.
+
+    Parameters:
+    week_sums: DataFrame - output of build_idg_week_sums()
+    last_month, last_year, current: str - period display names
+    target_by_week: DataFrame - week x IDG targets (may be empty)
+    type_filter: str - TYPE to keep ('EA', 'Jumbo.ae') or None for all
+    week_label: callable(week) -> column label
+
+    Returns:
+    (DataFrame, list of IDGs, max week number)
+    """
+    sums = week_sums if type_filter is None else week_sums[week_sums['TYPE'] == type_filter]
+    by_period = sums.groupby(['Period', 'idg', 'WeekNumber'])[REVENUE_COLUMN].sum()
+    target_by_week = target_by_week if target_by_week is not None else pd.DataFrame()
+
+    all_idgs = set(sums['idg'])
+    if not target_by_week.empty:
+        all_idgs.update(target_by_week.columns)
+    all_idgs = sorted(all_idgs)
+
+    max_week = max([1] + [int(week) for week in sums['WeekNumber']] +
+                   ([int(week) for week in target_by_week.index] if not target_by_week.empty else []))
+    weeks = list(range(1, max_week + 1))
+
+    def idg_week_matrix(period):
+        if period not in by_period.index.get_level_values('Period'):
+            return np.zeros((len(all_idgs), len(weeks)))
+        grid = by_period.xs(period, level='Period').unstack('WeekNumber', fill_value=0)
+        return grid.reindex(index=all_idgs, columns=weeks, fill_value=0).to_numpy(dtype=float)
+
+    amounts = {
+        'last_month': idg_week_matrix(last_month),
+        'last_year': idg_week_matrix(last_year),
+        'current': idg_week_matrix(current),
+        'Target': (target_by_week.T.reindex(index=all_idgs, columns=weeks, fill_value=0).fillna(0).to_numpy(dtype=float)
+                   if not target_by_week.empty else np.zeros((len(all_idgs), len(weeks))))
+    }
+    # Add the Total week column, then the Total row (column sums)
+    amounts = {key: np.column_stack([values, values.sum(axis=1)]) for key, values in amounts.items()}
+    amounts = {key: np.vstack([values, values.sum(axis=0)]) for key, values in amounts.items()}
+
+    percents = {
+        'v/s Target %': pct_of_target(amounts['current'], amounts['Target'], decimals=2),
+        'v/s Last Year %': pct_vs_base(amounts['current'], amounts['last_year'], decimals=2),
+        'v/s Last Month %': pct_vs_base(amounts['current'], amounts['last_month'], decimals=2)
+    }
+    bases = {'v/s Target %': 'Target', 'v/s Last Year %': 'last_year', 'v/s Last Month %': 'last_month'}
+    for column, base in bases.items():
+        percents[column][-1] = np.where(amounts[base][-1] == 0, 0.0, percents[column][-1])
+
+    blocks = [amounts[key] for key in IDG_AMOUNT_COLUMNS] + [percents[key] for key in IDG_PERCENT_COLUMNS]
+    values = np.stack(blocks, axis=2).reshape(len(all_idgs) + 1, -1)
+
+    period_names = {'last_month': last_month, 'last_year': last_year, 'current': current}
+    subcolumns = [period_names.get(key, key) for key in IDG_AMOUNT_COLUMNS] + IDG_PERCENT_COLUMNS
+    week_labels = [week_label(week) for week in weeks] + ['Total']
+    columns = pd.MultiIndex.from_product([week_labels, subcolumns], names=['Week', 'Period'])
+
+    final_df = pd.DataFrame(values, index=all_idgs + ['Total'], columns=columns)
+    return final_df, all_idgs, max_week
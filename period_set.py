@@ -0,0 +1,357 @@
+import os
+import calendar
+import pandas as pd
+import numpy as np
+
+from dsr_catalog import find_catalog_file, get_catalog_sheet_with_keyword
+
+# Revenue / quantity columns shared by the invoice-based reports
+REVENUE_COLUMN = 'Amount Invoiced W.O. VAT'
+QTY_COLUMN = 'QtyOrdered'
+EXCLUDED_IDGS = ['FOC', 'Remove', 'WRT']
+
+# Standard three-period roles used by the dashboard and the DSR notebooks
+STANDARD_ROLES = ['last_month', 'last_year', 'latest']
+
+
+def parse_month_year(month_year):
+    """
+    Parse a month-year string (e.g., 'June-2025') into (month_num, year)
+    """
+    month_name, year = month_year.split('-')
+    month_num = list(calendar.month_name).index(month_name.capitalize())
+    return month_num, int(year)
+
+
+def shift_month(month_num, year, months):
+    """
+    Shift a (month_num, year) pair by a number of months (negative = back in time)
+    Returns (month_num, year)
+    """
+    index = year * 12 + (month_num - 1) + months
+    return index % 12 + 1, index // 12
+
+
+def make_period(month_num, year, key=None):
+    """
+    Build a period descriptor in the same shape as get_month_year_combinations()
+
+    Returns:
+    dict with key, month, year, folder ("June-2025") and display ("June 25")
+    """
+    month_name = calendar.month_name[month_num]
+    folder = f"{month_name}-{year}"
+    return {
+        'key': key or folder,
+        'month': month_name,
+        'year': year,
+        'folder': folder,
+        'display': f"{month_name} {year % 100}",
+        'ordinal': year * 12 + month_num - 1
+    }
+
+
+def find_period_file(folder_path, keyword):
+    """
+    Find a file in the folder that contains the keyword in its name
+    (same matching rules as find_file_by_keyword, served from the DSR catalog)
+    """
+    return find_catalog_file(folder_path, keyword)
+
+
+def load_invoice_frame(path, sheet):
+    """
+    Read one invoice sheet and apply the standard invoice clean-up:
+    drop FOC/Remove/WRT idgs, derive InvoiceDay and map CC / jumbo.ae to Jumbo.ae
+    """
+    df = pd.read_excel(path, sheet_name=sheet)
+    filtered_df = df[~df['idg'].isin(EXCLUDED_IDGS)].copy()
+    filtered_df['InvoiceDay'] = pd.to_datetime(filtered_df['InvoiceDate'], dayfirst=True, errors='coerce').dt.day
+    filtered_df['TYPE'] = filtered_df['TYPE'].replace({'CC': 'Jumbo.ae', 'jumbo.ae': 'Jumbo.ae'})
+    return filtered_df
+
+
+def pct_change(current, base):
+    """
+    Vectorized percentage change of current vs base
+
+    Works on scalars, Series or DataFrames. Where the base is zero/negative
+    (or missing) the result is NaN, so callers can decide between 0, "N/A"
+    or "New Product" exactly like the existing per-period code does.
+    """
+    current = current.astype(float) if hasattr(current, 'astype') else float(current)
+    base = base.astype(float) if hasattr(base, 'astype') else float(base)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (current - base) / base * 100
+    if np.isscalar(change):
+        return change if base > 0 else np.nan
+    return change.where(base > 0)
+
+
+class PeriodSet:
+    """
+    An ordered set of month periods (any length) whose invoice frames are loaded
+    lazily and can be stacked into a single period-keyed frame.
+
+    Periods are keyed either by role ('last_month', 'last_year', 'latest') for the
+    classic three-sheet view, or by folder name ('June-2025') for rolling views.
+    """
+
+    def __init__(self, periods, dsr_folder_path=None, keyword='invoice', loader=None):
+        """
+        Parameters:
+        periods: list of dict - period descriptors from make_period()
+        dsr_folder_path: str - DSR root containing one "<Month>-<Year>" folder per month
+        keyword: str - keyword used to locate the file inside each month folder
+        loader: callable(path, sheet) -> DataFrame - defaults to load_invoice_frame
+        """
+        self.periods = list(periods)
+        self.dsr_folder_path = dsr_folder_path
+        self.keyword = keyword
+        self.loader = loader or load_invoice_frame
+        self._frames = {}
+
+    # ------------------------------------------------------------------ #
+    # Constructors
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def standard(cls, latest_month_year, dsr_folder_path=None, **kwargs):
+        """
+        Build the classic last month / last year / latest set for a month-year
+        """
+        month_num, year = parse_month_year(latest_month_year)
+        periods = [
+            make_period(*shift_month(month_num, year, -1), key='last_month'),
+            make_period(*shift_month(month_num, year, -12), key='last_year'),
+            make_period(month_num, year, key='latest')
+        ]
+        return cls(periods, dsr_folder_path, **kwargs)
+
+    @classmethod
+    def rolling(cls, latest_month_year, months=12, dsr_folder_path=None, **kwargs):
+        """
+        Build a rolling window of the last N months ending with latest_month_year
+        (e.g. months=12 or months=24), oldest first
+        """
+        month_num, year = parse_month_year(latest_month_year)
+        periods = [make_period(*shift_month(month_num, year, -offset))
+                   for offset in range(months - 1, -1, -1)]
+        return cls(periods, dsr_folder_path, **kwargs)
+
+    @classmethod
+    def from_sheet_info(cls, sheet_info, frames=None, keys=None, **kwargs):
+        """
+        Wrap an existing sheet_info list [(path, sheet, display_name), ...]
+
+        Parameters:
+        sheet_info: list - as returned by setup_automated_paths()
+        frames: list of DataFrame - already loaded frames in sheet_info order (optional)
+        keys: list of str - period keys, defaults to the standard roles for 3 sheets
+        """
+        if keys is None:
+            keys = STANDARD_ROLES if len(sheet_info) == len(STANDARD_ROLES) else [info[2] for info in sheet_info]
+
+        periods = []
+        for ordinal, ((path, sheet, display_name), key) in enumerate(zip(sheet_info, keys)):
+            periods.append({'key': key, 'display': display_name, 'path': path, 'sheet': sheet,
+                            'ordinal': ordinal})
+
+        period_set = cls(periods, **kwargs)
+        if frames is not None:
+            for period, frame in zip(period_set.periods, frames):
+                period_set._frames[period['key']] = frame
+        return period_set
+
+    # ------------------------------------------------------------------ #
+    # Lookup / loading
+    # ------------------------------------------------------------------ #
+    @property
+    def keys(self):
+        return [period['key'] for period in self.periods]
+
+    @property
+    def display_names(self):
+        return [period['display'] for period in self.periods]
+
+    def period(self, key):
+        """Return the descriptor for a period key or display name"""
+        for period in self.periods:
+            if key in (period['key'], period['display']):
+                return period
+        raise KeyError(f"Unknown period: {key}")
+
+    def display(self, key):
+        return self.period(key)['display']
+
+    def resolve_path(self, key):
+        """
+        Resolve (path, sheet) for a period, locating the file in its month folder if needed
+        """
+        period = self.period(key)
+        if period.get('path'):
+            return period['path'], period.get('sheet')
+
+        if self.dsr_folder_path is None:
+            raise ValueError("dsr_folder_path is required to resolve month folders")
+
+        folder_path = os.path.join(self.dsr_folder_path, period['folder'])
+        path = find_period_file(folder_path, self.keyword)
+        if path is None:
+            return None, None
+
+        period['path'] = path
+        if period.get('sheet') is None:
+            period['sheet'] = get_catalog_sheet_with_keyword(path) or 'Sheet1'
+        return period['path'], period['sheet']
+
+    def frame(self, key):
+        """
+        Lazily load and return the frame for one period (empty frame if the file is missing)
+        """
+        period = self.period(key)
+        if period['key'] not in self._frames:
+            path, sheet = self.resolve_path(period['key'])
+            if path is None:
+                print(f"⚠️ No {self.keyword} file found for {period['display']}")
+                self._frames[period['key']] = pd.DataFrame()
+            else:
+                print(f"📁 Loading {period['display']}: {path} -> {sheet}")
+                self._frames[period['key']] = self.loader(path, sheet)
+        return self._frames[period['key']]
+
+    def frames(self):
+        """Return all period frames in order (loading any that are not loaded yet)"""
+        return [self.frame(key) for key in self.keys]
+
+    def load_all(self, max_workers=None):
+        """
+        Load every period that is not loaded yet in parallel (one process per file)
+        """
+        from dsr_loader import load_period_inputs
+
+        pending = []
+        for key in self.keys:
+            if key in self._frames:
+                continue
+            path, sheet = self.resolve_path(key)
+            if path is None:
+                print(f"⚠️ No {self.keyword} file found for {self.display(key)}")
+                self._frames[key] = pd.DataFrame()
+            else:
+                pending.append((path, sheet, key))
+
+        if pending and self.loader is load_invoice_frame:
+            loaded = load_period_inputs(pending, max_workers=max_workers)
+            for _, _, key in pending:
+                self._frames[key] = loaded.get(key, pd.DataFrame())
+        return self.frames()
+
+    def available_keys(self):
+        """Keys of the periods that actually have data"""
+        return [key for key in self.keys if not self.frame(key).empty]
+
+    # ------------------------------------------------------------------ #
+    # Stacked frame and vectorized comparisons
+    # ------------------------------------------------------------------ #
+    def stacked(self, columns=None, mask_fn=None):
+        """
+        Stack all period frames into one frame with an ordered categorical 'Period' column
+
+        Parameters:
+        columns: list - columns to keep (None keeps all)
+        mask_fn: callable(df) -> boolean Series - optional row filter applied per period
+
+        Returns:
+        DataFrame with a 'Period' column holding the period keys
+        """
+        parts = []
+        for key in self.keys:
+            df = self.frame(key)
+            if df.empty:
+                continue
+            if mask_fn is not None:
+                df = df[mask_fn(df)]
+            if columns is not None:
+                df = df[[col for col in columns if col in df.columns]]
+            parts.append(df.assign(Period=key))
+
+        if not parts:
+            return pd.DataFrame(columns=(columns or []) + ['Period'])
+
+        stacked_df = pd.concat(parts, ignore_index=True)
+        stacked_df['Period'] = pd.Categorical(stacked_df['Period'], categories=self.keys, ordered=True)
+        return stacked_df
+
+    def aggregate(self, by=None, values=(REVENUE_COLUMN, QTY_COLUMN), mask_fn=None, stacked_df=None):
+        """
+        Sum values by (by, Period) in one groupby and pivot periods into columns
+
+        Parameters:
+        by: str or list - grouping column(s); None aggregates each period as a whole
+        values: iterable - value columns to sum
+        mask_fn: callable - optional row filter (see stacked())
+        stacked_df: DataFrame - pre-built stacked frame to reuse
+
+        Returns:
+        DataFrame with columns MultiIndex (value, period_key); every period present, missing = 0
+        """
+        values = list(values)
+        if stacked_df is None:
+            keep = values + ([] if by is None else ([by] if isinstance(by, str) else list(by)))
+            stacked_df = self.stacked(columns=keep, mask_fn=mask_fn)
+
+        group_cols = ['Period'] if by is None else ([by] if isinstance(by, str) else list(by)) + ['Period']
+        grouped = stacked_df.groupby(group_cols, observed=False)[values].sum()
+
+        if by is None:
+            wide = grouped.T.stack().to_frame().T
+            wide.index = ['Total']
+        else:
+            wide = grouped.unstack('Period', fill_value=0)
+
+        full_columns = pd.MultiIndex.from_product([values, self.keys], names=[None, 'Period'])
+        return wide.reindex(columns=full_columns, fill_value=0)
+
+    def compare(self, wide, current, base, value=REVENUE_COLUMN):
+        """
+        Percentage change of one period vs another for a value in an aggregate() frame
+        """
+        return pct_change(wide[(value, current)], wide[(value, base)])
+
+    def offset_key(self, key, months):
+        """
+        Key of the period `months` before `key` within this set (None if not present)
+        """
+        period = self.period(key)
+        if 'folder' not in period:
+            return None
+        target = period['ordinal'] - months
+        for candidate in self.periods:
+            if candidate.get('folder') and candidate['ordinal'] == target:
+                return candidate['key']
+        return None
+
+    def comparisons(self, wide, value=REVENUE_COLUMN, lags=None):
+        """
+        Compute MoM / YoY (or any month lag) changes for every period in one vectorized pass
+
+        Parameters:
+        wide: DataFrame - output of aggregate()
+        value: str - value column to compare
+        lags: dict - label -> months back, defaults to {'MoM': 1, 'YoY': 12}
+
+        Returns:
+        DataFrame with columns MultiIndex (label, period_key); NaN where the base is missing or zero
+        """
+        lags = lags or {'MoM': 1, 'YoY': 12}
+        values = wide[value].astype(float)
+        result = {}
+        for label, months in lags.items():
+            base_keys = [self.offset_key(key, months) for key in self.keys]
+            base = pd.DataFrame(
+                {key: (values[base_key] if base_key is not None else np.nan)
+                 for key, base_key in zip(self.keys, base_keys)},
+                index=values.index
+            )
+            result[label] = pct_change(values, base)
+        return pd.concat(result, axis=1, names=[None, 'Period'])
@@ -0,0 +1,203 @@
+from openpyxl.utils import get_column_letter
+
+from report_styles import add_growth_rules
+from pivot_writer import header_spans, column_ranges, write_header_spans, write_value_rows
+
+# Number formats of the IDG sheets: whole numbers in the DSR, two decimals in the weekly reports
+IDG_FORMATS = {
+    'dsr': {'number': '#,##0', 'percent': '0"%"'},
+    'weekly': {'number': '#,##0.00', 'percent': '0.00"%"'}
+}
+
+# Number formats of the sessions sections (the DSR keeps CVR in whole percent, see CVR_SCALE)
+SESSION_FORMATS = {
+    'dsr': {'cvr': '0"%"', 'amount': '#,##0', 'growth': '0"%"', 'count': '#,##0'},
+    'weekly': {'cvr': '0.00%', 'amount': '#,##0.00', 'growth': '0.00"%"', 'count': '#,##0'}
+}
+
+
+def write_idg_value_block(worksheet, start_row, data, column_names, styles, formats):
+    """
+    Write the IDG rows of a pivot as a whole array and colour the % columns
+
+    v/s Target % is green from 100 up, the other v/s % columns are green above 0;
+    the colours are conditional formatting rules, not per-cell fonts.
+
+    Returns:
+    int next free row
+    """
+    is_pct = ['v/s' in name and '%' in name for name in column_names]
+    column_formats = [formats['percent'] if pct else formats['number'] for pct in is_pct]
+    end_row = write_value_rows(worksheet, start_row, list(data.index), data.to_numpy(), column_formats, styles)
+    vs_target = [name == 'v/s Target %' for name in column_names]
+    vs_base = [pct and not target for pct, target in zip(is_pct, vs_target)]
+    add_growth_rules(worksheet, column_ranges(start_row, end_row - 1, 2, vs_target), threshold=100, inclusive=True)
+    add_growth_rules(worksheet, column_ranges(start_row, end_row - 1, 2, vs_base))
+    return end_row
+
+
+def write_idg_sheet_title(worksheet, analysis_title, num_cols, styles):
+    """Title merged across the IDG column and every data column"""
+    write_header_spans(worksheet, 1, 1, [(analysis_title, 0, num_cols + 1)], styles['sheet_title'])
+
+
+def autofit_idg_columns(worksheet):
+    """Width of every column from its longest value (max width of 30)"""
+    for col_idx, column_values in enumerate(worksheet.iter_cols(values_only=True), start=1):
+        max_length = max(len(str(value)) for value in column_values)
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 30)
+
+
+def write_idg_total_sheet(pivot_df, analysis_title, worksheet, styles, formats=None):
+    """
+    Write the Total block of an IDG pivot (monthly view) to a worksheet
+
+    Parameters:
+    pivot_df: DataFrame - output of idg_pivot.build_idg_pivot()
+    analysis_title: str - title of row 1
+    worksheet: openpyxl worksheet
+    styles: dict - names from register_styles()
+    formats: dict - IDG_FORMATS entry, defaults to the weekly formats
+    """
+    formats = formats or IDG_FORMATS['weekly']
+    total_data = pivot_df["Total"]
+    write_idg_sheet_title(worksheet, analysis_title, len(total_data.columns), styles)
+
+    # Row 2: "IDG" and the period names, data rows from row 3
+    write_header_spans(worksheet, 2, 1, header_spans(["IDG"] + list(total_data.columns), 0), styles['header'])
+    write_idg_value_block(worksheet, 3, total_data, list(total_data.columns), styles, formats)
+
+    autofit_idg_columns(worksheet)
+    worksheet.freeze_panes = 'B3'  # Headers and IDG column frozen
+
+
+def write_idg_pivot_sheet(pivot_df, analysis_title, worksheet, styles, formats=None):
+    """
+    Write a week x period IDG pivot to a worksheet
+
+    Parameters:
+    pivot_df: DataFrame - output of idg_pivot.build_idg_pivot()
+    analysis_title: str - title of row 1
+    worksheet: openpyxl worksheet
+    styles: dict - names from register_styles()
+    formats: dict - IDG_FORMATS entry, defaults to the weekly formats
+    """
+    formats = formats or IDG_FORMATS['weekly']
+    write_idg_sheet_title(worksheet, analysis_title, len(pivot_df.columns), styles)
+
+    # Row 2: week labels merged across their period columns, row 3: "IDG" and the period names
+    write_header_spans(worksheet, 2, 2, header_spans(pivot_df.columns, 0), styles['header'])
+    write_header_spans(worksheet, 3, 1, header_spans([("IDG",)] + list(pivot_df.columns), 1), styles['header'])
+
+    # Data rows from row 4
+    write_idg_value_block(worksheet, 4, pivot_df, list(pivot_df.columns.get_level_values(1)), styles, formats)
+
+    autofit_idg_columns(worksheet)
+    worksheet.freeze_panes = 'B1'  # IDG column frozen
+
+
+def session_number_format(metric, period='', formats=None):
+    """Number format of a sessions value from its metric and period (True for growth %)"""
+    formats = formats or SESSION_FORMATS['weekly']
+    if 'CVR' in metric:
+        return formats['cvr'], False
+    if 'AOV' in metric or 'revenue' in metric.lower():
+        return formats['amount'], False
+    if '%' in period:  # Growth percentages
+        return formats['growth'], True
+    return formats['count'], False
+
+
+def write_session_channel_rows(worksheet, current_row, pivot_df, styles, metric_level, period_level=None,
+                               color_growth=False, formats=None):
+    """
+    Write the channel rows of a sessions pivot from its value array
+
+    Returns:
+    int next free row
+    """
+    metrics = pivot_df.columns.get_level_values(metric_level)
+    periods = pivot_df.columns.get_level_values(period_level) if period_level is not None else [''] * len(metrics)
+    cell_formats = [session_number_format(metric, period, formats) for metric, period in zip(metrics, periods)]
+
+    end_row = write_value_rows(worksheet, current_row, [str(channel) for channel in pivot_df.index],
+                               pivot_df.to_numpy(), [number_format for number_format, _ in cell_formats], styles,
+                               total_label="Grand Total")
+    if color_growth:
+        add_growth_rules(worksheet, column_ranges(current_row, end_row - 1, 2,
+                                                  [is_growth for _, is_growth in cell_formats]))
+    return end_row
+
+
+def autofit_session_section(worksheet, start_row, end_row, total_columns):
+    """Width of the section columns from their longest non-empty value (max width of 25)"""
+    for col_idx, column_values in enumerate(worksheet.iter_cols(min_row=start_row, max_row=end_row - 1,
+                                                                max_col=total_columns, values_only=True), start=1):
+        max_length = max((len(str(value)) for value in column_values if value), default=0)
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 3, 25)
+
+
+def write_channel_header(worksheet, row, styles, header_rows):
+    """Channel header of the first column, merged down the header rows"""
+    worksheet.cell(row=row, column=1, value="Channel").style = styles['header']
+    worksheet.merge_cells(start_row=row, start_column=1, end_row=row + header_rows - 1, end_column=1)
+
+
+def write_sessions_pivot_section(worksheet, pivot_df, styles, title="SESSIONS ANALYSIS",
+                                 period_style='period_header_light', formats=None):
+    """
+    Append a Week x Metric x Period sessions pivot two rows below the sheet's content
+
+    Parameters:
+    worksheet: openpyxl worksheet
+    pivot_df: DataFrame - output of sessions_pivot.build_sessions_pivot()
+    styles: dict - names from register_styles()
+    title: str - section title
+    period_style: str - key of the period header style
+    formats: dict - SESSION_FORMATS entry, defaults to the weekly formats
+    """
+    start_row = worksheet.max_row + 3  # Leave two blank rows for spacing
+    total_columns = len(pivot_df.columns) + 1  # +1 for the row headers column
+
+    write_header_spans(worksheet, start_row, 1, [(title, 0, total_columns)], styles['section_title'])
+    current_row = start_row + 1
+
+    # Week headers, metric headers within each week, then period headers
+    write_header_spans(worksheet, current_row, 2, header_spans(pivot_df.columns, 0), styles['header'])
+    write_header_spans(worksheet, current_row + 1, 2, header_spans(pivot_df.columns, 1), styles['subheader'])
+    write_header_spans(worksheet, current_row + 2, 2, header_spans(pivot_df.columns, 2), styles[period_style])
+    write_channel_header(worksheet, current_row, styles, 3)
+
+    # No conditional colouring on the weekly sessions view
+    current_row = write_session_channel_rows(worksheet, current_row + 3, pivot_df, styles, metric_level=1,
+                                             formats=formats)
+    autofit_session_section(worksheet, start_row, current_row, total_columns)
+
+
+def write_sessions_total_section(worksheet, pivot_df, styles, title="SESSIONS MONTHLY ANALYSIS", formats=None):
+    """
+    Append the Total block (Metric x Period) of a sessions pivot below the sheet's content
+
+    Parameters:
+    worksheet: openpyxl worksheet
+    pivot_df: DataFrame - output of sessions_pivot.build_sessions_pivot()
+    styles: dict - names from register_styles()
+    title: str - section title
+    formats: dict - SESSION_FORMATS entry, defaults to the weekly formats
+    """
+    total_data = pivot_df["Total"]
+    start_row = worksheet.max_row + 3  # Leave two blank rows for spacing
+    total_columns = len(total_data.columns) + 1  # +1 for the row headers column
+
+    write_header_spans(worksheet, start_row, 1, [(title, 0, total_columns)], styles['section_title'])
+    current_row = start_row + 1
+
+    # Metric headers, then period headers
+    write_header_spans(worksheet, current_row, 2, header_spans(total_data.columns, 0), styles['header'])
+    write_channel_header(worksheet, current_row, styles, 2)
+    write_header_spans(worksheet, current_row + 1, 2, header_spans(total_data.columns, 1), styles['subheader'])
+
+    # Growth percentages colour coded
+    current_row = write_session_channel_rows(worksheet, current_row + 2, total_data, styles, metric_level=0,
+                                             period_level=1, color_growth=True, formats=formats)
+    autofit_session_section(worksheet, start_row, current_row, total_columns)
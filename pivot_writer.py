@@ -0,0 +1,129 @@
+from itertools import groupby
+
+from openpyxl.cell.cell import Cell
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.utils import get_column_letter
+
+
+def as_label_tuple(column):
+    """Column label as a tuple (single-level columns are plain labels)"""
+    return column if isinstance(column, tuple) else (column,)
+
+
+def header_spans(columns, level):
+    """
+    Runs of consecutive columns that share their labels down to `level`
+
+    Parameters:
+    columns: iterable of column labels (tuples for MultiIndex columns)
+    level: int - header level to span
+
+    Returns:
+    list of (label, offset of the first column, number of columns)
+    """
+    spans = []
+    offset = 0
+    for key, run in groupby(columns, key=lambda column: as_label_tuple(column)[:level + 1]):
+        span = len(list(run))
+        spans.append((key[-1], offset, span))
+        offset += span
+    return spans
+
+
+def column_ranges(first_row, last_row, first_col, flags):
+    """
+    Cell ranges ("E4:G12") of the runs of flagged columns, for conditional formats
+
+    Parameters:
+    first_row, last_row: int - rows covered
+    first_col: int - sheet column of flags[0]
+    flags: list of bool - one per column
+    """
+    ranges = []
+    offset = 0
+    for flagged, run in groupby(flags):
+        span = len(list(run))
+        if flagged and last_row >= first_row:
+            start, end = get_column_letter(first_col + offset), get_column_letter(first_col + offset + span - 1)
+            ranges.append(f"{start}{first_row}:{end}{last_row}")
+        offset += span
+    return ranges
+
+
+class CellStyler:
+    """
+    Style arrays of (named style, number format) pairs, resolved once per worksheet
+
+    Assigning cell.style looks the named style up and rebuilds the style ids on every
+    cell; here each combination is resolved on a template cell and then copied.
+    """
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self._arrays = {}
+
+    def get(self, style_name, number_format=None):
+        key = (style_name, number_format)
+        style_array = self._arrays.get(key)
+        if style_array is None:
+            template = Cell(self.worksheet)
+            template.style = style_name
+            if number_format:
+                template.number_format = number_format
+            style_array = self._arrays[key] = template._style
+        return style_array
+
+    def write(self, row, column, value, style_name, number_format=None):
+        cell = self.worksheet.cell(row=row, column=column, value=value)
+        cell._style = StyleArray(self.get(style_name, number_format))
+        return cell
+
+
+def write_header_spans(worksheet, row, start_col, spans, style_name, styler=None):
+    """
+    Write one header row from header_spans(), merging each label across its columns
+    """
+    styler = styler or CellStyler(worksheet)
+    for label, offset, span in spans:
+        column = start_col + offset
+        styler.write(row, column, label, style_name)
+        for extra in range(1, span):
+            styler.write(row, column + extra, None, style_name)
+        if span > 1:
+            worksheet.merge_cells(start_row=row, start_column=column, end_row=row, end_column=column + span - 1)
+
+
+def write_value_rows(worksheet, start_row, row_labels, values, column_formats, styles, total_label='Total',
+                     styler=None):
+    """
+    Write a block of labelled rows from a 2-D array, a whole row at a time
+
+    The label goes in column A and the values from column B. Each column's style is
+    resolved once from its number format; the total row uses the total styles.
+    Colouring is left to conditional formats (see report_styles.add_growth_rules).
+
+    Parameters:
+    worksheet: openpyxl worksheet
+    start_row: int - first row to write
+    row_labels: list - one label per row of values
+    values: 2-D array (e.g. pivot_df.to_numpy())
+    column_formats: list of str - number format per value column
+    styles: dict - names from register_styles()
+    total_label: str - label of the row written with the total styles
+
+    Returns:
+    int next free row
+    """
+    styler = styler or CellStyler(worksheet)
+    row_styles = {
+        False: (styler.get(styles['row_label']), [styler.get(styles['value'], fmt) for fmt in column_formats]),
+        True: (styler.get(styles['total_label']), [styler.get(styles['total_value'], fmt) for fmt in column_formats])
+    }
+    row = start_row
+    for label, row_values in zip(row_labels, values.tolist()):
+        label_style, value_styles = row_styles[label == total_label]
+        worksheet.cell(row=row, column=1, value=label)._style = StyleArray(label_style)
+        for column, (value, style_array) in enumerate(zip(row_values, value_styles), start=2):
+            worksheet.cell(row=row, column=column, value=value)._style = StyleArray(style_array)
+        row += 1
+    return row
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import pandas as pd
+
+from price_pivot import JUMBO, PIVOT_INDEX, LABEL_COLUMNS, PRICE_RELAXATION
+from report_pipeline.cache import file_fingerprints, write_frame, read_frame
+
+MANIFEST_NAME = 'manifest.json'
+
+# One history row per scrape date x SKU x company
+HISTORY_COLUMNS = ['Date', 'SKU', 'TITLE', 'CATEGORY', 'Company', 'Price']
+
+
+def price_rows(pivot_table):
+    """
+    Long (Date, SKU, TITLE, CATEGORY, Company, Price) rows of a price pivot
+    (see price_pivot.build_price_pivot); companies without a price are left out, and so
+    are rows whose date is not a valid date (e.g. the fallback date of a file named
+    with an impossible day)
+    """
+    companies = [col for col in pivot_table.columns if col not in ['Date'] + PIVOT_INDEX + LABEL_COLUMNS]
+    rows = pivot_table.melt(id_vars=['Date'] + PIVOT_INDEX, value_vars=companies,
+                            var_name='Company', value_name='Price').dropna(subset=['Price'])
+    dates = pd.to_datetime(rows['Date'], format='%Y-%m-%d', errors='coerce')
+    if dates.isna().any():
+        invalid = sorted(rows.loc[dates.isna(), 'Date'].astype(str).unique())
+        print(f"⚠️ Skipped {int(dates.isna().sum()):,} price(s) without a valid date: {', '.join(invalid)}")
+        rows, dates = rows[dates.notna()].copy(), dates[dates.notna()]
+    rows['Date'] = dates
+    rows['Price'] = rows['Price'].astype(float)
+    return rows.drop_duplicates(['Date', 'SKU', 'Company'], keep='last')[HISTORY_COLUMNS].reset_index(drop=True)
+
+
+class PriceHistory:
+    """
+    Append-only store of the daily competitor prices, one columnar partition per date
+
+    Every processed Price comparision file adds (or, when re-ingested, replaces) the
+    partition of its date, so trends over weeks or months read the stored prices
+    instead of re-parsing and re-pivoting the workbooks. Partitions are written as
+    parquet when pyarrow is available, otherwise as pickles.
+
+    Queries:
+    prices()         history rows, optionally for some SKUs / companies / dates
+    gap_trend()      Jumbo minus competitor price per day for one SKU
+    undercuts()      days and SKUs where a competitor was cheaper than Jumbo
+    undercut_days()  number of such days per SKU
+    """
+
+    def __init__(self, history_dir):
+        self.history_dir = history_dir
+        self.manifest = self.load_manifest()
+        self.partitions = {}
+
+    def __len__(self):
+        return len(self.manifest['dates'])
+
+    def __repr__(self):
+        dates = self.dates()
+        span = f", {dates[0]:%Y-%m-%d} to {dates[-1]:%Y-%m-%d}" if dates else ''
+        return f"PriceHistory({len(self)} days{span})"
+
+    def load_manifest(self):
+        """Stored dates (date -> {'frame', 'rows', 'source'}) and ingested files (path -> {'fingerprint', 'year', 'date'})"""
+        try:
+            with open(os.path.join(self.history_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'dates': {}, 'sources': {}}
+
+    def save_manifest(self):
+        os.makedirs(self.history_dir, exist_ok=True)
+        path = os.path.join(self.history_dir, MANIFEST_NAME)
+        temp_path = f"{path}.tmp{os.getpid()}"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(temp_path, path)
+
+    def dates(self):
+        """Stored dates, oldest first"""
+        return sorted(pd.Timestamp(date) for date in self.manifest['dates'])
+
+    def is_current(self, path, year):
+        """True when this file was ingested for this year and has not changed since"""
+        entry = self.manifest['sources'].get(os.path.abspath(path))
+        return (entry is not None and entry['year'] == str(year)
+                and entry['fingerprint'] == file_fingerprints([path])[0][1])
+
+    def drop_date(self, date):
+        entry = self.manifest['dates'].pop(date, None)
+        self.partitions.pop(date, None)
+        if entry and os.path.exists(os.path.join(self.history_dir, entry['frame'])):
+            os.remove(os.path.join(self.history_dir, entry['frame']))
+
+    def add(self, pivot_table, source=None, year=None):
+        """
+        Store the prices of a price pivot, replacing what was stored for its date(s)
+
+        Parameters:
+        pivot_table: DataFrame from process_single_file() / build_price_pivot()
+        source: str - workbook the pivot came from (recorded so unchanged files are skipped)
+        year: str - year the file's date was read with
+
+        Returns:
+        number of history rows stored
+        """
+        rows = price_rows(pivot_table)
+        os.makedirs(self.history_dir, exist_ok=True)
+        for date, day_rows in rows.groupby('Date'):
+            date_key = f"{date:%Y-%m-%d}"
+            self.drop_date(date_key)
+            day_rows = day_rows.reset_index(drop=True)
+            self.manifest['dates'][date_key] = {
+                'frame': write_frame(day_rows, os.path.join(self.history_dir, f"day_{date_key}")),
+                'rows': len(day_rows),
+                'source': os.path.abspath(source) if source else None
+            }
+            self.partitions[date_key] = day_rows
+
+        if source:
+            source = os.path.abspath(source)
+            dates = [f"{date:%Y-%m-%d}" for date in rows['Date'].unique()]
+            previous = self.manifest['sources'].get(source)
+            # A re-ingested file whose date changed (e.g. another year) no longer owns its old day
+            if previous and previous['date'] not in dates and \
+                    self.manifest['dates'].get(previous['date'], {}).get('source') == source:
+                self.drop_date(previous['date'])
+            self.manifest['sources'][source] = {
+                'fingerprint': file_fingerprints([source])[0][1],
+                'year': str(year),
+                'date': dates[0] if dates else None
+            }
+        self.save_manifest()
+        return len(rows)
+
+    def ingest(self, file_paths, year, read_pivot):
+        """
+        Add new daily files and re-ingest changed ones; unchanged files are skipped
+
+        Parameters:
+        file_paths: list - Price comparision workbooks
+        year: str - year of the dates in the file names
+        read_pivot: callable - path -> price pivot or None (e.g. process_single_file)
+
+        Returns:
+        list of the paths that were (re)ingested
+        """
+        start = time.perf_counter()
+        pending = [path for path in file_paths if not self.is_current(path, year)]
+        for path in pending:
+            pivot_table = read_pivot(path)
+            if pivot_table is None:
+                print(f"⚠️ Nothing to store from {os.path.basename(path)}")
+                continue
+            rows = self.add(pivot_table, source=path, year=year)
+            print(f"💾 Stored {rows:,} prices from {os.path.basename(path)}")
+        print(f"📈 Price history: {len(pending)} file(s) ingested, {len(file_paths) - len(pending)} unchanged, "
+              f"{len(self)} day(s) stored ({time.perf_counter() - start:.1f}s)")
+        return pending
+
+    def partition(self, date_key):
+        if date_key not in self.partitions:
+            self.partitions[date_key] = read_frame(os.path.join(self.history_dir,
+                                                                self.manifest['dates'][date_key]['frame']))
+        return self.partitions[date_key]
+
+    def prices(self, skus=None, companies=None, start=None, end=None, days=None):
+        """
+        History rows of a selection; only the partitions of the selected dates are read
+
+        Parameters:
+        skus / companies: list - keep only these (default: all)
+        start / end: date-like - inclusive date range
+        days: int - the last N days up to the latest stored date (instead of start)
+
+        Returns:
+        DataFrame with HISTORY_COLUMNS, sorted by Date
+        """
+        dates = self.dates()
+        if days is not None and dates:
+            start = dates[-1] - pd.Timedelta(days=days - 1)
+        selected = [date for date in dates
+                    if (start is None or date >= pd.Timestamp(start)) and (end is None or date <= pd.Timestamp(end))]
+        parts = [self.partition(f"{date:%Y-%m-%d}") for date in selected]
+        rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=HISTORY_COLUMNS)
+        if skus is not None:
+            rows = rows[rows['SKU'].isin(list(skus))]
+        if companies is not None:
+            rows = rows[rows['Company'].isin(list(companies))]
+        return rows.reset_index(drop=True)
+
+    def gap_trend(self, sku, days=90, competitors=None):
+        """
+        Jumbo's price minus each competitor's price, per day, for one SKU
+        (positive: Jumbo is more expensive)
+
+        Returns:
+        DataFrame indexed by Date (days Jumbo listed the SKU) with the Jumbo price and one
+        gap column per competitor
+        """
+        matrix = self.prices(skus=[sku], days=days).pivot_table(index='Date', columns='Company', values='Price',
+                                                                aggfunc='first')
+        if JUMBO not in matrix.columns:
+            return pd.DataFrame(columns=[JUMBO])
+        # Days Jumbo did not list the SKU have no gap
+        matrix = matrix[matrix[JUMBO].notna()]
+        competitors = [company for company in (competitors or matrix.columns)
+                       if company != JUMBO and company in matrix.columns]
+        gaps = matrix[competitors].rsub(matrix[JUMBO], axis=0)
+        return pd.concat([matrix[[JUMBO]], gaps], axis=1)
+
+    def undercuts(self, competitor, days=None, skus=None, relaxation=PRICE_RELAXATION):
+        """
+        Days and SKUs where a competitor was cheaper than Jumbo by more than the relaxation
+        (the same rule as the "Jumbo Higher than" column)
+
+        Returns:
+        DataFrame with Date, SKU, TITLE, Jumbo, the competitor's price and Gap
+        """
+        rows = self.prices(skus=skus, companies=[JUMBO, competitor], days=days)
+        jumbo = rows[rows['Company'] == JUMBO][['Date', 'SKU', 'TITLE', 'Price']].rename(columns={'Price': JUMBO})
+        other = rows[rows['Company'] == competitor][['Date', 'SKU', 'Price']].rename(columns={'Price': competitor})
+        both = jumbo.merge(other, on=['Date', 'SKU'])
+        undercut = both[both[JUMBO] > both[competitor] + relaxation].copy()
+        undercut['Gap'] = undercut[JUMBO] - undercut[competitor]
+        return undercut.sort_values(['Date', 'SKU']).reset_index(drop=True)
+
+    def undercut_days(self, competitor, days=None, skus=None, relaxation=PRICE_RELAXATION):
+        """Number of days each SKU was undercut by a competitor, most undercut first"""
+        undercut = self.undercuts(competitor, days=days, skus=skus, relaxation=relaxation)
+        return (undercut.groupby(['SKU', 'TITLE'])['Date'].nunique().rename('Days Undercut')
+                .sort_values(ascending=False).reset_index())
@@ -0,0 +1,159 @@
+import io
+import os
+import re
+import glob
+import time
+import contextlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from price_pivot import build_price_pivot
+
+# Daily scrape files: 'Price comparision_DD_MM.xlsx'
+FILE_PATTERN = "Price comparision_*.xlsx"
+DATE_PATTERN = re.compile(r'Price comparision_(\d{2})_(\d{2})\.xlsx')
+TARGET_SHEET = "detailed report"
+
+
+def list_price_files(folder_path):
+    """Daily Price comparision workbooks of a folder, in file name order"""
+    return sorted(glob.glob(os.path.join(folder_path, FILE_PATTERN)))
+
+
+def file_date(file_name, year):
+    """
+    'YYYY-MM-DD' date of a daily file, from the day and month in its name
+
+    Returns:
+    str date ('{year}-01-01' when the name holds no date)
+    """
+    date_match = DATE_PATTERN.search(file_name)
+    if not date_match:
+        print("Could not extract date from filename")
+        return f"{year}-01-01"  # Default date
+
+    day, month = date_match.group(1), date_match.group(2)
+    date_str = f"{year}-{month}-{day}"
+    print(f"Extracted date from filename: {date_str}")
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        print("Invalid date extracted from filename")
+        return date_str
+
+
+def read_price_file(file_path, year):
+    """
+    Read the 'detailed report' sheet of one daily file into its price pivot
+
+    The workbook is opened once: the sheet names and the data come from the same
+    ExcelFile.
+
+    Parameters:
+    file_path: str - Price comparision workbook
+    year: str - year of the date in the file name
+
+    Returns:
+    DataFrame price pivot (see build_price_pivot), or None
+    """
+    print(f"\nProcessing file: {file_path}")
+    filename = os.path.basename(file_path)
+    formatted_date = file_date(filename, year)
+
+    try:
+        with pd.ExcelFile(file_path) as excel_file:
+            target_sheet = next((sheet for sheet in excel_file.sheet_names if sheet.lower() == TARGET_SHEET), None)
+            if not target_sheet:
+                print(f"No 'detailed report' sheet found in {filename}")
+                return None
+            df = excel_file.parse(target_sheet)
+
+        # Filter the 'Company-Company' sellers, pivot the offer prices by company and
+        # label the Jumbo Higher / Lower than companies with array comparisons
+        pivot_table = build_price_pivot(df, formatted_date)
+        if pivot_table is None:
+            print(f"No matching data found in {filename}")
+            return None
+
+        print(f"Pivot table created with shape: {pivot_table.shape}")
+        return pivot_table
+
+    except Exception as e:
+        print(f"Error processing {filename}: {str(e)}")
+        return None
+
+
+def read_price_file_task(task):
+    """
+    Worker for one daily file (runs inside a separate process); the file's messages are
+    captured and returned so the parent can print them file by file
+
+    Returns:
+    (path, pivot or None, log text, seconds taken)
+    """
+    path, year = task
+    start = time.perf_counter()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        pivot_table = read_price_file(path, year)
+    return path, pivot_table, log.getvalue(), time.perf_counter() - start
+
+
+def process_price_files(file_paths, year, max_workers=None):
+    """
+    Price pivots of many daily files, one process per file
+
+    Falls back to sequential reads if a process pool cannot be started.
+
+    Parameters:
+    file_paths: list - Price comparision workbooks
+    year: str - year of the dates in the file names
+    max_workers: int - pool size, defaults to one worker per file (capped by CPU count)
+
+    Returns:
+    dict path -> price pivot (None for files without usable data), in file_paths order
+    """
+    if max_workers is None:
+        max_workers = min(len(file_paths), os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    pivots = {}
+
+    def store(path, pivot_table, log, seconds):
+        print(log, end='')
+        print(f"✅ Processed {os.path.basename(path)} in {seconds:.1f}s")
+        pivots[path] = pivot_table
+
+    tasks = [(path, year) for path in file_paths]
+    if tasks and max_workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(read_price_file_task, task): task for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        store(*future.result())
+                    except Exception as e:
+                        print(f"❌ Error processing {futures[future][0]}: {e}")
+        except Exception as e:
+            print(f"⚠️ Parallel read unavailable ({e}), reading files sequentially...")
+    for task in tasks:
+        if task[0] not in pivots:
+            store(*read_price_file_task(task))
+
+    print(f"📁 Processed {len(file_paths)} price file(s) in {time.perf_counter() - start:.1f}s")
+    return {path: pivots.get(path) for path in file_paths}
+
+
+def combine_price_pivots(pivots):
+    """
+    One frame of the per-day pivots (None entries skipped), sorted by Date and SKU;
+    companies missing on some days are left empty there
+
+    Returns:
+    DataFrame, or None when there is no pivot
+    """
+    frames = [pivot for pivot in pivots if pivot is not None]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).sort_values(['Date', 'SKU'])
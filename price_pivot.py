@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# Company columns of the price pivot, in sheet order (other sellers follow)
+PRIORITY_ORDER = ['Jumbo', 'Sharaf DG', 'Emax', 'Noon', 'Amazon', 'Carrefour', 'Dyson']
+JUMBO = 'Jumbo'
+PIVOT_INDEX = ['SKU', 'TITLE', 'CATEGORY']
+LABEL_COLUMNS = ['Jumbo Higher than', 'Jumbo Lower than']
+
+# Jumbo only counts as higher / lower when the gap is more than this (AED)
+PRICE_RELAXATION = 1
+
+
+def matching_sellers(sellers):
+    """
+    ORG_SELLER values of the form 'Company-Company' (same name on both sides of a single
+    '-', compared case-insensitively after stripping, both sides containing letters);
+    values that are not text never match
+
+    The test runs on the distinct seller values with vectorized string operations, so it
+    costs the same for 1k or 1M scraped rows.
+
+    Parameters:
+    sellers: Series - ORG_SELLER column
+
+    Returns:
+    numpy array of the matching seller values
+    """
+    values = pd.Series([seller for seller in pd.unique(sellers.dropna()) if isinstance(seller, str)], dtype=object)
+    if values.empty:
+        return values.to_numpy()
+    text = values.str
+    parts = text.partition('-')
+    left, right = parts[0].str.strip(), parts[2].str.strip()
+    has_letters = r'[^\W\d_]'
+    matches = ((text.count('-') == 1)
+               & left.str.contains(has_letters, regex=True)
+               & right.str.contains(has_letters, regex=True)
+               & (left.str.lower() == right.str.lower()))
+    return values[matches.fillna(False).astype(bool)].to_numpy()
+
+
+def filter_org_sellers(df):
+    """Rows of a detailed report whose ORG_SELLER passes matching_sellers()"""
+    return df[df['ORG_SELLER'].isin(matching_sellers(df['ORG_SELLER']))]
+
+
+def order_companies(companies):
+    """Companies in PRIORITY_ORDER first, then the others in their current order"""
+    return ([company for company in PRIORITY_ORDER if company in companies]
+            + [company for company in companies if company not in PRIORITY_ORDER])
+
+
+def comparison_labels(masks, companies):
+    """
+    Comma-joined company names of every row of a boolean (rows x companies) matrix
+
+    Rows are encoded as bit patterns, so each distinct combination is joined once.
+    """
+    if masks.shape[1] == 0:
+        return np.full(masks.shape[0], '', dtype=object)
+    codes = masks.astype(np.int64) @ (1 << np.arange(masks.shape[1], dtype=np.int64))
+    combinations, inverse = np.unique(codes, return_inverse=True)
+    labels = np.array([", ".join(company for bit, company in enumerate(companies) if code >> bit & 1)
+                       for code in combinations], dtype=object)
+    return labels[inverse.ravel()]
+
+
+def jumbo_price_comparison(pivot_table, companies, relaxation=PRICE_RELAXATION):
+    """
+    "Jumbo Higher than" / "Jumbo Lower than" labels of a price pivot
+
+    Jumbo's price is compared with every competitor column in one array operation:
+    Jumbo is higher than a company when its price exceeds the company's by more than
+    the relaxation, lower when it is below by more than the relaxation. Missing prices
+    never match.
+
+    Parameters:
+    pivot_table: DataFrame - one row per SKU, one price column per company
+    companies: list - competitor columns in label order (Jumbo excluded)
+    relaxation: float - tolerated price gap
+
+    Returns:
+    (higher_than, lower_than) numpy arrays of comma-joined company names ('' for none)
+    """
+    if JUMBO not in pivot_table.columns or not companies:
+        empty = np.full(len(pivot_table), '', dtype=object)
+        return empty, empty.copy()
+
+    jumbo = pivot_table[JUMBO].to_numpy(dtype=float, na_value=np.nan)[:, None]
+    prices = pivot_table[companies].to_numpy(dtype=float, na_value=np.nan)
+    # NaN on either side compares False
+    higher = jumbo > prices + relaxation
+    lower = jumbo < prices - relaxation
+    return comparison_labels(higher, companies), comparison_labels(lower, companies)
+
+
+def build_price_pivot(df, date):
+    """
+    SKU x company offer price pivot of one detailed report
+
+    Parameters:
+    df: DataFrame - 'detailed report' sheet (SKU, TITLE, CATEGORY, ORG_SELLER, OFFER PRICE)
+    date: str - value of the Date column
+
+    Returns:
+    DataFrame with Date, SKU, TITLE, CATEGORY, the company prices and the Jumbo Higher /
+    Lower than labels, or None when no seller matches
+    """
+    filtered_df = filter_org_sellers(df)
+    if len(filtered_df) == 0:
+        return None
+    print(f"Found sellers: {sorted(filtered_df['ORG_SELLER'].unique())}")
+
+    pivot_base = filtered_df[PIVOT_INDEX + ['ORG_SELLER', 'OFFER PRICE']].copy()
+    pivot_base['Company'] = pivot_base['ORG_SELLER'].str.split('-').str[0]
+
+    pivot_table = pivot_base.pivot_table(
+        index=PIVOT_INDEX,
+        columns='Company',
+        values='OFFER PRICE',
+        aggfunc='first'
+    ).reset_index()
+    pivot_table.insert(0, 'Date', date)
+
+    companies = order_companies([col for col in pivot_table.columns if col not in ['Date'] + PIVOT_INDEX])
+    pivot_table = pivot_table[['Date'] + PIVOT_INDEX + companies]
+
+    competitors = [company for company in companies if company != JUMBO]
+    higher_than, lower_than = jumbo_price_comparison(pivot_table, competitors)
+    pivot_table[LABEL_COLUMNS[0]] = higher_than
+    pivot_table[LABEL_COLUMNS[1]] = lower_than
+    return pivot_table
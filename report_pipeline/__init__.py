@@ -0,0 +1,5 @@
+from report_pipeline.cache import StageCache
+from report_pipeline.dag import Stage, Pipeline, PipelineRun
+from report_pipeline.paths import setup_report_paths, standard_periods
+from report_pipeline.stages import REPORT_TARGETS, build_report_pipeline, run_reports
+from report_pipeline.cli import run_months, main
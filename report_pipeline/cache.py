@@ -0,0 +1,238 @@
+import os
+import time
+import json
+import pickle
+import shutil
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+
+from dsr_catalog import get_file_fingerprint
+
+try:
+    import pyarrow  # noqa: F401 - only needed by DataFrame.to_parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Stage results live next to the DSR catalog in the local cache folder
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'cache', 'report_stages')
+
+# Bump when the on-disk layout changes so old entries are ignored
+CACHE_FORMAT = 1
+
+# Entries kept per stage (older keys are removed when a new one is saved)
+MAX_ENTRIES_PER_STAGE = 6
+
+
+def code_version(func):
+    """Hash of a function's source (its bytecode when the source is not available)"""
+    try:
+        source = inspect.getsource(func).encode('utf-8')
+    except (OSError, TypeError):
+        source = getattr(getattr(func, '__code__', None), 'co_code', repr(func).encode('utf-8'))
+    return hashlib.sha1(source).hexdigest()[:12]
+
+
+def code_versions(*funcs):
+    """Combined code_version() of the helper functions a stage relies on"""
+    return '-'.join(code_version(func) for func in funcs)
+
+
+def file_fingerprints(paths):
+    """[(absolute path, size-mtime fingerprint)] of input files; missing files fingerprint as None"""
+    fingerprints = []
+    for path in paths:
+        try:
+            fingerprints.append((os.path.abspath(path), get_file_fingerprint(os.stat(path))))
+        except OSError:
+            fingerprints.append((os.path.abspath(path), None))
+    return fingerprints
+
+
+def value_fingerprint(value):
+    """
+    Stable, JSON-friendly fingerprint of a stage input
+
+    DataFrames and Series are hashed by content (pandas row hashes plus labels),
+    containers recursively, anything else by repr.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        row_hashes = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        labels = repr(list(value.columns)) if isinstance(value, pd.DataFrame) else repr(value.name)
+        return hashlib.sha1(row_hashes.tobytes() + labels.encode('utf-8')).hexdigest()
+    if isinstance(value, dict):
+        return [[repr(key), value_fingerprint(item)] for key, item in sorted(value.items(), key=lambda kv: repr(kv[0]))]
+    if isinstance(value, (list, tuple, set)):
+        items = sorted(value, key=repr) if isinstance(value, set) else value
+        return [value_fingerprint(item) for item in items]
+    if isinstance(value, np.generic):
+        return repr(value.item())
+    return repr(value)
+
+
+def make_key(*parts):
+    """Cache key from any JSON-serialisable parts"""
+    payload = json.dumps([CACHE_FORMAT] + list(parts), default=repr, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class FrameRef:
+    """Placeholder for a DataFrame stored in its own file next to the entry's skeleton"""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+
+
+def split_frames(value, store_frame):
+    """
+    Replace every DataFrame inside (nested) dicts / lists / tuples with a FrameRef
+
+    store_frame(frame) writes one frame and returns its file name.
+    """
+    if isinstance(value, pd.DataFrame):
+        return FrameRef(store_frame(value))
+    if isinstance(value, dict):
+        return {key: split_frames(item, store_frame) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(split_frames(item, store_frame) for item in value)
+    return value
+
+
+def join_frames(value, entry_dir):
+    """Inverse of split_frames(): read every FrameRef back from the entry folder"""
+    if isinstance(value, FrameRef):
+        return read_frame(os.path.join(entry_dir, value.file_name))
+    if isinstance(value, dict):
+        return {key: join_frames(item, entry_dir) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(join_frames(item, entry_dir) for item in value)
+    return value
+
+
+def write_frame(frame, path_base):
+    """
+    Write a DataFrame as parquet when pyarrow is available, otherwise (or if the frame
+    has columns parquet cannot store, e.g. mixed-type objects) as a pickle
+
+    Returns:
+    str file name written
+    """
+    if PARQUET_AVAILABLE:
+        try:
+            frame.to_parquet(path_base + '.parquet')
+            return os.path.basename(path_base) + '.parquet'
+        except Exception:
+            if os.path.exists(path_base + '.parquet'):
+                os.remove(path_base + '.parquet')
+    frame.to_pickle(path_base + '.pkl')
+    return os.path.basename(path_base) + '.pkl'
+
+
+def read_frame(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+class StageCache:
+    """
+    On-disk memo of report stage results
+
+    An entry is keyed by the stage name, its code version, the fingerprints of the
+    files it reads and the keys (or fingerprints) of its other inputs, so a result is
+    reused only while none of them changed. DataFrames are stored one file each
+    (parquet, or pickle without pyarrow); the rest of the result is pickled.
+    """
+
+    def __init__(self, cache_dir=None, enabled=True, max_entries=MAX_ENTRIES_PER_STAGE):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.enabled = enabled
+        self.max_entries = max_entries
+
+    def entry_dir(self, name, key):
+        return os.path.join(self.cache_dir, name, key)
+
+    def load(self, name, key):
+        """
+        Returns:
+        (True, value) on a hit, (False, None) on a miss or an unreadable entry
+        """
+        entry_dir = self.entry_dir(name, key)
+        skeleton_path = os.path.join(entry_dir, 'result.pkl')
+        if not self.enabled or not os.path.exists(skeleton_path):
+            return False, None
+        try:
+            with open(skeleton_path, 'rb') as f:
+                skeleton = pickle.load(f)
+            return True, join_frames(skeleton, entry_dir)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable cache entry {entry_dir}: {e}")
+            return False, None
+
+    def save(self, name, key, value):
+        """Store a result (written to a temporary folder, then moved into place)"""
+        if not self.enabled:
+            return
+        entry_dir = self.entry_dir(name, key)
+        temp_dir = f"{entry_dir}_tmp{os.getpid()}"
+        try:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            os.makedirs(temp_dir)
+            stored_frames = []
+
+            def store_frame(frame):
+                stored_frames.append(frame)
+                return write_frame(frame, os.path.join(temp_dir, f"frame_{len(stored_frames)}"))
+
+            skeleton = split_frames(value, store_frame)
+            with open(os.path.join(temp_dir, 'result.pkl'), 'wb') as f:
+                pickle.dump(skeleton, f, protocol=pickle.HIGHEST_PROTOCOL)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temp_dir, entry_dir)
+            self.prune(name)
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            print(f"⚠️ Could not cache {name}: {e}")
+
+    def prune(self, name):
+        """Keep only the newest max_entries entries of a stage"""
+        stage_dir = os.path.join(self.cache_dir, name)
+        entries = [os.path.join(stage_dir, entry) for entry in os.listdir(stage_dir) if '_tmp' not in entry]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for old_entry in entries[self.max_entries:]:
+            shutil.rmtree(old_entry, ignore_errors=True)
+
+    def clear(self, name=None):
+        """Remove the entries of one stage (or the whole cache)"""
+        shutil.rmtree(os.path.join(self.cache_dir, name) if name else self.cache_dir, ignore_errors=True)
+
+    def cached(self, name, func, *args, files=(), params=None, version=None, **kwargs):
+        """
+        Call func(*args, **kwargs) through the cache
+
+        Parameters:
+        name: str - stage name (one cache folder per name)
+        func: callable - the stage function
+        files: list - input files whose size / mtime invalidate the entry
+        params: any - what identifies the inputs besides the files; defaults to the
+                call arguments (DataFrames are hashed by content)
+        version: str - extra version tag, e.g. bumped when a helper module changes
+
+        Returns:
+        the cached or freshly computed result
+        """
+        inputs = params if params is not None else [args, kwargs]
+        key = make_key(name, code_version(func), version, file_fingerprints(files), value_fingerprint(inputs))
+        hit, value = self.load(name, key)
+        if hit:
+            print(f"♻️ {name}: reusing cached result ({key})")
+            return value
+
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        self.save(name, key, value)
+        print(f"💾 {name}: computed and cached in {time.perf_counter() - start:.1f}s ({key})")
+        return value
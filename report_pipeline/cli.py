@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import argparse
+import contextlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from period_set import parse_month_year, make_period
+
+from report_pipeline.stages import REPORT_TARGETS, run_reports
+
+DEFAULT_CONFIG_PATH = 'config.json'
+DEFAULT_OUTPUT_DIR = 'reports'
+
+
+def normalize_month(month_year):
+    """'june-2025' -> 'June-2025' (raises ValueError for anything else)"""
+    try:
+        return make_period(*parse_month_year(month_year.strip()))['folder']
+    except Exception:
+        raise ValueError(f"Invalid month '{month_year}' (expected e.g. 'June-2025')")
+
+
+def month_range(first_month, last_month):
+    """Every month-year from first_month to last_month inclusive"""
+    first = make_period(*parse_month_year(normalize_month(first_month)))['ordinal']
+    last = make_period(*parse_month_year(normalize_month(last_month)))['ordinal']
+    if last < first:
+        raise ValueError(f"{last_month} is before {first_month}")
+    return [make_period(ordinal % 12 + 1, ordinal // 12)['folder'] for ordinal in range(first, last + 1)]
+
+
+def collect_months(months=None, first_month=None, last_month=None):
+    """
+    Months requested on the command line, in order and without duplicates
+
+    Parameters:
+    months: list - values of --month, each may hold several comma-separated months
+    first_month / last_month: str - --from / --to range (both required for a range)
+    """
+    collected = []
+    for value in months or []:
+        collected.extend(normalize_month(month) for month in value.split(',') if month.strip())
+    if first_month or last_month:
+        if not (first_month and last_month):
+            raise ValueError("--from and --to must be used together")
+        collected.extend(month_range(first_month, last_month))
+    return list(dict.fromkeys(collected))
+
+
+def read_dsr_root(config_path=DEFAULT_CONFIG_PATH):
+    """DSR folder from config.json (paths.dsr_folder_path), or None"""
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)['paths']['dsr_folder_path']
+    except Exception:
+        return None
+
+
+def write_timing_summary(pipeline_run, path):
+    """Write the stage timings of one run as CSV (stage, seconds, cached)"""
+    rows = [(name, round(seconds, 3), name in pipeline_run.cache_hits)
+            for name, seconds in pipeline_run.timing_summary()]
+    pd.DataFrame(rows, columns=['stage', 'seconds', 'cached']).to_csv(path, index=False)
+    return path
+
+
+def run_month(task):
+    """
+    Build the reports of one month (worker entry point)
+
+    Everything the run prints goes to <output_dir>/<month>/run.log so concurrent
+    months do not interleave on the console.
+
+    Parameters:
+    task: dict - month, dsr_root, reports, output_dir, load_workers, use_cache, cache_dir
+
+    Returns:
+    dict with month, status ('ok' / 'failed'), seconds, outputs, log and error
+    """
+    month = task['month']
+    month_dir = os.path.join(task['output_dir'], month)
+    os.makedirs(month_dir, exist_ok=True)
+    log_path = os.path.join(month_dir, 'run.log')
+    summary = {'month': month, 'status': 'failed', 'seconds': 0.0, 'outputs': [], 'log': log_path, 'error': ''}
+
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            pipeline_run = run_reports(month, task['dsr_root'], reports=task['reports'], output_dir=month_dir,
+                                       max_workers=task['load_workers'], use_cache=task['use_cache'],
+                                       cache_dir=task['cache_dir'])
+            pipeline_run.print_timing_summary()
+            write_timing_summary(pipeline_run, os.path.join(month_dir, 'timings.csv'))
+            summary['outputs'] = [pipeline_run.results[REPORT_TARGETS[report]] for report in task['reports']]
+            summary['status'] = 'ok'
+        except Exception as e:
+            traceback.print_exc()
+            summary['error'] = f"{type(e).__name__}: {e}"
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def print_month_summary(summary):
+    if summary['status'] == 'ok':
+        print(f"✅ {summary['month']}: {len(summary['outputs'])} report(s) in {summary['seconds']:.1f}s")
+    else:
+        print(f"❌ {summary['month']}: {summary['error']} (see {summary['log']})")
+
+
+def run_months(months, dsr_root, reports=('daily', 'weekly'), output_dir=DEFAULT_OUTPUT_DIR, workers=1,
+               load_workers=None, use_cache=True, cache_dir=None):
+    """
+    Build the reports of several months, concurrently when workers > 1
+
+    Parameters:
+    months: list - month-years, e.g. ["May-2025", "June-2025"]
+    dsr_root: str - DSR root folder
+    reports: iterable - keys of REPORT_TARGETS
+    output_dir: str - one sub-folder per month is created here
+    workers: int - months processed at the same time
+    load_workers: int - processes per month for reading the invoice workbooks
+                  (defaults to the CPU count shared between the month workers)
+    use_cache / cache_dir: passed to run_reports()
+
+    Returns:
+    list of per-month summaries from run_month(), in month order
+    """
+    workers = max(1, min(workers, len(months)))
+    if load_workers is None:
+        load_workers = max(1, (os.cpu_count() or 1) // workers)
+    tasks = [{'month': month, 'dsr_root': dsr_root, 'reports': tuple(reports), 'output_dir': output_dir,
+              'load_workers': load_workers, 'use_cache': use_cache, 'cache_dir': cache_dir}
+             for month in months]
+
+    print(f"▶️ Building {', '.join(reports)} for {len(months)} month(s) with {workers} worker(s)")
+    start = time.perf_counter()
+    summaries = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_month, task): task['month'] for task in tasks}
+            for future in as_completed(futures):
+                month = futures[future]
+                try:
+                    summaries[month] = future.result()
+                except Exception as e:
+                    summaries[month] = {'month': month, 'status': 'failed', 'seconds': 0.0, 'outputs': [],
+                                        'log': '', 'error': f"{type(e).__name__}: {e}"}
+                print_month_summary(summaries[month])
+    else:
+        for task in tasks:
+            summaries[task['month']] = run_month(task)
+            print_month_summary(summaries[task['month']])
+
+    ordered = [summaries[month] for month in months]
+    os.makedirs(output_dir, exist_ok=True)
+    pd.DataFrame([{key: summary[key] for key in ('month', 'status', 'seconds', 'error')} for summary in ordered]
+                 ).to_csv(os.path.join(output_dir, 'batch_summary.csv'), index=False)
+
+    failed = [summary['month'] for summary in ordered if summary['status'] != 'ok']
+    print(f"\n⏱️ {len(months) - len(failed)}/{len(months)} month(s) built in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+    return ordered
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='report', description='Build the DSR reports without the notebooks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='build the reports of one or more months')
+    run.add_argument('--month', action='append', default=[],
+                     help="month-year such as June-2025; repeat or comma-separate for several months")
+    run.add_argument('--from', dest='first_month', help='first month of a range (with --to)')
+    run.add_argument('--to', dest='last_month', help='last month of a range (with --from)')
+    run.add_argument('--dsr-root', help=f"DSR root folder (default: paths.dsr_folder_path in {DEFAULT_CONFIG_PATH})")
+    run.add_argument('--reports', default=','.join(REPORT_TARGETS),
+                     help=f"comma-separated reports to build (default: {','.join(REPORT_TARGETS)})")
+    run.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                     help=f"folder for the reports, one sub-folder per month (default: {DEFAULT_OUTPUT_DIR})")
+    run.add_argument('--workers', type=int, default=1, help='months built concurrently (default: 1)')
+    run.add_argument('--load-workers', type=int, help='processes per month for reading the invoice workbooks')
+    run.add_argument('--no-cache', action='store_true', help='recompute every stage instead of reusing the cache')
+    run.add_argument('--cache-dir', help='stage cache folder (default: cache/report_stages)')
+    run.add_argument('--config', default=DEFAULT_CONFIG_PATH, help='config file holding the DSR folder')
+    return parser
+
+
+def main(argv=None):
+    """Command line entry point, returns the process exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        months = collect_months(args.month, args.first_month, args.last_month)
+    except ValueError as e:
+        parser.error(str(e))
+    if not months:
+        parser.error("give at least one --month or a --from / --to range")
+
+    reports = [report.strip() for report in args.reports.split(',') if report.strip()]
+    unknown = [report for report in reports if report not in REPORT_TARGETS]
+    if unknown or not reports:
+        parser.error(f"unknown reports {unknown} (choose from {', '.join(REPORT_TARGETS)})")
+
+    dsr_root = args.dsr_root or read_dsr_root(args.config)
+    if not dsr_root:
+        parser.error(f"--dsr-root is required when {args.config} does not set paths.dsr_folder_path")
+    if not os.path.isdir(dsr_root):
+        parser.error(f"DSR folder not found: {dsr_root}")
+
+    summaries = run_months(months, dsr_root, reports, output_dir=args.output_dir, workers=args.workers,
+                           load_workers=args.load_workers, use_cache=not args.no_cache, cache_dir=args.cache_dir)
+    return 0 if all(summary['status'] == 'ok' for summary in summaries) else 1
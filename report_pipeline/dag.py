@@ -0,0 +1,174 @@
+import time
+
+from report_pipeline.cache import code_version, file_fingerprints, value_fingerprint, make_key
+
+
+class Stage:
+    """
+    A named step of a report pipeline
+
+    The stage function is called as func(context, **results) with one keyword
+    argument per required stage, holding that stage's result.
+
+    Cached stages are keyed by their code, the keys of the stages they require and
+    the fingerprints of files(context, run), the input files they read.
+    """
+
+    def __init__(self, name, func, requires=(), description=None, cache=False, files=None, version=None):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.description = description or (func.__doc__ or name).strip().splitlines()[0]
+        self.cache = cache
+        self.files = files
+        self.version = version
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, requires={list(self.requires)})"
+
+
+class Pipeline:
+    """
+    A DAG of named stages; a run computes each stage at most once and shares its
+    result with every stage (and every report) that depends on it
+    """
+
+    def __init__(self, name='report'):
+        self.name = name
+        self.stages = {}
+
+    def add_stage(self, name, func, requires=(), description=None, cache=False, files=None, version=None):
+        """Register a stage; its requirements must already be registered"""
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined")
+        missing = [dep for dep in requires if dep not in self.stages]
+        if missing:
+            raise KeyError(f"Stage '{name}' requires unknown stages: {missing}")
+        self.stages[name] = Stage(name, func, requires, description, cache, files, version)
+        return self.stages[name]
+
+    def stage(self, name=None, requires=(), **options):
+        """Decorator form of add_stage()"""
+        def register(func):
+            self.add_stage(name or func.__name__, func, requires, **options)
+            return func
+        return register
+
+    def resolve(self, targets):
+        """
+        Stages needed for the targets, dependencies first (each stage listed once)
+
+        Stages can only require stages registered before them, so the
+        registration order is already a valid execution order.
+        """
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].requires)
+        return [name for name in self.stages if name in needed]
+
+    def start(self, context=None, cache=None):
+        """
+        Start a run; stage results are kept on the run and reused by later targets
+
+        Parameters:
+        context: dict - run parameters passed to every stage
+        cache: StageCache - on-disk cache for the stages marked cache=True (optional)
+        """
+        return PipelineRun(self, context, cache)
+
+    def run(self, targets, context=None, cache=None):
+        """Run the targets (and their dependencies) once, returns the finished PipelineRun"""
+        pipeline_run = self.start(context, cache)
+        pipeline_run.run(targets)
+        return pipeline_run
+
+
+class PipelineRun:
+    """
+    One execution of a pipeline: the run context plus every stage result computed so far
+
+    A cached stage whose key is found in the StageCache is loaded instead of run, and
+    then none of its own requirements has to be computed.
+    """
+
+    def __init__(self, pipeline, context=None, cache=None):
+        self.pipeline = pipeline
+        self.context = dict(context or {})
+        self.cache = cache
+        self.results = {}
+        self.timings = {}
+        self.keys = {}
+        self.cache_hits = set()
+
+    def key(self, name):
+        """
+        Cache key of a stage
+
+        Cached stages combine their code, requirement keys and input file fingerprints;
+        other stages are run (they are cheap, e.g. locating the files) and keyed by result.
+        """
+        if name not in self.keys:
+            stage = self.pipeline.stages[name]
+            if stage.cache:
+                files = stage.files(self.context, self) if stage.files else []
+                self.keys[name] = make_key(name, code_version(stage.func), stage.version,
+                                           [self.key(dep) for dep in stage.requires], file_fingerprints(files))
+            else:
+                self.keys[name] = make_key(name, code_version(stage.func), value_fingerprint(self.get(name)))
+        return self.keys[name]
+
+    def get(self, name):
+        """Result of a stage, loading it from the cache or running it (and any missing requirements)"""
+        if name in self.results:
+            return self.results[name]
+
+        stage = self.pipeline.stages[name]
+        use_cache = self.cache is not None and self.cache.enabled and stage.cache
+        if use_cache:
+            start = time.perf_counter()
+            hit, value = self.cache.load(name, self.key(name))
+            if hit:
+                self.results[name] = value
+                self.timings[name] = time.perf_counter() - start
+                self.cache_hits.add(name)
+                print(f"♻️ {name}: reused cached result ({self.timings[name]:.1f}s)")
+                return value
+
+        self.execute(stage)
+        if use_cache:
+            self.cache.save(name, self.key(name), self.results[name])
+        return self.results[name]
+
+    def execute(self, stage):
+        inputs = {dep: self.get(dep) for dep in stage.requires}
+        print(f"▶️ {stage.name}: {stage.description}")
+        start = time.perf_counter()
+        self.results[stage.name] = stage.func(self.context, **inputs)
+        self.timings[stage.name] = time.perf_counter() - start
+        print(f"✅ {stage.name} finished in {self.timings[stage.name]:.1f}s")
+
+    def run(self, targets):
+        """
+        Compute several targets, sharing the upstream stages between them
+
+        Returns:
+        dict of target -> result
+        """
+        return {target: self.get(target) for target in targets}
+
+    def timing_summary(self):
+        """(stage, seconds) for every executed stage in execution order, plus the total"""
+        rows = list(self.timings.items())
+        rows.append(('total', sum(self.timings.values())))
+        return rows
+
+    def print_timing_summary(self):
+        print(f"\n⏱️ {self.pipeline.name} stage timings:")
+        for name, seconds in self.timing_summary():
+            print(f"   {name:<16} {seconds:8.1f}s{'  (cached)' if name in self.cache_hits else ''}")
@@ -0,0 +1,86 @@
+import os
+import calendar
+
+from dsr_catalog import find_catalog_file, get_catalog_sheet_with_keyword
+from period_set import STANDARD_ROLES, parse_month_year, shift_month, make_period
+
+
+def standard_periods(latest_month_year):
+    """
+    Last month, last year and latest period descriptors for a month-year ('June-2025')
+
+    Returns:
+    dict of role -> period from make_period()
+    """
+    month_num, year = parse_month_year(latest_month_year)
+    return {
+        'last_month': make_period(*shift_month(month_num, year, -1), key='last_month'),
+        'last_year': make_period(*shift_month(month_num, year, -12), key='last_year'),
+        'latest': make_period(month_num, year, key='latest')
+    }
+
+
+def first_day_position(latest_month_year):
+    """Weekday of the 1st of the month (0 = Monday ... 6 = Sunday)"""
+    month_num, year = parse_month_year(latest_month_year)
+    return calendar.weekday(year, month_num, 1)
+
+
+def find_sheet(file_path, keyword=None, default='Sheet1'):
+    """Sheet containing the keyword (first sheet without one) from the DSR catalog, or the default"""
+    try:
+        return get_catalog_sheet_with_keyword(file_path, keyword) or default
+    except Exception:
+        return default
+
+
+def setup_report_paths(latest_month_year, dsr_folder_path):
+    """
+    Locate every input of the daily and weekly reports for one month
+
+    Same lookups as setup_automated_paths() / setup_automated_paths_weekly() in the
+    notebooks, in one place: invoice and traffic files for each of the three periods
+    and the target file of the latest month.
+
+    Parameters:
+    latest_month_year: str - Format: "June-2025"
+    dsr_folder_path: str - DSR root containing one "<Month>-<Year>" folder per month
+
+    Returns:
+    dict with sheet_info, sessions_info, target_info, session_info (latest traffic file),
+    periods and first_day_position
+    """
+    periods = standard_periods(latest_month_year)
+    sheet_info = []
+    sessions_info = []
+
+    for role in STANDARD_ROLES:
+        period = periods[role]
+        folder_path = os.path.join(dsr_folder_path, period['folder'])
+
+        invoice_file = find_catalog_file(folder_path, 'invoice')
+        if invoice_file:
+            sheet_info.append((invoice_file, find_sheet(invoice_file), period['display']))
+
+        traffic_file = find_catalog_file(folder_path, 'traffic')
+        if traffic_file:
+            sessions_info.append((traffic_file, find_sheet(traffic_file, 'download'), period['display']))
+
+    latest_folder = os.path.join(dsr_folder_path, periods['latest']['folder'])
+    target_info = {}
+    target_file = find_catalog_file(latest_folder, 'target')
+    if target_file:
+        target_info = {'path': target_file, 'sheet': find_sheet(target_file, 'target', default='Target')}
+
+    latest_sessions = [info for info in sessions_info if info[2] == periods['latest']['display']]
+    session_info = {'path': latest_sessions[0][0], 'sheet': latest_sessions[0][1]} if latest_sessions else {}
+
+    return {
+        'month': latest_month_year,
+        'sheet_info': sheet_info,
+        'sessions_info': sessions_info,
+        'target_info': target_info,
+        'session_info': session_info,
+        'periods': periods,
+        'first_day_position': first_day_position(latest_month_year)
+    }
@@ -0,0 +1,246 @@
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+from period_set import REVENUE_COLUMN, load_invoice_frame
+from dsr_loader import load_period_inputs
+from dsr_comparison import build_channel_comparison
+from idg_pivot import build_idg_week_sums, build_idg_pivot, build_target_by_week
+from sessions_pivot import load_session_week_sums, build_sessions_pivots
+from report_writer import write_day_channel_report
+from report_styles import register_styles
+from pivot_sheets import (IDG_FORMATS, SESSION_FORMATS, write_idg_pivot_sheet, write_idg_total_sheet,
+                          write_sessions_pivot_section, write_sessions_total_section)
+from sheet_copy import append_streamed_sheets
+from formula_recalc import recalculate_workbook
+
+from report_pipeline.cache import StageCache, code_versions
+from report_pipeline.dag import Pipeline
+from report_pipeline.paths import setup_report_paths
+
+# Final stage of each report; stages shared by several reports run once per month
+REPORT_TARGETS = {
+    'daily': 'daily_report',
+    'weekly': 'weekly_report'
+}
+
+# Weekly workbook sheets: (sheet suffix, title, invoice TYPE filter, sessions CG filter)
+WEEKLY_ANALYSES = [
+    ('Overall_IDG_Analysis', 'OVERALL IDG ANALYSIS', None, None),
+    ('EA_IDG_Analysis', 'EA ONLY IDG ANALYSIS', 'EA', 'EA_only'),
+    ('JumboAE_IDG_Analysis', 'JUMBO.AE ONLY IDG ANALYSIS', 'Jumbo.ae', 'non_EA')
+]
+
+
+def output_path(context, file_name):
+    """Path of a report file inside the run's output folder"""
+    output_dir = context.get('output_dir') or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, file_name)
+
+
+def display_names(sheet_info):
+    return [display_name for _, _, display_name in sheet_info]
+
+
+def invoice_files(context, run):
+    return [path for path, _, _ in run.get('paths')['sheet_info']]
+
+
+def target_files(context, run):
+    target_info = run.get('paths')['target_info']
+    return [target_info['path']] if target_info else []
+
+
+def session_files(context, run):
+    return [path for path, _, _ in run.get('paths')['sessions_info']]
+
+
+def locate_inputs(context):
+    """Locate the invoice, target and traffic files of the month"""
+    paths = setup_report_paths(context['month'], context['dsr_root'])
+    if len(paths['sheet_info']) != 3:
+        raise FileNotFoundError(f"Expected 3 invoice files for {context['month']}, "
+                                f"found {len(paths['sheet_info'])} under {context['dsr_root']}")
+    for path, sheet, display_name in paths['sheet_info']:
+        print(f"   {display_name}: {path} -> {sheet}")
+    return paths
+
+
+def load_invoices(context, paths):
+    """Read the three invoice workbooks in parallel"""
+    sheet_info = paths['sheet_info']
+    frames = load_period_inputs(sheet_info, max_workers=context.get('max_workers'))
+    missing = [name for name in display_names(sheet_info) if name not in frames]
+    if missing:
+        raise RuntimeError(f"Could not load invoices for {', '.join(missing)}")
+    latest = frames[sheet_info[-1][2]]
+    return {'frames': frames, 'max_invoice_day': int(latest['InvoiceDay'].max())}
+
+
+def load_targets(context, paths):
+    """Read the target sheet of the latest month"""
+    target_info = paths['target_info']
+    if not target_info:
+        print("⚠️ No target file found - targets will be 0")
+        return pd.DataFrame(columns=['Date', 'Channel', 'Target'])
+    return pd.read_excel(target_info['path'], sheet_name=target_info['sheet'])
+
+
+def max_invoice_day(context, load_invoices):
+    """Last invoice day of the latest month"""
+    return load_invoices['max_invoice_day']
+
+
+def load_sessions(context, paths, max_invoice_day):
+    """Sum the traffic workbooks by period x CG group x channel x week"""
+    return load_session_week_sums(paths['sessions_info'], max_invoice_day,
+                                  paths['first_day_position'])
+
+
+def day_pivot(context, paths, load_invoices, load_targets):
+    """Day x channel comparison table of the daily report"""
+    type_results = []
+    all_days = set()
+    for idx, (_, _, display_name) in enumerate(paths['sheet_info']):
+        df = load_invoices['frames'][display_name]
+        all_days.update(df.groupby('InvoiceDay')[REVENUE_COLUMN].sum().index)
+        filtered_type = df[df['TYPE'].isin(['Jumbo.ae', 'EA'])]
+        type_results.append((idx, filtered_type.groupby(['InvoiceDay', 'TYPE'])[REVENUE_COLUMN].sum()
+                             .unstack(fill_value=0)))
+
+    target_sums = load_targets.groupby(['Date', 'Channel'])['Target'].sum().unstack(fill_value=0).round(6)
+    return build_channel_comparison(type_results, target_sums, sorted(all_days), paths['sheet_info'])
+
+
+def week_pivot(context, paths, load_invoices, load_targets):
+    """Overall, EA and Jumbo.ae IDG x week pivots from one aggregate"""
+    max_invoice_day = load_invoices['max_invoice_day']
+    week_sums = build_idg_week_sums(paths['sheet_info'], max_invoice_day, paths['first_day_position'],
+                                    frames=load_invoices['frames'])
+    last_month, last_year, current = display_names(paths['sheet_info'])
+
+    pivots = {}
+    for _, _, type_filter, _ in WEEKLY_ANALYSES:
+        target_by_week = build_target_by_week(load_targets, max_invoice_day, paths['first_day_position'],
+                                              type_filter)
+        pivots[type_filter], _, _ = build_idg_pivot(week_sums, last_month, last_year, current,
+                                                    target_by_week=target_by_week, type_filter=type_filter)
+    return pivots
+
+
+def session_pivot(context, paths, load_sessions):
+    """Sessions pivots for every CG filter from the weekly sums"""
+    periods = display_names(paths['sessions_info'])
+    return build_sessions_pivots(load_sessions, periods, cvr_scale=1)
+
+
+def format_daily(context, paths, day_pivot):
+    """Write the formatted invoice day channel report"""
+    path = output_path(context, f"invoice_day_channel_report_{context['month']}.xlsx")
+    saved_path = write_day_channel_report(day_pivot, path, paths['first_day_position'])
+    if saved_path is None:
+        raise RuntimeError(f"Could not save {path}")
+    return saved_path
+
+
+def copy_raw(context, paths, format_daily):
+    """Stream the raw invoice sheets into the daily report"""
+    raw_sheets = [(path, sheet, f"Raw_{display_name.replace(' ', '_')}")
+                  for path, sheet, display_name in paths['sheet_info']]
+    append_streamed_sheets(format_daily, raw_sheets)
+    return format_daily
+
+
+def daily_report(context, copy_raw):
+    """Cache the formula results of the finished daily report"""
+    recalculate_workbook(copy_raw)
+    return copy_raw
+
+
+def weekly_report(context, max_invoice_day, week_pivot, session_pivot):
+    """Write the IDG weekly and monthly sheets with their sessions sections"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    styles = register_styles(workbook)
+
+    for sheet_name, title, type_filter, cg_filter in WEEKLY_ANALYSES:
+        pivot_df = week_pivot[type_filter].round(2)
+        sessions_df = session_pivot.get(cg_filter, pd.DataFrame())
+
+        ws = workbook.create_sheet(sheet_name)
+        write_idg_pivot_sheet(pivot_df, f"{title} ({max_invoice_day} days)", ws, styles, IDG_FORMATS['weekly'])
+        if not sessions_df.empty:
+            write_sessions_pivot_section(ws, sessions_df, styles, formats=SESSION_FORMATS['weekly'])
+
+        ws = workbook.create_sheet(f"Monthly_{sheet_name}")
+        write_idg_total_sheet(pivot_df, f"MONTHLY {title} ({max_invoice_day} days)", ws, styles,
+                              IDG_FORMATS['weekly'])
+        if not sessions_df.empty:
+            write_sessions_total_section(ws, sessions_df, styles, formats=SESSION_FORMATS['weekly'])
+
+    path = output_path(context, f"IDG_Weekly_Analysis_{context['month']}.xlsx")
+    workbook.save(path)
+    print(f"💾 File saved as: {path}")
+    return path
+
+
+def build_report_pipeline():
+    """
+    The daily (DSR) and weekly report stages as one pipeline
+
+    paths -> load_invoices / load_targets -> max_invoice_day -> load_sessions ->
+    day_pivot / week_pivot / session_pivot -> format_daily -> copy_raw -> daily_report,
+    and weekly_report
+
+    The load and pivot stages are cached on disk (see StageCache): re-running after a
+    formatting change only re-writes the workbooks. max_invoice_day is cached on its
+    own so the sessions and weekly stages do not need the raw invoice frames.
+    """
+    pipeline = Pipeline('report')
+    pipeline.add_stage('paths', locate_inputs)
+    pipeline.add_stage('load_invoices', load_invoices, requires=['paths'], cache=True, files=invoice_files,
+                       version=code_versions(load_period_inputs, load_invoice_frame))
+    pipeline.add_stage('load_targets', load_targets, requires=['paths'], cache=True, files=target_files)
+    pipeline.add_stage('max_invoice_day', max_invoice_day, requires=['load_invoices'], cache=True)
+    pipeline.add_stage('load_sessions', load_sessions, requires=['paths', 'max_invoice_day'], cache=True,
+                       files=session_files, version=code_versions(load_session_week_sums))
+    pipeline.add_stage('day_pivot', day_pivot, requires=['paths', 'load_invoices', 'load_targets'], cache=True,
+                       version=code_versions(build_channel_comparison))
+    pipeline.add_stage('week_pivot', week_pivot, requires=['paths', 'load_invoices', 'load_targets'], cache=True,
+                       version=code_versions(build_idg_week_sums, build_idg_pivot, build_target_by_week))
+    pipeline.add_stage('session_pivot', session_pivot, requires=['paths', 'load_sessions'], cache=True,
+                       version=code_versions(build_sessions_pivots))
+    pipeline.add_stage('format_daily', format_daily, requires=['paths', 'day_pivot'])
+    pipeline.add_stage('copy_raw', copy_raw, requires=['paths', 'format_daily'])
+    pipeline.add_stage('daily_report', daily_report, requires=['copy_raw'])
+    pipeline.add_stage('weekly_report', weekly_report, requires=['max_invoice_day', 'week_pivot', 'session_pivot'])
+    return pipeline
+
+
+def run_reports(month, dsr_root, reports=('daily', 'weekly'), output_dir=None, max_workers=None,
+                use_cache=True, cache_dir=None):
+    """
+    Build several reports for one month in a single run, loading every input once
+
+    Parameters:
+    month: str - latest month-year, e.g. "June-2025"
+    dsr_root: str - DSR root folder
+    reports: iterable - keys of REPORT_TARGETS
+    output_dir: str - folder for the report files (current folder by default)
+    max_workers: int - processes used to read the invoice workbooks
+    use_cache: bool - reuse cached load / pivot results whose inputs did not change
+    cache_dir: str - cache folder, defaults to cache/report_stages
+
+    Returns:
+    the finished PipelineRun (results and timings of every stage)
+    """
+    unknown = [report for report in reports if report not in REPORT_TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown reports: {unknown} (choose from {list(REPORT_TARGETS)})")
+
+    pipeline = build_report_pipeline()
+    context = {'month': month, 'dsr_root': dsr_root, 'output_dir': output_dir, 'max_workers': max_workers}
+    cache = StageCache(cache_dir, enabled=use_cache)
+    return pipeline.run([REPORT_TARGETS[report] for report in reports], context, cache)
@@ -0,0 +1,115 @@
+from openpyxl.styles import NamedStyle, Font, PatternFill, Border, Side, Alignment
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.formatting.rule import Rule
+
+# Shared pieces of the report styles
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+CENTER = Alignment(horizontal='center', vertical='center')
+LEFT = Alignment(horizontal='left', vertical='center')
+RIGHT = Alignment(horizontal='right', vertical='center')
+
+
+def solid_fill(color):
+    """Solid PatternFill of a single colour"""
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+TOTAL_FILL = solid_fill('FFE699')
+
+# Styles of the IDG / sessions pivot sheets (registered as "pivot_<key>")
+PIVOT_STYLES = {
+    'sheet_title': {'font': Font(bold=True, size=12, color='FFFFFF'), 'fill': solid_fill('366092'),
+                    'alignment': CENTER, 'border': THIN_BORDER},
+    'section_title': {'font': Font(bold=True, size=14, color='FFFFFF'), 'fill': solid_fill('1F4E79'),
+                      'alignment': CENTER, 'border': THIN_BORDER},
+    'header': {'font': Font(bold=True, size=10, color='FFFFFF'), 'fill': solid_fill('4472C4'),
+               'alignment': CENTER, 'border': THIN_BORDER},
+    'subheader': {'font': Font(bold=True, size=10, color='FFFFFF'), 'fill': solid_fill('5B9BD5'),
+                  'alignment': CENTER, 'border': THIN_BORDER},
+    'period_header': {'font': Font(bold=True, size=10, color='FFFFFF'), 'fill': solid_fill('7F7F7F'),
+                      'alignment': CENTER, 'border': THIN_BORDER},
+    'period_header_light': {'font': Font(bold=True, size=10, color='FFFFFF'), 'fill': solid_fill('B4C6E7'),
+                            'alignment': CENTER, 'border': THIN_BORDER},
+    'row_label': {'font': Font(bold=True, size=9), 'fill': solid_fill('F2F2F2'),
+                  'alignment': LEFT, 'border': THIN_BORDER},
+    'total_label': {'font': Font(bold=True, size=10), 'fill': TOTAL_FILL,
+                    'alignment': LEFT, 'border': THIN_BORDER},
+    'value': {'font': Font(size=9), 'alignment': RIGHT, 'border': THIN_BORDER},
+    'total_value': {'font': Font(bold=True, size=9), 'fill': TOTAL_FILL,
+                    'alignment': RIGHT, 'border': THIN_BORDER},
+    'border': {'border': THIN_BORDER}
+}
+
+# Font colours of growth percentages (green above the threshold, red below)
+GROWTH_DXF = {
+    'positive': DifferentialStyle(font=Font(color='008000')),
+    'negative': DifferentialStyle(font=Font(color='FF0000'))
+}
+
+
+def build_named_style(name, attributes):
+    """
+    Create a NamedStyle from a dict of style attributes
+    (font, fill, border, alignment, number_format); the font defaults to the workbook font
+    """
+    style = NamedStyle(name=name, font=DEFAULT_FONT)
+    for attribute, value in attributes.items():
+        setattr(style, attribute, value)
+    return style
+
+
+def register_styles(workbook, definitions=None, namespace='pivot'):
+    """
+    Register a set of named styles on a workbook once
+
+    Cells then share a single style record by name (cell.style = name) instead of
+    each cell getting its own Font / PatternFill / Border / Alignment objects that
+    openpyxl has to deduplicate on save. Styles already in the workbook (e.g. when
+    appending to a saved report) are reused as they are.
+
+    Parameters:
+    workbook: openpyxl Workbook (normal or write-only)
+    definitions: dict - style key -> attribute dict, defaults to PIVOT_STYLES
+    namespace: str - prefix of the registered names, keeps them clear of Excel's built-in styles
+
+    Returns:
+    dict of style key -> registered style name
+    """
+    definitions = PIVOT_STYLES if definitions is None else definitions
+    existing = set(workbook.named_styles)
+    names = {}
+    for key, attributes in definitions.items():
+        name = f"{namespace}_{key}"
+        if name not in existing:
+            workbook.add_named_style(build_named_style(name, attributes))
+            existing.add(name)
+        names[key] = name
+    return names
+
+
+def add_growth_rules(worksheet, cell_ranges, threshold=0, inclusive=False):
+    """
+    Colour percentage cells green / red with conditional formatting rules
+
+    One pair of rules covers every range instead of a style per cell. Zero stays
+    uncoloured.
+
+    Parameters:
+    worksheet: openpyxl worksheet
+    cell_ranges: list of str - ranges such as "E4:G12"; formulas are relative to the first one
+    threshold: number - values above it are green (100 for v/s Target)
+    inclusive: bool - treat value == threshold as green
+    """
+    if not cell_ranges:
+        return
+    sqref = " ".join(cell_ranges)
+    first_cell = cell_ranges[0].split(':')[0]
+    green_operator = '>=' if inclusive else '>'
+    worksheet.conditional_formatting.add(sqref, Rule(
+        type='expression', dxf=GROWTH_DXF['positive'],
+        formula=[f"AND({first_cell}<>0,{first_cell}{green_operator}{threshold})"]))
+    worksheet.conditional_formatting.add(sqref, Rule(
+        type='expression', dxf=GROWTH_DXF['negative'],
+        formula=[f"AND({first_cell}<>0,{first_cell}<{threshold})"]))
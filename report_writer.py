@@ -0,0 +1,351 @@
+import math
+from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+from openpyxl.utils import get_column_letter
+from openpyxl.formatting.rule import Rule
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.worksheet.cell_range import CellRange
+
+from report_styles import register_styles
+
+PERCENT_HEADERS = ['v/s Target', 'v/s Last Year', 'v/s Last Month']
+DAY_NAMES = ['Mon', 'Tues', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Report layout: A = index, B = Day, C = Day Name, D onwards = (Channel, Type) values
+DAY_COL_IDX = 2
+DAY_NAME_COL_IDX = 3
+FIRST_VALUE_COL_IDX = 4
+
+
+def get_week_info(day_of_month, first_day_pos):
+    """Get week information for a given day.
+    Returns (week_number, is_first_partial_week)"""
+    if first_day_pos > 0:  # If month doesn't start on Monday
+        days_till_next_monday = 7 - first_day_pos
+        if day_of_month <= days_till_next_monday:
+            return 1, True
+        adjusted_day = day_of_month - days_till_next_monday
+        return (adjusted_day - 1) // 7 + 2, False
+    else:  # If month starts on Monday
+        return (day_of_month - 1) // 7 + 1, False
+
+
+def get_day_name(day_number, first_day_pos, day_names=DAY_NAMES):
+    """Get the day name for a given day of month"""
+    return day_names[(first_day_pos + day_number - 1) % 7]
+
+
+def build_report_styles(total_color='FFC000', pct_number_format='0.00"%"'):
+    """
+    Create every style used by the day channel report once
+    (registered as named styles on the report workbook by save_report_layout)
+
+    Returns:
+    dict of style name -> dict of openpyxl style attributes
+    """
+    side = Side(style='thin')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    center = Alignment(horizontal="center")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    stripe_fill = PatternFill("solid", fgColor="F2F2F2")
+    no_fill = PatternFill()
+    green_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
+    red_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
+    total_fill = PatternFill("solid", fgColor=total_color)
+    bold = Font(bold=True)
+
+    styles = {
+        'title': {'font': Font(bold=True, size=14), 'alignment': center, 'border': border},
+        'title_border': {'border': border},
+        'header': {'font': Font(bold=True, color="FFFFFF"), 'fill': PatternFill("solid", fgColor="4472C4"),
+                   'alignment': header_alignment, 'border': border},
+        'subheader': {'font': Font(bold=True, color="FFFFFF"), 'fill': PatternFill("solid", fgColor="8EA9DB"),
+                      'alignment': header_alignment, 'border': border},
+        'total': {'font': bold, 'fill': total_fill, 'border': border},
+        'total_label': {'font': bold, 'fill': total_fill, 'border': border, 'alignment': center},
+        'total_number': {'font': bold, 'fill': total_fill, 'border': border, 'number_format': '#,##0'},
+        'total_pct': {'font': bold, 'fill': total_fill, 'border': border, 'alignment': center,
+                      'number_format': pct_number_format}
+    }
+    for stripe, fill in (('even', stripe_fill), ('odd', no_fill)):
+        styles[f'{stripe}_plain'] = {'fill': fill, 'border': border}
+        styles[f'{stripe}_number'] = {'fill': fill, 'border': border, 'number_format': '#,##0'}
+        styles[f'{stripe}_center'] = {'fill': fill, 'border': border, 'alignment': center}
+        styles[f'{stripe}_pct_neutral'] = {'font': Font(color="000000"), 'fill': fill, 'border': border,
+                                           'alignment': center}
+    styles['pct_good'] = {'font': Font(color="006100"), 'fill': green_fill, 'border': border, 'alignment': center}
+    styles['pct_bad'] = {'font': Font(color="9C0006"), 'fill': red_fill, 'border': border, 'alignment': center}
+    return styles
+
+
+def format_percent_cell(header_value, value, stripe):
+    """
+    Convert a raw whole-percent value to the report text and its style name
+    (same display rules as the previous cell-by-cell formatter)
+    """
+    if value == float('inf'):
+        return 'N/A', f'{stripe}_center'
+
+    value = int(round(value))
+    if header_value == 'v/s Target':
+        return f"{abs(value)}%", 'pct_good' if value >= 100 else 'pct_bad'
+    if value > 0:
+        return f"+{value}%", 'pct_good'
+    if value < 0:
+        return f"{value}%", 'pct_bad'
+    return "0%", f'{stripe}_pct_neutral'
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def clean_value(value):
+    """Turn numpy scalars into plain Python values and NaN into empty cells"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def percent_formula(header_value, col, row):
+    """
+    Formula for a subtotal / grand total percentage cell, relative to the channel block
+    (current month is 1/2/3 columns before v/s Target/Last Year/Last Month)
+    """
+    if header_value == 'v/s Target':
+        current, base = get_column_letter(col - 1), get_column_letter(col - 2)
+        return f"=IF({base}{row}=0,0,ROUND(({current}{row})/{base}{row}*100,0))"
+    if header_value == 'v/s Last Year':
+        current, base = get_column_letter(col - 2), get_column_letter(col - 4)
+    else:
+        current, base = get_column_letter(col - 3), get_column_letter(col - 6)
+    return f"=IF({base}{row}=0,0,ROUND(({current}{row}-{base}{row})/{base}{row}*100,0))"
+
+
+def build_day_channel_rows(final_output, first_day_position, day_names=DAY_NAMES, title=None):
+    """
+    Lay out the full day channel report (title, headers, data, week subtotals, grand total)
+
+    Parameters:
+    final_output: DataFrame - 'Day' column followed by (Channel, Type) MultiIndex columns
+    first_day_position: int - weekday of the 1st of the month (0 = Monday)
+    day_names: list - names used for the Day Name column
+    title: str - title row text (defaults to the generated-on title)
+
+    Returns:
+    dict with rows (list of [(value, style_name), ...]), widths, merges, percent_cells
+    """
+    value_columns = [col for col in final_output.columns if col[0] != 'Day']
+    n_cols = FIRST_VALUE_COL_IDX - 1 + len(value_columns)
+    sub_headers = [None, None, 'Day Name'] + [col[1] for col in value_columns]
+    title = title or f"Invoice Day Channel Report - Generated on {datetime.now().strftime('%Y-%m-%d')}"
+
+    rows = []
+    width_values = {col: [] for col in range(1, n_cols + 1)}
+    width_values[1].append(title)
+
+    # Row 1: title, Row 2: channel headers, Row 3: type headers
+    rows.append([(title, 'title')] + [(None, 'title_border')] * (n_cols - 1))
+
+    channel_row = ['Channel', 'Day', '']
+    merges = []
+    previous_channel = None
+    for offset, (channel, _) in enumerate(value_columns):
+        col = FIRST_VALUE_COL_IDX + offset
+        if channel != previous_channel:
+            channel_row.append(channel)
+            merges.append([col, col])
+            previous_channel = channel
+        else:
+            channel_row.append(None)
+            merges[-1][1] = col
+    rows.append([(value, 'header') for value in channel_row])
+
+    type_row = ['Type', None, 'Day Name'] + [col[1] for col in value_columns]
+    rows.append([(value, 'subheader') for value in type_row])
+    for row_values in (channel_row, type_row):
+        for col, value in enumerate(row_values, start=1):
+            width_values[col].append(value)
+
+    # Row 4 is the (empty) index-label row; keeping it preserves the layout downstream steps expect
+    rows.append([(None, 'even_plain') for _ in range(n_cols)])
+
+    # Data rows
+    values = final_output[value_columns].to_numpy(dtype=object)
+    days = final_output['Day'].to_numpy(dtype=object)
+    data_rows = []
+    for position, (index_value, day, row_values) in enumerate(zip(final_output.index, days, values)):
+        sheet_row = 5 + position
+        stripe = 'even' if sheet_row % 2 == 0 else 'odd'
+        day = clean_value(day)
+        index_value = clean_value(index_value)
+
+        cells = [(index_value, f'{stripe}_number' if is_number(index_value) else f'{stripe}_plain'),
+                 (day, f'{stripe}_number' if is_number(day) else f'{stripe}_plain')]
+        day_name = get_day_name(int(day), first_day_position, day_names) if is_number(day) else None
+        cells.append((day_name, f'{stripe}_center' if day_name else f'{stripe}_plain'))
+        width_values[1].append(index_value)
+        width_values[2].append(day)
+        width_values[3].append(day_name)
+
+        for offset, raw_value in enumerate(row_values):
+            col = FIRST_VALUE_COL_IDX + offset
+            value = clean_value(raw_value)
+            width_values[col].append(value)
+            header_value = sub_headers[col - 1]
+            if not is_number(value):
+                cells.append((value, f'{stripe}_plain'))
+            elif header_value in PERCENT_HEADERS:
+                cells.append(format_percent_cell(header_value, value, stripe))
+            else:
+                cells.append((value, f'{stripe}_number'))
+        data_rows.append((day, cells))
+
+    # Group consecutive days into weeks and add a subtotal row after each week
+    percent_cells = {}
+    subtotal_rows = []
+    week_start = None
+    current_row = 5
+    for position, (day, cells) in enumerate(data_rows):
+        rows.append(cells)
+        if week_start is None:
+            week_start = current_row
+
+        week_num, is_partial = get_week_info(int(day), first_day_position) if is_number(day) else (None, False)
+        next_day = data_rows[position + 1][0] if position + 1 < len(data_rows) else None
+        next_week = get_week_info(int(next_day), first_day_position)[0] if is_number(next_day) else None
+
+        if week_num is not None and next_week != week_num:
+            subtotal_row = current_row + 1
+            if is_partial:
+                label = f"Week 1 (Partial: {7 - first_day_position} days) Subtotal"
+            else:
+                label = f"Week {week_num} Subtotal"
+            subtotal = [(None, 'total'), (label, 'total_label'), ('', 'total')]
+            for col in range(FIRST_VALUE_COL_IDX, n_cols + 1):
+                header_value = sub_headers[col - 1]
+                if header_value in PERCENT_HEADERS:
+                    subtotal.append((percent_formula(header_value, col, subtotal_row), 'total_pct'))
+                    percent_cells.setdefault(col, []).append(subtotal_row)
+                else:
+                    letter = get_column_letter(col)
+                    subtotal.append((f"=SUM({letter}{week_start}:{letter}{current_row})", 'total_number'))
+            rows.append(subtotal)
+            subtotal_rows.append(subtotal_row)
+            current_row = subtotal_row
+            week_start = None
+        current_row += 1
+
+    # Grand total sums only the weekly subtotal rows
+    grand_total_row = current_row
+    grand_total = [(None, 'total'), ("Grand Total", 'total_label'), ('', 'total')]
+    for col in range(FIRST_VALUE_COL_IDX, n_cols + 1):
+        header_value = sub_headers[col - 1]
+        letter = get_column_letter(col)
+        if header_value in PERCENT_HEADERS:
+            grand_total.append((percent_formula(header_value, col, grand_total_row), 'total_pct'))
+            percent_cells.setdefault(col, []).append(grand_total_row)
+        elif subtotal_rows:
+            formula = "=SUM(" + ",".join(f"{letter}{row}" for row in subtotal_rows) + ")"
+            grand_total.append((formula, 'total_number'))
+        else:
+            grand_total.append((None, 'total'))
+    rows.append(grand_total)
+
+    # Column widths from the raw values (minimum width of 12)
+    widths = {}
+    for col, col_values in width_values.items():
+        lengths = [len(str(value)) for value in col_values if value]
+        widths[col] = max(max(lengths, default=0) + 2, 12)
+
+    return {
+        'rows': rows,
+        'widths': widths,
+        'merges': [(2, start, 2, end) for start, end in merges if end > start],
+        'percent_cells': percent_cells,
+        'sub_headers': sub_headers
+    }
+
+
+def save_report_layout(layout, output_path, styles, sheet_name='Sheet1'):
+    """
+    Stream a prepared layout into a new write-only workbook and save it
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+
+    for col, width in layout['widths'].items():
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    style_names = register_styles(wb, styles, namespace='day_report')
+    for row in layout['rows']:
+        cells = []
+        for value, style_name in row:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style_names[style_name]
+            cells.append(cell)
+        ws.append(cells)
+
+    for min_row, min_col, max_row, max_col in layout['merges']:
+        ws.merged_cells.add(CellRange(min_col=min_col, min_row=min_row, max_col=max_col, max_row=max_row))
+
+    # Conditional colouring for the formula-driven percentage cells
+    green_style = DifferentialStyle(fill=PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid'),
+                                    font=Font(color='006100', bold=True))
+    red_style = DifferentialStyle(fill=PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid'),
+                                  font=Font(color='9C0006', bold=True))
+    for col, pct_rows in layout['percent_cells'].items():
+        header_value = layout['sub_headers'][col - 1]
+        cell_range = " ".join(f"{get_column_letter(col)}{row}" for row in pct_rows)
+        threshold = 100 if header_value == 'v/s Target' else 0
+        green_operator = "greaterThanOrEqual" if header_value == 'v/s Target' else "greaterThan"
+        ws.conditional_formatting.add(cell_range, Rule(type="cellIs", operator=green_operator,
+                                                       formula=[threshold], dxf=green_style))
+        ws.conditional_formatting.add(cell_range, Rule(type="cellIs", operator="lessThan",
+                                                       formula=[threshold], dxf=red_style))
+
+    wb.save(output_path)
+
+
+def write_day_channel_report(final_output, output_path, first_day_position, day_names=DAY_NAMES,
+                             total_color='FFC000', pct_number_format='0.00"%"', title=None):
+    """
+    Write the formatted invoice day channel report in a single pass
+
+    Replaces final_output.to_excel() followed by load_workbook / insert_cols /
+    insert_rows and cell-by-cell formatting: data, day names, styles, week
+    subtotals, grand total and conditional formats are written in one stream.
+
+    Parameters:
+    final_output: DataFrame - 'Day' column followed by (Channel, Type) MultiIndex columns
+    output_path: str - xlsx file to write
+    first_day_position: int - weekday of the 1st of the month (0 = Monday)
+    day_names: list - names used for the Day Name column
+    total_color: str - fill colour of subtotal and grand total rows
+    pct_number_format: str - number format of subtotal/grand total percentage formulas
+    title: str - optional title row text
+
+    Returns:
+    str path actually written (a _backup file if the main path could not be saved)
+    """
+    layout = build_day_channel_rows(final_output, first_day_position, day_names, title)
+    styles = build_report_styles(total_color, pct_number_format)
+
+    try:
+        save_report_layout(layout, output_path, styles)
+        print(f"Created final Excel report at {output_path}")
+        return output_path
+    except Exception as e:
+        print(f"Error saving file: {e}")
+        backup_path = output_path.replace('.xlsx', '_backup.xlsx')
+        try:
+            save_report_layout(layout, backup_path, styles)
+            print(f"Saved backup file as {backup_path}")
+            return backup_path
+        except Exception as e2:
+            print(f"Could not save backup file either: {e2}")
+            return None
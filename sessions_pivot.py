@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from idg_pivot import week_numbers
+
+# Base metrics summed from the traffic files; CVR and AOV are derived from them
+SESSION_METRICS = ['Sessions', 'Purchases', 'Purchase revenue']
+DERIVED_METRICS = ['CVR', 'AOV']
+EA_CG_VALUES = ['EA', 'Endless Aisle']
+
+# CG groups included by each cg_filter ('all' = rows of a period without a CG column,
+# which cannot be filtered and so count in every variant)
+CG_FILTER_GROUPS = {
+    None: ['EA', 'non_EA', 'all'],
+    'EA_only': ['EA', 'all'],
+    'non_EA': ['non_EA', 'all']
+}
+
+
+def load_session_week_sums(sessions_info, max_invoice_day, first_day_position, metrics=None):
+    """
+    Read each sessions workbook once and sum the metrics by period x CG group x channel x week
+
+    Parameters:
+    sessions_info: list - [(path, sheet, display_name), ...]
+    max_invoice_day: int - last day to keep (same cut-off as the invoice data)
+    first_day_position: int - weekday of the 1st of the month (0 = Monday)
+    metrics: list - metrics to sum, defaults to SESSION_METRICS
+
+    Returns:
+    DataFrame with Period, CGGroup, Channel, WeekNumber and one column per metric
+    """
+    metrics = metrics or SESSION_METRICS
+    parts = []
+    for path, sheet, display_name in sessions_info:
+        print(f"\n📄 Processing {display_name} Sessions Data:")
+        try:
+            sessions_df = pd.read_excel(path, sheet_name=sheet)
+            print(f"  Raw Shape: {sessions_df.shape}")
+
+            # Filter out "Gift Card" from Category column if it exists
+            if 'Category' in sessions_df.columns:
+                sessions_df = sessions_df[sessions_df['Category'] != 'Gift Card ']
+
+            days = pd.to_datetime(sessions_df['Date'], format='%Y%m%d', errors='coerce').dt.day
+            sessions_df = sessions_df.assign(Day=days).dropna(subset=['Day'])
+            if sessions_df.empty:
+                print(f"  No valid 'Day' data after conversion for {display_name}.")
+                continue
+
+            original_len = len(sessions_df)
+            sessions_df = sessions_df[sessions_df['Day'] <= max_invoice_day]
+            print(f"📉 {display_name}: Filtered {original_len - len(sessions_df)} rows with Day > {max_invoice_day}")
+
+            available_metrics = [m for m in metrics if m in sessions_df.columns]
+            if not available_metrics:
+                print(f"  No metrics ({', '.join(metrics)}) found in {display_name}. Skipping.")
+                continue
+
+            if 'CG' in sessions_df.columns:
+                cg_group = np.where(sessions_df['CG'].isin(EA_CG_VALUES), 'EA', 'non_EA')
+            else:
+                print(f"  Warning: CG column not found, EA / non-EA filters cannot be applied to {display_name}")
+                cg_group = 'all'
+
+            parts.append(sessions_df[['Channel'] + available_metrics].assign(
+                WeekNumber=week_numbers(sessions_df['Day'], first_day_position),
+                CGGroup=cg_group,
+                Period=display_name
+            ))
+            print(f"  Processed {display_name} successfully ({len(sessions_df):,} rows)")
+        except Exception as e:
+            print(f"❌ Error processing {display_name}: {e}")
+
+    columns = ['Period', 'CGGroup', 'Channel', 'WeekNumber']
+    if not parts:
+        return pd.DataFrame(columns=columns + metrics)
+    stacked = pd.concat(parts, ignore_index=True).reindex(columns=columns + metrics)
+    return stacked.groupby(columns)[metrics].sum().reset_index()
+
+
+def safe_ratio(numerator, denominator, scale=1, strict_positive=False):
+    """numerator / denominator * scale with 0 where the denominator is 0 (or not positive)"""
+    valid = denominator > 0 if strict_positive else denominator != 0
+    result = np.zeros_like(numerator, dtype=float)
+    np.divide(numerator * scale, denominator, out=result, where=valid)
+    return result
+
+
+def build_sessions_pivot(session_week_sums, periods, cg_filter=None, cvr_scale=100,
+                         week_label=lambda week: f"Week {week}"):
+    """
+    Build the channel x (week, metric, period) sessions pivot in one reshape
+
+    Weekly sums, the Total block, the Grand Total row and the CVR / AOV ratios are
+    all computed on channel x week x period arrays.
+
+    Parameters:
+    session_week_sums: DataFrame - output of load_session_week_sums()
+    periods: list - period display names in column order
+    cg_filter: None, "EA_only" or "non_EA"
+    cvr_scale: number - 100 for CVR in percent, 1 for a plain ratio
+    week_label: callable(week) -> column label
+
+    Returns:
+    DataFrame indexed by channel (+ 'Grand Total'); empty if there is no data
+    """
+    metrics = SESSION_METRICS
+    selected = session_week_sums[session_week_sums['CGGroup'].isin(CG_FILTER_GROUPS[cg_filter])]
+    sums = selected.groupby(['Channel', 'WeekNumber', 'Period'])[metrics].sum()
+    if sums.empty:
+        print("⚠️ No session data successfully processed or no channels found. Cannot create master pivot table.")
+        return pd.DataFrame()
+
+    channels = sorted(sums.index.get_level_values('Channel').unique())
+    weeks = list(range(1, int(sums.index.get_level_values('WeekNumber').max()) + 1))
+    grid_columns = pd.MultiIndex.from_product([weeks, periods])
+
+    # metric -> channel x week x period, then the Total week and the Grand Total row
+    base = {}
+    for metric in metrics:
+        grid = sums[metric].unstack(['WeekNumber', 'Period'], fill_value=0)
+        values = grid.reindex(index=channels, columns=grid_columns, fill_value=0).to_numpy(dtype=float)
+        values = values.reshape(len(channels), len(weeks), len(periods))
+        values = np.concatenate([values, values.sum(axis=1, keepdims=True)], axis=1)
+        base[metric] = np.concatenate([values, values.sum(axis=0, keepdims=True)], axis=0)
+
+    sessions, purchases, revenue = base['Sessions'], base['Purchases'], base['Purchase revenue']
+    derived = {'CVR': safe_ratio(purchases, sessions, cvr_scale), 'AOV': safe_ratio(revenue, purchases)}
+    # The Grand Total row only divides by positive totals
+    derived['CVR'][-1] = safe_ratio(purchases[-1], sessions[-1], cvr_scale, strict_positive=True)
+    derived['AOV'][-1] = safe_ratio(revenue[-1], purchases[-1], strict_positive=True)
+
+    all_metrics = metrics + DERIVED_METRICS
+    values = np.stack([base.get(metric, derived.get(metric)) for metric in all_metrics], axis=2)
+    week_labels = [week_label(week) for week in weeks] + ['Total']
+    columns = pd.MultiIndex.from_product([week_labels, all_metrics, periods], names=['Week', 'Metric', 'Period'])
+    return pd.DataFrame(values.reshape(len(channels) + 1, -1), index=channels + ['Grand Total'], columns=columns)
+
+
+def build_sessions_pivots(session_week_sums, periods, cg_filters=(None, 'EA_only', 'non_EA'), **kwargs):
+    """
+    Build the sessions pivot for several cg_filter variants from the same weekly sums
+
+    Returns:
+    dict of cg_filter -> pivot DataFrame
+    """
+    return {cg_filter: build_sessions_pivot(session_week_sums, periods, cg_filter, **kwargs)
+            for cg_filter in cg_filters}
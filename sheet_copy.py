@@ -0,0 +1,312 @@
+import os
+from copy import copy
+from xml.etree.ElementTree import iterparse
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import MergedCell
+from openpyxl.styles import Font
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+from report_styles import register_styles, solid_fill, THIN_BORDER, CENTER
+
+# Fixed style of the header row of streamed data sheets
+RAW_HEADER_STYLE = {'font': Font(bold=True, color='FFFFFF'), 'fill': solid_fill('4472C4'),
+                    'alignment': CENTER, 'border': THIN_BORDER}
+
+
+def read_merged_ranges(worksheet):
+    """
+    Get the merged ranges of a read-only worksheet
+
+    Read-only worksheets do not load merged cells, so the <mergeCell> entries are
+    streamed from the sheet XML (they sit after the cell data).
+
+    Returns:
+    list of CellRange
+    """
+    ranges = []
+    source = worksheet._get_source()
+    try:
+        for _, element in iterparse(source):
+            if element.tag.endswith('}mergeCell'):
+                ranges.append(CellRange(element.get('ref')))
+            element.clear()
+    finally:
+        source.close()
+    return ranges
+
+
+def translate_number_format(source_wb, dest_wb, num_fmt_id):
+    """Map a source number format id to the destination workbook (built-in ids are shared)"""
+    if num_fmt_id < BUILTIN_FORMATS_MAX_SIZE:
+        return num_fmt_id
+    number_format = source_wb._number_formats[num_fmt_id - BUILTIN_FORMATS_MAX_SIZE]
+    return dest_wb._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+
+
+def translate_style_ids(source_wb, dest_wb, style_array):
+    """
+    Register the font, fill, border, alignment and number format of a source style
+    in the destination workbook
+
+    Returns:
+    (fontId, fillId, borderId, alignmentId, numFmtId) in the destination workbook
+    """
+    return (
+        dest_wb._fonts.add(source_wb._fonts[style_array.fontId]),
+        dest_wb._fills.add(source_wb._fills[style_array.fillId]),
+        dest_wb._borders.add(source_wb._borders[style_array.borderId]),
+        dest_wb._alignments.add(source_wb._alignments[style_array.alignmentId]),
+        translate_number_format(source_wb, dest_wb, style_array.numFmtId)
+    )
+
+
+def get_style_array(cell):
+    """Style array of a normal, merged or read-only cell (None when the cell has no style)"""
+    style_id = getattr(cell, '_style_id', None)
+    if style_id is not None:
+        return cell.style_array if style_id else None
+    style_array = getattr(cell, '_style', None)
+    return style_array if style_array is not None and any(style_array) else None
+
+
+class StyleTranslator:
+    """
+    Translate source cell styles to destination style ids, once per distinct style
+
+    A report block only uses a handful of distinct styles, so each one is registered
+    in the destination workbook the first time it is seen and every later cell just
+    reuses the translated ids instead of copying Font / Fill / Border objects.
+    """
+
+    def __init__(self, source_wb, dest_wb):
+        self.source_wb = source_wb
+        self.dest_wb = dest_wb
+        self._translated = {}
+
+    def apply(self, source_cell, dest_cell):
+        """Give dest_cell the style of source_cell; unstyled cells keep the destination style"""
+        style_array = get_style_array(source_cell)
+        if style_array is None:
+            return
+        key = tuple(style_array)
+        ids = self._translated.get(key)
+        if ids is None:
+            ids = translate_style_ids(self.source_wb, self.dest_wb, style_array)
+            self._translated[key] = ids
+        style = StyleArray(dest_cell._style) if dest_cell._style is not None else StyleArray()
+        style.fontId, style.fillId, style.borderId, style.alignmentId, style.numFmtId = ids
+        dest_cell._style = style
+
+
+def copy_cell_block(source_path, dest_path, source_min_row=2, source_min_col=4, dest_min_col=25,
+                    copy_merges=True, output_path=None):
+    """
+    Copy a rectangular block (values and styles) from one workbook into another
+
+    The source sheet is streamed in read-only mode, so only the destination is
+    loaded fully. Styles are transferred by id through a StyleTranslator.
+
+    Parameters:
+    source_path: str - workbook to copy from (active sheet, cached values)
+    dest_path: str - workbook to copy into (active sheet)
+    source_min_row: int - first source row to copy (rows keep their numbers)
+    source_min_col: int - first source column to copy (D = 4)
+    dest_min_col: int - destination column of source_min_col (Y = 25)
+    copy_merges: bool - re-create merged ranges that start at or after source_min_col
+    output_path: str - where to save, defaults to dest_path
+
+    Returns:
+    int number of cells copied
+    """
+    source_wb = load_workbook(source_path, read_only=True, data_only=True)
+    dest_wb = load_workbook(dest_path)
+    try:
+        source_ws = source_wb.active
+        dest_ws = dest_wb.active
+        col_offset = dest_min_col - source_min_col
+        translator = StyleTranslator(source_wb, dest_wb)
+
+        merged_ranges = read_merged_ranges(source_ws) if copy_merges else []
+        merged_cells = set()
+        merge_anchors = {}
+        for merged_range in merged_ranges:
+            merged_cells.update(merged_range.cells)
+            if merged_range.min_col >= source_min_col:
+                merge_anchors[(merged_range.min_row, merged_range.min_col)] = merged_range
+
+        # Merged ranges that start inside the block are re-created with their top-left value and style
+        anchor_cells = {}
+        anchor_rows = [row for row, _ in merge_anchors]
+        if anchor_rows:
+            for row_cells in source_ws.iter_rows(min_row=min(anchor_rows), max_row=max(anchor_rows),
+                                                 min_col=source_min_col):
+                for cell in row_cells:
+                    key = (getattr(cell, 'row', None), getattr(cell, 'column', None))
+                    if key in merge_anchors:
+                        anchor_cells[key] = cell
+
+        for (row, column), merged_range in merge_anchors.items():
+            try:
+                dest_ws.merge_cells(start_row=merged_range.min_row, start_column=merged_range.min_col + col_offset,
+                                    end_row=merged_range.max_row, end_column=merged_range.max_col + col_offset)
+            except ValueError:
+                pass
+            cell = anchor_cells.get((row, column))
+            dest_cell = dest_ws.cell(row=row, column=column + col_offset)
+            dest_cell.value = cell.value if cell is not None else None
+            if cell is not None:
+                translator.apply(cell, dest_cell)
+
+        copied = 0
+        for row, row_cells in enumerate(source_ws.iter_rows(min_row=source_min_row, min_col=source_min_col),
+                                        start=source_min_row):
+            for column, cell in enumerate(row_cells, start=source_min_col):
+                if (row, column) in merged_cells:
+                    continue
+                dest_cell = dest_ws.cell(row=row, column=column + col_offset)
+                dest_cell.value = cell.value
+                translator.apply(cell, dest_cell)
+                copied += 1
+
+        dest_wb.save(output_path or dest_path)
+    finally:
+        source_wb.close()
+    return copied
+
+
+def unique_sheet_title(title, existing_titles):
+    """Add a _1, _2 ... suffix until the title is not used yet"""
+    new_title = title
+    counter = 1
+    while new_title in existing_titles:
+        new_title = f"{title}_{counter}"
+        counter += 1
+    return new_title
+
+
+def copy_sheet_to_write_only(source_ws, dest_wb, translator):
+    """
+    Re-create a loaded worksheet in a write-only workbook
+
+    Values, formulas, styles, merged ranges, column widths, row heights, the sheet
+    view (freeze panes) and conditional formats are carried over.
+    """
+    dest_ws = dest_wb.create_sheet(source_ws.title)
+    dest_ws.sheet_state = source_ws.sheet_state
+    dest_ws.sheet_properties = copy(source_ws.sheet_properties)
+    dest_ws.views.sheetView[0] = copy(source_ws.sheet_view)
+
+    # Column and row dimensions have to be set before any row is streamed
+    for key, dimension in source_ws.column_dimensions.items():
+        target = dest_ws.column_dimensions[key]
+        target.min, target.max = dimension.min, dimension.max
+        target.width = dimension.width
+        target.hidden = dimension.hidden
+    for idx, dimension in source_ws.row_dimensions.items():
+        if dimension.height or dimension.hidden:
+            dest_ws.row_dimensions[idx].height = dimension.height
+            dest_ws.row_dimensions[idx].hidden = dimension.hidden
+
+    for merged_range in source_ws.merged_cells.ranges:
+        dest_ws.merged_cells.add(CellRange(merged_range.coord))
+    for conditional_format in source_ws.conditional_formatting:
+        for rule in conditional_format.rules:
+            dest_ws.conditional_formatting.add(str(conditional_format.sqref), rule)
+
+    for row in source_ws.iter_rows():
+        cells = []
+        for cell in row:
+            dest_cell = WriteOnlyCell(dest_ws, value=None if isinstance(cell, MergedCell) else cell.value)
+            translator.apply(cell, dest_cell)
+            cells.append(dest_cell)
+        dest_ws.append(cells)
+    return dest_ws
+
+
+def stream_sheet_rows(source_path, sheet_name, dest_ws, header_style):
+    """
+    Stream one sheet into a write-only worksheet, row by row
+
+    The source is read in read-only mode and written as plain values, with only the
+    header row styled, so memory stays flat however many rows the sheet has.
+
+    Parameters:
+    source_path: str - workbook to read (cached values)
+    sheet_name: str - sheet to copy
+    dest_ws: write-only worksheet to append to
+    header_style: str - registered named style for the header row
+
+    Returns:
+    (rows written, columns)
+    """
+    source_wb = load_workbook(source_path, read_only=True, data_only=True)
+    try:
+        rows = source_wb[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return 0, 0
+
+        for col_idx, value in enumerate(header, start=1):
+            dest_ws.column_dimensions[get_column_letter(col_idx)].width = max(len(str(value or '')) + 2, 10)
+
+        header_cells = []
+        for value in header:
+            cell = WriteOnlyCell(dest_ws, value=value)
+            cell.style = header_style
+            header_cells.append(cell)
+        dest_ws.append(header_cells)
+
+        row_count = 1
+        for row in rows:
+            dest_ws.append(row)
+            row_count += 1
+        return row_count, len(header)
+    finally:
+        source_wb.close()
+
+
+def append_streamed_sheets(dest_path, sheet_sources, header_style=None, output_path=None):
+    """
+    Append large data sheets to an existing report without loading them into memory
+
+    The (small) report sheets are re-created in a new write-only workbook, then each
+    source sheet is streamed in after them with stream_sheet_rows(). The result is
+    written to a temporary file and moved over the report, so a failure leaves the
+    original report untouched.
+
+    Parameters:
+    dest_path: str - report workbook to extend
+    sheet_sources: list - [(source_path, sheet_name, new_title), ...]
+    header_style: dict - style attributes of the header rows, defaults to RAW_HEADER_STYLE
+    output_path: str - where to save, defaults to dest_path
+
+    Returns:
+    list of sheet names in the saved workbook
+    """
+    output_path = output_path or dest_path
+    dest_wb = load_workbook(dest_path)
+    out_wb = Workbook(write_only=True)
+    translator = StyleTranslator(dest_wb, out_wb)
+
+    for ws in dest_wb.worksheets:
+        copy_sheet_to_write_only(ws, out_wb, translator)
+
+    header_name = register_styles(out_wb, {'header': header_style or RAW_HEADER_STYLE}, namespace='raw')['header']
+    for source_path, sheet_name, title in sheet_sources:
+        new_title = unique_sheet_title(title, out_wb.sheetnames)
+        print(f"📊 Streaming sheet '{sheet_name}' from {os.path.basename(source_path)} as '{new_title}'...")
+        try:
+            row_count, col_count = stream_sheet_rows(source_path, sheet_name, out_wb.create_sheet(new_title),
+                                                     header_name)
+            print(f"✅ Successfully copied {new_title} ({row_count} rows, {col_count} columns)")
+        except Exception as e:
+            print(f"❌ Error copying sheet {sheet_name} from {source_path}: {e}")
+
+    temp_path = output_path.replace('.xlsx', '_tmp.xlsx')
+    out_wb.save(temp_path)
+    os.replace(temp_path, output_path)
+    return out_wb.sheetnames